@@ -0,0 +1,74 @@
+"""
+Benchmarks for the various stages of tyrian.
+
+Run from the root of the repository like so;
+
+.. code-block:: sh
+
+    $ python -m benchmarks.lexer
+"""
+
+# standard library
+import os
+import json
+import time
+import logging
+
+# application specific
+from tyrian.utils import logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GRAMMAR_DIR = os.path.join(ROOT, 'tyrian', 'Grammar')
+EXAMPLES_DIR = os.path.join(ROOT, 'examples')
+
+# the debug output would dwarf whatever we are trying to measure
+logger.setLevel(logging.WARNING)
+
+
+def load_token_defs() -> dict:
+    with open(os.path.join(GRAMMAR_DIR, 'tokens.json')) as fh:
+        return json.load(fh)
+
+
+def load_raw_grammar() -> str:
+    with open(os.path.join(GRAMMAR_DIR, 'Grammar')) as fh:
+        return fh.read()
+
+
+def generate_source(copies: int) -> str:
+    """
+    Builds a large lisp source by repeating the bundled examples
+
+    :param copies: number of times to repeat the examples
+    """
+
+    content = []
+    for filename in sorted(os.listdir(EXAMPLES_DIR)):
+        with open(os.path.join(EXAMPLES_DIR, filename)) as fh:
+            content.append(fh.read())
+
+    return '\n'.join(content * copies)
+
+
+def best_of(func, repeat: int=3) -> float:
+    """
+    Returns the fastest of `repeat` runs of `func`, in seconds
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(title: str, rows: list):
+    """
+    Prints a simple table of (label, seconds) rows
+    """
+
+    print(title)
+    print('-' * len(title))
+    for label, seconds in rows:
+        print('{:<40} {:>10.4f}s'.format(label, seconds))
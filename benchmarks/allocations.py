@@ -0,0 +1,85 @@
+"""
+Measures the memory allocated by each parser engine whilst parsing; both
+the transient allocations, such as check results, alive at the peak of the
+parse, and the blocks retained by the AST.
+
+As freed memory is not traced, the transient figure reflects how many
+results are alive at once, rather than the total allocated over the parse
+"""
+
+# standard library
+import tracemalloc
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import load_token_defs, load_raw_grammar, generate_source, best_of
+
+
+def count_nodes(node) -> int:
+    "Returns the number of nodes in an AST"
+
+    count, pending = 0, [node]
+    while pending:
+        node = pending.pop()
+        count += 1
+        if isinstance(node, (list, nodes.ListNode)):
+            pending.extend(node if isinstance(node, list) else node.content)
+    return count
+
+
+def measure(func) -> tuple:
+    """
+    Returns the result of func, along with the peak traced memory beyond
+    that still allocated on return, and the number of blocks still allocated
+    """
+
+    tracemalloc.start()
+    try:
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sum(
+            stat.count
+            for stat in tracemalloc.take_snapshot().statistics('filename')
+        )
+    finally:
+        tracemalloc.stop()
+    return result, peak - current, blocks
+
+
+def main():
+    token_defs = load_token_defs()
+    tokens = Lexer(token_defs).lex(generate_source(10))
+
+    print('{} tokens'.format(len(tokens)))
+    print('{:<16} {:>12} {:>12} {:>12} {:>16}'.format(
+        'engine', 'seconds', 'transient KB', 'AST blocks', 'blocks per node'))
+
+    for engine, settings in [
+            ('backtracking', {'parser_engine': 'backtracking'}),
+            ('packrat', {'parser_engine': 'backtracking', 'packrat': True}),
+            ('predictive', {'parser_engine': 'predictive'}),
+            ('generated', {'parser_engine': 'generated'})]:
+        parser = Parser(
+            token_defs=token_defs,
+            raw_grammar=load_raw_grammar(),
+            grammar_mapping=nodes.grammar_mapping,
+            settings=settings
+        )
+        # warm up any caches, such as the prediction tables
+        parser.parse(tokens)
+
+        seconds = best_of(lambda: parser.parse(tokens))
+        ast, transient, blocks = measure(lambda: parser.parse(tokens))
+        print('{:<16} {:>12.4f} {:>12.1f} {:>12} {:>16.2f}'.format(
+            engine,
+            seconds,
+            transient / 1024,
+            blocks,
+            blocks / count_nodes(ast.content)
+        ))
+
+
+if __name__ == '__main__':
+    main()
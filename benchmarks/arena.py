@@ -0,0 +1,70 @@
+"""
+Compares the memory retained by an AST of Nodes against that retained by
+an ASTArena of the same forms, along with the time taken to parse into,
+to pretty print and to compile each
+"""
+
+# standard library
+import tracemalloc
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import load_token_defs, load_raw_grammar, generate_source, best_of
+
+
+def retained(func) -> tuple:
+    """
+    Returns the result of func, along with the memory still allocated on
+    return, in bytes
+    """
+
+    tracemalloc.start()
+    try:
+        result = func()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current
+
+
+def compile_time(ast) -> str:
+    try:
+        from tyrian.compiler import Compiler
+    except ImportError:
+        return 'n/a'
+
+    compiler = Compiler()
+    return '{:.4f}s'.format(
+        best_of(lambda: compiler.compile_parse_tree('benchmark', ast)))
+
+
+def main():
+    token_defs = load_token_defs()
+    tokens = Lexer(token_defs).lex(generate_source(40))
+
+    print('{} tokens'.format(len(tokens)))
+    print('{:<12} {:>12} {:>12} {:>12} {:>12}'.format(
+        'AST', 'retained KB', 'parse', 'pprint', 'compile'))
+
+    for label, compact in [('nodes', False), ('arena', True)]:
+        parser = Parser(
+            token_defs=token_defs,
+            raw_grammar=load_raw_grammar(),
+            grammar_mapping=nodes.grammar_mapping,
+            settings={'compact_ast': compact}
+        )
+
+        ast, size = retained(lambda: parser.parse(tokens))
+        print('{:<12} {:>12.1f} {:>11.4f}s {:>11.4f}s {:>12}'.format(
+            label,
+            size / 1024,
+            best_of(lambda: parser.parse(tokens)),
+            best_of(ast.pprint),
+            compile_time(ast)
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Measures parsing a data heavy source with each engine, separately from
+decoding the content of its atoms, which is left until first asked for
+"""
+
+# standard library
+import time
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import load_token_defs, load_raw_grammar, best_of, report
+
+
+def table(rows: int) -> str:
+    "Returns a single form holding a table of rows of numbers and strings"
+
+    return '(table\n{})'.format('\n'.join(
+        '(row {0} "name{0}" {1} -{0} x{0} + {2})'.format(
+            index, index * 7, index % 10)
+        for index in range(rows)
+    ))
+
+
+def decode(ast) -> int:
+    "Asks for the content of every atom, returning the number of atoms"
+
+    count, pending = 0, list(ast.content)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, nodes.ListNode):
+            pending.extend(node.content)
+        else:
+            node.content
+            count += 1
+    return count
+
+
+def main():
+    token_defs = load_token_defs()
+    tokens = Lexer(token_defs).lex(table(3000))
+
+    for engine in ('backtracking', 'predictive', 'generated', 'reader'):
+        parser = Parser(
+            token_defs=token_defs,
+            raw_grammar=load_raw_grammar(),
+            grammar_mapping=nodes.grammar_mapping,
+            settings={} if engine == 'reader' else {'parser_engine': engine}
+        )
+
+        ast = parser.parse(tokens)
+        start = time.perf_counter()
+        atoms = decode(ast)
+        decoding = time.perf_counter() - start
+
+        report('{}, {} tokens, {} atoms'.format(engine, len(tokens), atoms), [
+            ('parse', best_of(lambda: parser.parse(tokens))),
+            ('decode atoms', decoding)
+        ])
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares compiling a tree of lisp files with one interpreter per file
+against the BatchBuilder, with one and with several worker processes
+"""
+
+# standard library
+import os
+import sys
+import shutil
+import tempfile
+import multiprocessing
+import subprocess
+
+# application specific
+from . import ROOT, EXAMPLES_DIR, best_of, report
+
+
+def make_tree(directory: str, copies: int) -> str:
+    "Copies the bundled examples into copies subdirectories"
+
+    source_dir = os.path.join(directory, 'src')
+    for index in range(copies):
+        subdirectory = os.path.join(source_dir, str(index))
+        shutil.copytree(EXAMPLES_DIR, subdirectory)
+    return source_dir
+
+
+def main():
+    try:
+        from tyrian.build import BatchBuilder, find_sources
+    except ImportError as e:
+        print('not compiling: {!r}'.format(e))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir = make_tree(directory, 20)
+        output_dir = os.path.join(directory, 'out')
+        sources = find_sources(source_dir)
+
+        def per_file():
+            for source in sources:
+                subprocess.check_call(
+                    [
+                        sys.executable, '-m', 'tyrian.cli',
+                        os.path.join(source_dir, source),
+                        os.path.join(output_dir, source + '.pyc')
+                    ],
+                    cwd=ROOT
+                )
+
+        os.makedirs(output_dir)
+        rows = [('one interpreter per file', best_of(per_file, repeat=1))]
+
+        for jobs in sorted({1, multiprocessing.cpu_count()}):
+            builder = BatchBuilder(jobs=jobs, force=True)
+            summary = builder.build(source_dir, output_dir)
+            rows.append(('build -j {}'.format(jobs), summary['seconds']))
+
+        report('{} files'.format(len(sources)), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Compares the debug build profile against the release profile, in which
+argument types are not checked and debug logging is turned off.
+
+The profile is fixed once tyrian is imported, so the release profile is
+measured in a process of its own
+"""
+
+# standard library
+import os
+import sys
+import json
+import subprocess
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import (
+    ROOT,
+    load_token_defs,
+    load_raw_grammar,
+    generate_source,
+    best_of,
+    report
+)
+
+
+def measure(source: str) -> list:
+    token_defs = load_token_defs()
+    lexer = Lexer(token_defs)
+    parser = Parser(
+        token_defs=token_defs,
+        raw_grammar=load_raw_grammar(),
+        grammar_mapping=nodes.grammar_mapping
+    )
+    tokens = lexer.lex(source)
+    ast = parser.parse(tokens)
+
+    rows = [
+        ('lexing', best_of(lambda: lexer.lex(source))),
+        ('parsing', best_of(lambda: parser.parse(tokens)))
+    ]
+
+    try:
+        from tyrian.compiler import Compiler
+    except ImportError as e:
+        print('not compiling: {!r}'.format(e))
+    else:
+        compiler = Compiler()
+        rows.append(('compiling', best_of(
+            lambda: compiler.compile_parse_tree('benchmark', ast))))
+
+    return rows
+
+
+def measure_profile(profile: str) -> list:
+    "Returns the rows of :py:func:`measure`, in a process of the given profile"
+
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.build_profile', '--measure'],
+        cwd=ROOT,
+        env=dict(os.environ, TYRIAN_BUILD_PROFILE=profile)
+    )
+    # anything printed along the way comes before the rows
+    return json.loads(output.decode('utf-8').splitlines()[-1])
+
+
+def main():
+    if '--measure' in sys.argv:
+        print(json.dumps(measure(generate_source(40))))
+        return
+
+    debug = measure_profile('debug')
+    release = measure_profile('release')
+
+    for (label, debug_seconds), (_, release_seconds) in zip(debug, release):
+        report(label, [
+            ('debug', debug_seconds),
+            ('release', release_seconds)
+        ])
+        print()
+
+
+if __name__ == '__main__':
+    main()
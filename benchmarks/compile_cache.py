@@ -0,0 +1,51 @@
+"""
+Compares compiling the bundled examples without the compile cache, with
+an empty cache, and with every file already cached
+"""
+
+# standard library
+import os
+import tempfile
+
+# application specific
+from . import EXAMPLES_DIR, best_of, report
+
+
+def main():
+    try:
+        from tyrian.tyrian import Tyrian
+    except ImportError as e:
+        print('not compiling: {!r}'.format(e))
+        return
+
+    filenames = [
+        os.path.join(EXAMPLES_DIR, filename)
+        for filename in sorted(os.listdir(EXAMPLES_DIR))
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cached = Tyrian({
+            'compile_cache': os.path.join(directory, 'compile.cache')
+        })
+        uncached = Tyrian()
+
+        def compile_all(inst):
+            for filename in filenames:
+                inst.compile_code(filename)
+
+        rows = [('no cache', best_of(lambda: compile_all(uncached)))]
+
+        def cold():
+            cached.compile_cache.clear()
+            compile_all(cached)
+
+        rows.append(('empty cache', best_of(cold)))
+        rows.append(('warm cache', best_of(lambda: compile_all(cached))))
+
+        report('{} files'.format(len(filenames)), rows)
+        print(dict(cached.compile_cache.stats()))
+        cached.compile_cache.close()
+
+
+if __name__ == '__main__':
+    main()
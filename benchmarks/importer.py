@@ -0,0 +1,66 @@
+"""
+Compares importing lisp modules when their bytecode has to be compiled
+against importing them from ``__pycache__``
+"""
+
+# standard library
+import os
+import sys
+import shutil
+import tempfile
+import importlib
+
+# application specific
+from tyrian import importer
+from . import EXAMPLES_DIR, best_of, report
+
+
+def main():
+    try:
+        import tyrian.tyrian
+    except ImportError as e:
+        print('not compiling: {!r}'.format(e))
+        return
+
+    examples = sorted(os.listdir(EXAMPLES_DIR))
+    names = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(20):
+            for example in examples:
+                name = 'lisp_module_{}_{}'.format(
+                    index, os.path.splitext(example)[0])
+                shutil.copy(
+                    os.path.join(EXAMPLES_DIR, example),
+                    os.path.join(directory, name + importer.SOURCE_EXTENSION))
+                names.append(name)
+
+        def import_all():
+            for name in names:
+                sys.modules.pop(name, None)
+            importlib.invalidate_caches()
+            for name in names:
+                importlib.import_module(name)
+
+        def cold():
+            shutil.rmtree(
+                os.path.join(directory, '__pycache__'), ignore_errors=True)
+            import_all()
+
+        # the Tyrian is only built by the first import, which best_of
+        # leaves out
+        importer.install()
+
+        sys.path.insert(0, directory)
+        try:
+            report('{} modules'.format(len(names)), [
+                ('compiled', best_of(cold)),
+                ('from __pycache__', best_of(import_all))
+            ])
+        finally:
+            sys.path.remove(directory)
+            importer.uninstall()
+
+
+if __name__ == '__main__':
+    main()
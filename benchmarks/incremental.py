@@ -0,0 +1,61 @@
+"""
+Times reparsing a large source after a single line has been edited, with
+and without the form cache
+"""
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import (
+    load_token_defs,
+    load_raw_grammar,
+    generate_source,
+    best_of,
+    report
+)
+from .reader import dump
+
+
+def main():
+    token_defs = load_token_defs()
+    lexer = Lexer(token_defs)
+
+    def parser(**settings):
+        return Parser(
+            token_defs=token_defs,
+            raw_grammar=load_raw_grammar(),
+            grammar_mapping=nodes.grammar_mapping,
+            settings=settings
+        )
+    full, cached = parser(), parser(form_cache=True)
+
+    tokens = lexer.lex(generate_source(40), 'incremental')
+    cached.parse(tokens)
+
+    # alternately add and remove a line in the middle of the source, such
+    # that the forms after it move
+    line_no = tokens.line_nos[len(tokens) // 2]
+    edits = [
+        lexer.relex(tokens[:], line_no, line_no, '(print "edited")\n'),
+        tokens
+    ]
+
+    rows = []
+    for label, func in [('full', full.parse), ('form cache', cached.parse)]:
+        seconds = 0
+        for edited in edits * 3:
+            seconds += best_of(lambda: func(edited), repeat=1)
+        rows.append((label, seconds / 6))
+
+    for edited in edits:
+        assert dump(cached.parse(edited).content) == dump(
+            full.parse(edited).content)
+
+    report('reparsing {} tokens after an edit'.format(len(tokens)), rows)
+    print('{} forms reused, {} parsed'.format(
+        cached.form_cache.hits, cached.form_cache.misses))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Compares the single pass lexer against a per token scan of every definition,
+and relexing a single edited line against lexing the whole file again
+"""
+
+# application specific
+from tyrian.lexer import Lexer
+from tyrian.exceptions import InvalidToken
+from . import load_token_defs, generate_source, best_of, report
+
+
+class DictScanLexer(Lexer):
+    """
+    Splits each line on whitespace and tests every fragment against each
+    token definition in turn
+    """
+
+    def lex(self, content: str, filename: str=None) -> list:
+        tokens = []
+        for line_no, line in enumerate(content.split('\n'), start=1):
+            tokens.extend(self._lex_line(line, line_no, filename))
+        return tokens
+
+    def _lex_line(self, line: str, line_no: int, filename: str):
+        line = line.translate(self.TRANS).strip().split(' ')
+
+        for current_token in line:
+            for definition, name in self.tokens.items():
+                if definition.match(current_token):
+                    yield {
+                        "name": name,
+                        "token": current_token,
+                        "line_no": line_no,
+                        'filename': filename
+                    }
+                    break
+            else:
+                if current_token.strip():
+                    raise InvalidToken(current_token)
+
+
+def main():
+    token_defs = load_token_defs()
+    single_pass, dict_scan = Lexer(token_defs), DictScanLexer(token_defs)
+
+    for copies in (10, 100, 1000):
+        content = generate_source(copies)
+
+        assert [
+            (token.name, token.token, token.line_no)
+            for token in single_pass.lex(content)
+        ] == [
+            (token['name'], token['token'], token['line_no'])
+            for token in dict_scan.lex(content)
+        ]
+
+        old = best_of(lambda: dict_scan.lex(content))
+        new = best_of(lambda: single_pass.lex(content))
+
+        report('{} bytes, {} tokens'.format(
+            len(content), len(single_pass.lex(content))), [
+            ('per token dictionary scan', old),
+            ('single pass regex', new)
+        ])
+        print('speedup: x{:.1f}\n'.format(old / new))
+
+        tokens = single_pass.lex(content)
+        middle = content.count('\n') // 2
+
+        report('editing line {}'.format(middle), [
+            ('lex', best_of(lambda: single_pass.lex(content))),
+            ('relex', best_of(
+                lambda: single_pass.relex(tokens, middle, middle, '(print 5)')
+            ))
+        ])
+        print()
+
+
+if __name__ == '__main__':
+    main()
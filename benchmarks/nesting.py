@@ -0,0 +1,86 @@
+"""
+Parses and compiles deeply nested sources with each engine, well past the
+recursion limit
+"""
+
+# standard library
+import sys
+import time
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import load_token_defs, load_raw_grammar, report
+
+
+def nested_source(depth: int) -> str:
+    "Returns a call nested depth calls deep"
+
+    return '(print {}1{})'.format('(+ 1 ' * depth, ')' * depth)
+
+
+def nesting_depth(node) -> int:
+    "Returns the depth of the nested ListNodes, without recursing"
+
+    depth = 0
+    level = [node]
+    while level:
+        depth += 1
+        level = [
+            sub_node
+            for node in level
+            for sub_node in node.content
+            if isinstance(sub_node, nodes.ListNode)
+        ]
+    return depth
+
+
+def parse(depth: int):
+    token_defs = load_token_defs()
+    tokens = Lexer(token_defs).lex(nested_source(depth), 'nested')
+
+    rows = []
+    for engine in ('reader', 'predictive', 'generated', 'backtracking'):
+        parser = Parser(
+            token_defs=token_defs,
+            raw_grammar=load_raw_grammar(),
+            grammar_mapping=nodes.grammar_mapping,
+            settings={'parser_engine': engine}
+        )
+
+        start = time.perf_counter()
+        ast = parser.parse(tokens)
+        rows.append((engine, time.perf_counter() - start))
+
+        assert nesting_depth(ast.content[0]) == depth + 1
+
+    report('parsing {} levels deep'.format(depth), rows)
+    print()
+    return ast
+
+
+def compile_ast(ast, depth: int):
+    try:
+        from tyrian.compiler import Compiler
+    except ImportError as e:
+        print('not compiling: {!r}'.format(e))
+        return
+
+    start = time.perf_counter()
+    Compiler().compile_parse_tree('nested', ast)
+    report('compiling {} levels deep'.format(depth), [
+        ('compiler', time.perf_counter() - start)
+    ])
+    print()
+
+
+def main():
+    depth = sys.getrecursionlimit() * 20
+
+    ast = parse(depth)
+    compile_ast(ast, depth)
+
+
+if __name__ == '__main__':
+    main()
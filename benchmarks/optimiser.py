@@ -0,0 +1,69 @@
+"""
+Compares the backtracking engine checking the grammar trees as parsed
+against checking them as optimised by the GrammarOptimiser
+"""
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import (
+    load_token_defs,
+    load_raw_grammar,
+    generate_source,
+    best_of,
+    report
+)
+from .parser import BACKTRACKING_GRAMMAR, nested
+from .reader import dump
+
+
+def compare(title: str, raw_grammar: str, tokens, repeat: int=3):
+    token_defs = load_token_defs()
+
+    parsers = [
+        (name, Parser(
+            token_defs=token_defs,
+            raw_grammar=raw_grammar,
+            grammar_mapping=nodes.grammar_mapping,
+            settings={
+                'parser_engine': 'backtracking',
+                'optimise_grammars': optimise
+            }
+        ))
+        for name, optimise in [('as parsed', False), ('optimised', True)]
+    ]
+
+    (_, plain), (_, optimised) = parsers
+    assert dump(plain.parse(tokens).content) == dump(
+        optimised.parse(tokens).content)
+
+    report(title, [
+        (name, best_of(lambda: parser.parse(tokens), repeat=repeat))
+        for name, parser in parsers
+    ])
+    print()
+
+
+def main():
+    lexer = Lexer(load_token_defs())
+
+    # left factoring the trailing DOT means each list is only checked once
+    for depth in (4, 8, 12):
+        compare(
+            'nesting depth {}'.format(depth),
+            BACKTRACKING_GRAMMAR,
+            lexer.lex(nested(depth)),
+            repeat=1
+        )
+
+    tokens = lexer.lex(generate_source(40))
+    compare(
+        '{} tokens, bundled grammar'.format(len(tokens)),
+        load_raw_grammar(),
+        tokens
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Compares lexing and parsing a large source in one process against the
+ParallelParser, with a worker per cpu
+"""
+
+# standard library
+import multiprocessing
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from tyrian.parallel import ParallelParser
+from . import (
+    load_token_defs,
+    load_raw_grammar,
+    generate_source,
+    best_of,
+    report
+)
+
+
+def main():
+    token_defs = load_token_defs()
+    lexer = Lexer(token_defs)
+    parser = Parser(
+        token_defs=token_defs,
+        raw_grammar=load_raw_grammar(),
+        grammar_mapping=nodes.grammar_mapping
+    )
+    source = generate_source(800)
+
+    rows = [('sequential', best_of(
+        lambda: parser.parse(lexer.lex(source, 'sequential'))))]
+
+    for jobs in sorted({2, multiprocessing.cpu_count()} - {1}):
+        parallel_parser = ParallelParser(lexer, parser, jobs)
+        rows.append(('{} workers'.format(jobs), best_of(
+            lambda: parallel_parser.parse(source, 'parallel'))))
+
+    report('{} characters'.format(len(source)), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmarks for the grammar engine
+"""
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from tyrian.exceptions import TyrianException
+from . import (
+    load_token_defs,
+    load_raw_grammar,
+    generate_source,
+    best_of,
+    report
+)
+
+# each list is first tried with a trailing DOT; when nested, the failed
+# attempt throws away the work done on the members, doubling the work
+# done at each level of nesting
+BACKTRACKING_GRAMMAR = '''
+%start_token=list;
+
+list ::= OPEN_BRACKET members CLOSE_BRACKET DOT |
+         OPEN_BRACKET members CLOSE_BRACKET;
+
+members ::= (member)+;
+member ::= list | atom;
+atom ::= id | number;
+
+number ::= NUMBER_RE;
+id ::= ID_RE;
+'''
+
+# the memo is only consulted by the backtracking engine, checking the grammar
+# trees as parsed
+BACKTRACKING = {'parser_engine': 'backtracking', 'optimise_grammars': False}
+
+# grammars whose start grammar may be followed by tokens that cannot start
+# a form; as whatever follows a form is only checked once the form has been
+# matched, the predictive engine must not decide the start grammar by them
+CONFLICT_TOKEN_DEFS = {
+    'literal': {'(': 'OB', ')': 'CB', 'x': 'X', 'y': 'Y'},
+    'regex': {'(\\d+)': 'NUM', '([a-z]+)': 'WORD'}
+}
+
+CONFLICTS = [
+    (
+        '''
+        %start_token=r0;
+        r0 ::= r2 NUM r1 | r2 | OB;
+        r1 ::= r2 Y;
+        r2 ::= X | X | CB WORD r2;
+        ''',
+        'x\n12 12 x y 12 x x'
+    ),
+    (
+        '''
+        %start_token=r0;
+        r0 ::= r1 CB OB | r1 | r1 CB r1;
+        r1 ::= X;
+        ''',
+        'x\n) abc y y )'
+    )
+]
+
+
+def nested(depth: int) -> str:
+    return '(a ' * depth + '1' + ')' * depth
+
+
+def packrat():
+    token_defs = load_token_defs()
+    lexer = Lexer(token_defs)
+
+    parsers = [
+        (name, Parser(
+            token_defs=token_defs,
+            raw_grammar=BACKTRACKING_GRAMMAR,
+            grammar_mapping=nodes.grammar_mapping,
+            settings=settings
+        ))
+        for name, settings in [
+            ('backtracking', BACKTRACKING),
+            ('packrat', dict(BACKTRACKING, packrat=True))
+        ]
+    ]
+
+    for depth in (4, 8, 12):
+        tokens = lexer.lex(nested(depth))
+
+        report('nesting depth {}'.format(depth), [
+            (name, best_of(lambda: parser.parse(tokens), repeat=1))
+            for name, parser in parsers
+        ])
+        print()
+
+
+def scaling():
+    """
+    Parses increasingly large sources; as the grammar nodes share the
+    tokens and pass around a position, time per token should stay flat
+    """
+
+    token_defs = load_token_defs()
+    lexer = Lexer(token_defs)
+    parser = Parser(
+        token_defs=token_defs,
+        raw_grammar=load_raw_grammar(),
+        grammar_mapping=nodes.grammar_mapping
+    )
+
+    print('{:>10} {:>10} {:>16}'.format('tokens', 'seconds', 'us per token'))
+    for copies in (5, 10, 20, 40, 80):
+        tokens = lexer.lex(generate_source(copies))
+        seconds = best_of(lambda: parser.parse(tokens), repeat=1)
+
+        print('{:>10} {:>10.4f} {:>16.2f}'.format(
+            len(tokens), seconds, seconds / len(tokens) * 1e6))
+    print()
+
+
+def engines():
+    """
+    Compares the generated and predictive engines against the backtracking
+    engine on the default grammar
+    """
+
+    token_defs = load_token_defs()
+    tokens = Lexer(token_defs).lex(generate_source(40))
+
+    rows = []
+    for engine in ('backtracking', 'predictive', 'generated'):
+        parser = Parser(
+            token_defs=token_defs,
+            raw_grammar=load_raw_grammar(),
+            grammar_mapping=nodes.grammar_mapping,
+            settings={'parser_engine': engine}
+        )
+        rows.append((engine, best_of(lambda: parser.parse(tokens))))
+
+    report('{} tokens'.format(len(tokens)), rows)
+    print()
+
+
+def outcome(parser, tokens):
+    try:
+        return parser.parse(tokens).pprint()
+    except TyrianException as e:
+        return '{}: {}'.format(type(e).__name__, e)
+
+
+def conflicts():
+    """
+    Asserts that the predictive engine agrees with the backtracking engine
+    on grammars that are not LL(1) once any token may follow a form
+    """
+
+    lexer = Lexer(CONFLICT_TOKEN_DEFS)
+
+    for raw_grammar, source in CONFLICTS:
+        tokens = lexer.lex(source, 'conflicts')
+
+        parsers = [
+            (engine, Parser(
+                token_defs=CONFLICT_TOKEN_DEFS,
+                raw_grammar=raw_grammar,
+                grammar_mapping=nodes.grammar_mapping,
+                settings={'parser_engine': engine}
+            ))
+            for engine in ('backtracking', 'predictive')
+        ]
+
+        (_, backtracking), (_, predictive) = parsers
+        expected = outcome(backtracking, tokens)
+        assert outcome(predictive, tokens) == expected, raw_grammar
+
+        report('{} tokens'.format(len(tokens)), [
+            (engine, best_of(lambda: outcome(parser, tokens)))
+            for engine, parser in parsers
+        ])
+        print()
+
+
+def main():
+    packrat()
+    scaling()
+    engines()
+    conflicts()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Measures the cost of profiling the grammars checked by each engine
+"""
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import (
+    load_token_defs,
+    load_raw_grammar,
+    generate_source,
+    best_of,
+    report
+)
+
+
+def main():
+    token_defs = load_token_defs()
+    tokens = Lexer(token_defs).lex(generate_source(40))
+
+    for engine in ('backtracking', 'predictive'):
+        rows = []
+        for label, profile in [('unprofiled', False), ('profiled', True)]:
+            parser = Parser(
+                token_defs=token_defs,
+                raw_grammar=load_raw_grammar(),
+                grammar_mapping=nodes.grammar_mapping,
+                settings={'parser_engine': engine, 'profile': profile}
+            )
+            rows.append((label, best_of(lambda: parser.parse(tokens))))
+
+        report('{}, {} tokens'.format(engine, len(tokens)), rows)
+        print()
+
+
+if __name__ == '__main__':
+    main()
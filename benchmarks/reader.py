@@ -0,0 +1,121 @@
+"""
+Checks that the s-expression reader produces the same ASTs as the grammar
+engine, on both the bundled examples and random sources, and compares
+their speed
+"""
+
+# standard library
+import random
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from tyrian.exceptions import TyrianException
+from . import (
+    load_token_defs,
+    load_raw_grammar,
+    generate_source,
+    best_of,
+    report
+)
+
+VOCABULARY = [
+    '(', ')', '(', ')', '`', '"', '\n',
+    'a', 'b-c', '-', '+', '/', '*', '5', '-7', '12ab', 'x.y'
+]
+
+
+def dump(node):
+    "Returns a comparable representation of an AST node"
+
+    if isinstance(node, list):
+        return ['list', [dump(sub) for sub in node]]
+    elif isinstance(node, nodes.ListNode):
+        return [type(node).__name__, [dump(sub) for sub in node.content]]
+    return [
+        type(node).__name__,
+        repr(node.content),
+        getattr(node, 'line_no', None)
+    ]
+
+
+def outcome(parser, tokens):
+    try:
+        return dump(parser.parse(tokens).content)
+    except (TyrianException, NotImplementedError) as e:
+        # quoted expressions are not yet implemented
+        return type(e).__name__
+
+
+def random_source(rand: random.Random) -> str:
+    words = [
+        rand.choice(VOCABULARY)
+        for _ in range(rand.randint(1, 20))
+    ]
+    source = ' '.join(words)
+    if rand.random() < 0.5:
+        source = '({})'.format(source)
+    return source
+
+
+def parsers(token_defs: dict) -> tuple:
+    return tuple(
+        Parser(
+            token_defs=token_defs,
+            raw_grammar=load_raw_grammar(),
+            grammar_mapping=nodes.grammar_mapping,
+            settings={'parser_engine': engine}
+        )
+        for engine in ('reader', 'backtracking')
+    )
+
+
+def differential(count: int=5000, seed: int=0):
+    """
+    Asserts that the reader and the backtracking grammar engine agree
+    """
+
+    token_defs = load_token_defs()
+    lexer = Lexer(token_defs)
+    reader, backtracking = parsers(token_defs)
+    assert reader.grammar_parser.reader is not None
+
+    sources = [generate_source(1)]
+    rand = random.Random(seed)
+    sources += [random_source(rand) for _ in range(count)]
+
+    outcomes = {}
+    for source in sources:
+        tokens = lexer.lex(source, 'random')
+        expected = outcome(backtracking, tokens)
+        assert outcome(reader, tokens) == expected, source
+
+        key = expected if isinstance(expected, str) else 'parsed'
+        outcomes[key] = outcomes.get(key, 0) + 1
+
+    print('{} sources agree: {}'.format(len(sources), ', '.join(
+        '{} {}'.format(count, key) for key, count in sorted(outcomes.items())
+    )))
+    print()
+
+
+def speed():
+    token_defs = load_token_defs()
+    tokens = Lexer(token_defs).lex(generate_source(40))
+    reader, backtracking = parsers(token_defs)
+
+    report('{} tokens'.format(len(tokens)), [
+        ('backtracking', best_of(lambda: backtracking.parse(tokens))),
+        ('reader', best_of(lambda: reader.parse(tokens)))
+    ])
+    print()
+
+
+def main():
+    differential()
+    speed()
+
+
+if __name__ == '__main__':
+    main()
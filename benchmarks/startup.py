@@ -0,0 +1,50 @@
+"""
+Compares building the lexer and parser from the Grammar against loading
+them from the grammar cache, as done when constructing Tyrian
+"""
+
+# standard library
+import os
+import tempfile
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from tyrian.grammar_cache import GrammarCache, grammar_digest
+from . import load_token_defs, load_raw_grammar, best_of, report
+
+
+def main():
+    token_defs = load_token_defs()
+    raw_grammar = load_raw_grammar()
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings = {
+            'generated_parser': os.path.join(directory, 'Grammar_parser.py')
+        }
+
+        def build():
+            return Lexer(token_defs), Parser(
+                token_defs=token_defs,
+                raw_grammar=raw_grammar,
+                grammar_mapping=nodes.grammar_mapping,
+                settings=settings
+            )
+
+        cache = GrammarCache(os.path.join(directory, 'Grammar.cache'))
+        digest = grammar_digest(raw_grammar, token_defs, settings)
+        cache.store(digest, *build())
+
+        def load():
+            digest = grammar_digest(raw_grammar, token_defs, settings)
+            assert cache.load(digest) is not None
+
+        report('startup', [
+            ('build from the Grammar', best_of(build, repeat=20)),
+            ('load from the grammar cache', best_of(load, repeat=20))
+        ])
+
+
+if __name__ == '__main__':
+    main()
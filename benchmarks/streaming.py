@@ -0,0 +1,59 @@
+"""
+Compares parsing a whole file into an AST against streaming its top level
+forms through Parser.iter_parse, in time and in peak memory
+"""
+
+# standard library
+import io
+import tracemalloc
+
+# application specific
+from tyrian import nodes
+from tyrian.lexer import Lexer
+from tyrian.typarser import Parser
+from . import load_token_defs, load_raw_grammar, generate_source, best_of
+
+
+def peak_memory(func) -> int:
+    "Returns the peak memory traced whilst running func"
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    token_defs = load_token_defs()
+    lexer = Lexer(token_defs)
+    source = generate_source(40)
+
+    parser = Parser(
+        token_defs=token_defs,
+        raw_grammar=load_raw_grammar(),
+        grammar_mapping=nodes.grammar_mapping
+    )
+
+    def whole():
+        return parser.parse(lexer.lex(source, 'whole')).content
+
+    def streamed():
+        # forms are dropped as soon as they are counted, as they would be
+        # once compiled
+        tokens = lexer.lex_stream(io.StringIO(source), 'streamed')
+        return sum(1 for _ in parser.iter_parse(tokens))
+
+    assert len(whole()) == streamed()
+
+    print('{} forms'.format(streamed()))
+    print('{:<16} {:>12} {:>12}'.format('', 'seconds', 'peak KB'))
+    for label, func in [('parse', whole), ('iter_parse', streamed)]:
+        print('{:<16} {:>12.4f} {:>12.1f}'.format(
+            label, best_of(func), peak_memory(func) / 1024))
+
+
+if __name__ == '__main__':
+    main()
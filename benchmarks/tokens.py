@@ -0,0 +1,71 @@
+"""
+Compares the memory used by a TokenBuffer against a list of token dicts,
+and that used when lexing a file read into memory against a memory mapped one
+"""
+
+# standard library
+import os
+import tempfile
+import tracemalloc
+
+# application specific
+from tyrian.lexer import Lexer
+from .lexer import DictScanLexer
+from . import load_token_defs, generate_source
+
+
+def measure(func) -> tuple:
+    """
+    Returns the result of func, along with the memory it allocated
+    and still held on return
+    """
+
+    tracemalloc.start()
+    try:
+        result = func()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def main():
+    token_defs = load_token_defs()
+    lexer, dict_scan = Lexer(token_defs), DictScanLexer(token_defs)
+
+    for copies in (100, 1000):
+        content = generate_source(copies)
+
+        tokens, buffer_size = measure(lambda: lexer.lex(content, 'bench'))
+        _, dict_size = measure(lambda: dict_scan.lex(content, 'bench'))
+
+        print('{} tokens'.format(len(tokens)))
+        print('{:<40} {:>10.1f}MB'.format('list of dicts', dict_size / 2**20))
+        print('{:<40} {:>10.1f}MB'.format('TokenBuffer', buffer_size / 2**20))
+        print('{:<40} {:>10.1f}'.format(
+            'bytes per token, list of dicts', dict_size / len(tokens)))
+        print('{:<40} {:>10.1f}'.format(
+            'bytes per token, TokenBuffer', buffer_size / len(tokens)))
+        print()
+
+        with tempfile.NamedTemporaryFile('w', delete=False) as fh:
+            fh.write(content)
+
+        def read_and_lex():
+            with open(fh.name) as source:
+                return lexer.lex(source.read(), fh.name)
+
+        try:
+            _, read_size = measure(read_and_lex)
+            mapped, mmap_size = measure(lambda: lexer.lex_mmap(fh.name))
+            mapped.close()
+        finally:
+            os.unlink(fh.name)
+
+        print('{:<40} {:>10.1f}MB'.format('read and lex', read_size / 2**20))
+        print('{:<40} {:>10.1f}MB'.format('lex_mmap', mmap_size / 2**20))
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""
+Compact representation of parse trees
+"""
+
+# standard library
+from array import array
+
+# application specific
+from .nodes import AST, Node
+
+__all__ = ['ASTArena', 'NodeView', 'NodeTree', 'KINDS']
+
+# kinds of node, indexed by kind id
+KINDS = ('list', 'id', 'number', 'string', 'symbol')
+LIST = KINDS.index('list')
+
+_REPRS = {
+    'id': '<IDNode content="{}">',
+    'number': '<NumberNode content={}>',
+    'string': '<StringNode content="{}">',
+    'symbol': '<SymbolNode content="{}">'
+}
+
+
+class ASTArena(AST):
+    """
+    Stores the nodes of an :py:class:`AST <tyrian.nodes.AST>` as parallel
+    arrays of kind ids, the indices of the first child and next sibling of
+    each node, line numbers, and indices into a list of atoms, rather than
+    as an object per node. Atoms of the same kind and token text share an
+    entry, which is kept undecoded until its value is first asked for.
+
+    Lists take the line number of the first atom after their opening
+    bracket, lacking one of their own. An index of -1 stands for no node.
+
+    The ``content`` of an ASTArena is a list of :py:class:`NodeView`'s of
+    the top level forms, such that it may be used as any other AST;
+    :py:meth:`children`, :py:meth:`kind` and friends walk the arrays
+    without creating any objects, as does the
+    :py:class:`Compiler <tyrian.compiler.Compiler>`
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.first_children = array('l')
+        self.next_siblings = array('l')
+        self.line_nos = array('l')
+        self.atom_ids = array('l')
+        self.roots = array('l')
+
+        # the value of each atom, and the Node it is yet to be decoded from
+        self.atoms = []
+        self.raw_atoms = []
+
+        self._atom_index = {}
+
+    @classmethod
+    def from_forms(cls, forms):
+        """
+        Builds an ASTArena from an iterable of top level Nodes, such as
+        from :py:meth:`Parser.iter_parse <tyrian.typarser.Parser.iter_parse>`
+
+        :param forms: iterable of top level Nodes
+        """
+
+        arena = cls()
+        arena.extend(forms)
+        return arena
+
+    @classmethod
+    def from_ast(cls, ast: AST):
+        "Builds an ASTArena holding the nodes of an AST"
+        return cls.from_forms(ast.content)
+
+    def extend(self, forms):
+        "Appends each of an iterable of top level Nodes"
+        for form in forms:
+            self.append(form)
+
+    def append(self, form: Node) -> int:
+        """
+        Appends a top level Node and everything within it, returning its
+        index
+
+        :param form: Node to append
+        """
+
+        root = len(self.kinds)
+        self.roots.append(root)
+
+        # the last child appended to each list, and the lists still without
+        # a line number
+        last_children = {}
+        unlined = []
+
+        # nodes are appended depth first, so the nodes of each form, and of
+        # each list within it, are contiguous
+        stack = [(form, -1)]
+        while stack:
+            node, parent = stack.pop()
+            index = len(self.kinds)
+
+            if parent != -1:
+                previous = last_children.get(parent, -1)
+                if previous == -1:
+                    self.first_children[parent] = index
+                else:
+                    self.next_siblings[previous] = index
+                last_children[parent] = index
+
+            kind = getattr(node, 'kind', None)
+            if kind not in KINDS:
+                raise TypeError('Cannot store {!r}'.format(node))
+
+            self.kinds.append(KINDS.index(kind))
+            self.first_children.append(-1)
+            self.next_siblings.append(-1)
+
+            if kind == 'list':
+                self.line_nos.append(-1)
+                self.atom_ids.append(-1)
+                unlined.append(index)
+                stack.extend((sub, index) for sub in reversed(node.content))
+            else:
+                self.line_nos.append(node.line_no)
+                self.atom_ids.append(self.atom_id(node))
+                for list_index in unlined:
+                    self.line_nos[list_index] = node.line_no
+                unlined = []
+
+        return root
+
+    def atom_id(self, node: Node) -> int:
+        """
+        Returns the index of the atom of a Node, adding it if need be; a
+        Node yet to decode its content is stored as is, and keyed by the
+        text of its token, such that nothing is decoded here
+        """
+
+        text = getattr(getattr(node, 'tree', None), 'text', None)
+        if text is None:
+            key = node.kind, 'value', node.content
+        else:
+            key = node.kind, 'text', text
+
+        atom_id = self._atom_index.get(key)
+        if atom_id is None:
+            atom_id = self._atom_index[key] = len(self.atoms)
+            if text is None:
+                self.atoms.append(node.content)
+                self.raw_atoms.append(None)
+            else:
+                self.atoms.append(None)
+                self.raw_atoms.append(node)
+        return atom_id
+
+    def kind(self, index: int) -> str:
+        "Returns the kind of the node at index, one of KINDS"
+        return KINDS[self.kinds[index]]
+
+    def is_list(self, index: int) -> bool:
+        "Whether the node at index is a list"
+        return self.kinds[index] == LIST
+
+    def value(self, index: int):
+        "Returns the content of the atom at index, decoding it if need be"
+
+        atom_id = self.atom_ids[index]
+        raw = self.raw_atoms[atom_id]
+        if raw is not None:
+            self.atoms[atom_id] = raw.content
+            self.raw_atoms[atom_id] = None
+        return self.atoms[atom_id]
+
+    def line_no(self, index: int) -> int:
+        "Returns the line number of the node at index"
+        return self.line_nos[index]
+
+    def children(self, index: int):
+        "Yields the indices of the children of the list at index"
+
+        child = self.first_children[index]
+        while child != -1:
+            yield child
+            child = self.next_siblings[child]
+
+    def first_child(self, index: int) -> int:
+        "Returns the index of the first child of the list at index"
+
+        child = self.first_children[index]
+        if child == -1:
+            raise IndexError('{} has no children'.format(
+                self.describe(index)))
+        return child
+
+    def view(self, index: int):
+        "Returns a :py:class:`NodeView` of the node at index"
+        return NodeView(self, index)
+
+    @property
+    def content(self) -> list:
+        return [NodeView(self, root) for root in self.roots]
+
+    def describe(self, index: int) -> str:
+        "Returns the node at index as its Node would be represented"
+
+        kind = self.kind(index)
+        if kind == 'list':
+            return '<LN len(content)=={}>'.format(
+                sum(1 for _ in self.children(index)))
+        return _REPRS[kind].format(self.value(index))
+
+    def pprint(self) -> str:
+        """
+        Returns the same text as :py:meth:`AST.pprint <tyrian.nodes.AST.pprint>`
+        would of the Nodes stored
+        """
+
+        name = '<list len={}>'.format(len(self.roots))
+        lines = [name]
+
+        # each entry is either the index of a node and its indent, or a
+        # closing line
+        stack = [(None, 0, '</{}>'.format(name[1:-1]))]
+        stack.extend((root, 1, None) for root in reversed(self.roots))
+        while stack:
+            index, indent, closing = stack.pop()
+            if closing is not None:
+                lines.append(closing)
+                continue
+
+            if not self.is_list(index):
+                lines.append(
+                    '{}{}'.format('\t' * indent, self.describe(index)))
+                continue
+
+            children = list(self.children(index))
+            name = '<LN len(content)=={}>'.format(len(children))
+            lines.append('{}{}'.format('\t' * indent, name))
+
+            stack.append((
+                None,
+                indent,
+                '{}</{}>'.format('\t' * indent, name[1:-1])
+            ))
+            stack.extend(
+                (child, indent + 1, None) for child in reversed(children))
+
+        return '\n'.join(lines)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __repr__(self) -> str:
+        return '<ASTArena forms={} nodes={}>'.format(
+            len(self.roots), len(self))
+
+
+class NodeView(Node):
+    """
+    A view of a single node of an :py:class:`ASTArena`, standing in for its
+    Node; the ``content`` of a list is a list of NodeView's of its children,
+    and that of an atom is its value
+
+    :param arena: ASTArena holding the node
+    :param index: index of the node
+    """
+    __slots__ = ('arena', 'index')
+
+    def __init__(self, arena: ASTArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def kind(self) -> str:
+        return self.arena.kind(self.index)
+
+    @property
+    def content(self):
+        arena, index = self.arena, self.index
+        if arena.is_list(index):
+            return [NodeView(arena, child) for child in arena.children(index)]
+        return arena.value(index)
+
+    @property
+    def line_no(self) -> int:
+        return self.arena.line_no(self.index)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, NodeView) and
+            self.arena is other.arena and
+            self.index == other.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.arena), self.index))
+
+    def __repr__(self) -> str:
+        return self.arena.describe(self.index)
+
+
+class NodeTree(object):
+    """
+    Walks Nodes with the same methods an :py:class:`ASTArena` walks its
+    arrays with, taking Nodes rather than indices, such that the
+    :py:class:`Compiler <tyrian.compiler.Compiler>` walks either alike
+    """
+
+    def kind(self, node: Node) -> str:
+        return node.kind
+
+    def value(self, node: Node):
+        return node.content
+
+    def line_no(self, node: Node) -> int:
+        return node.line_no
+
+    def children(self, node: Node) -> list:
+        return node.content
+
+    def first_child(self, node: Node) -> Node:
+        return node.content[0]
+
+    def describe(self, node: Node) -> str:
+        return repr(node)
+
+
+NODE_TREE = NodeTree()
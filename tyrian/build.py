@@ -0,0 +1,214 @@
+"""
+Compiles directory trees of lisp files in a pool of processes
+"""
+
+# standard library
+import os
+import time
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# application specific
+from .utils import logger
+from .tyrian import Tyrian
+
+logger = logger.getChild('BatchBuilder')
+
+__all__ = ['BatchBuilder', 'find_sources']
+
+SOURCE_EXTENSION = '.lisp'
+OUTPUT_EXTENSION = '.pyc'
+
+# the settings and Tyrian instance of each worker process
+_worker = None
+
+
+def find_sources(source_dir: str) -> list:
+    """
+    Returns the path of each lisp file within source_dir, relative to it,
+    in sorted order
+    """
+
+    found = []
+    for directory, subdirectories, filenames in os.walk(source_dir):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(SOURCE_EXTENSION):
+                found.append(os.path.relpath(
+                    os.path.join(directory, filename), source_dir))
+    return found
+
+
+def _get_worker(settings: dict) -> Tyrian:
+    """
+    Returns the Tyrian of the worker process, only building it the first
+    time the worker is sent the settings; as the executor only takes an
+    initializer as of python 3.7, workers set themselves up as they go
+    """
+
+    global _worker
+    if _worker is None or _worker[0] != settings:
+        _worker = settings, Tyrian(settings)
+    return _worker[1]
+
+
+def _build_file(settings: dict,
+                input_filename: str,
+                output_filename: str) -> tuple:
+    """
+    Compiles a single file with the Tyrian of the worker, by way of its
+    compile cache, if any, returning the number of tokens compiled, none on
+    a cache hit, and the error raised, if any; any error is
+    caught, be it a syntax error, something the compiler does not support
+    yet, or a file that could not be read or written, such that a single
+    file never stops the rest of the build
+    """
+
+    temp_filename = '{}.{}.tmp'.format(output_filename, os.getpid())
+
+    try:
+        inst = _get_worker(settings)
+
+        tokens_compiled = inst.tokens_compiled
+        code = inst.compile_code(input_filename)
+        tokens = inst.tokens_compiled - tokens_compiled
+
+        directory = os.path.dirname(output_filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # write then rename, so that others never see a partial file
+        with open(temp_filename, 'wb') as fh:
+            inst.compiler.write_code_to_file(code, fh, input_filename)
+        os.replace(temp_filename, output_filename)
+
+    except Exception as e:
+        logger.debug('Failed to compile %s', input_filename, exc_info=True)
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        message = str(e)
+        if message:
+            return 0, '{}: {}'.format(type(e).__name__, message)
+        return 0, type(e).__name__
+
+    return tokens, None
+
+
+class BatchBuilder(object):
+    """
+    Compiles each lisp file within a source directory to a ``.pyc`` file at
+    the same relative path within an output directory, much as
+    ``compileall`` does for python; each worker process holds a single
+    :py:class:`Tyrian <tyrian.tyrian.Tyrian>`, such that the grammars are
+    only set up once per worker.
+
+    Files whose output is at least as new as they are are skipped, unless
+    forced
+
+    :param settings: settings for the Tyrian of each worker
+    :param jobs: number of worker processes, or zero for one per cpu
+    :param force: whether to compile files even if up to date
+    """
+
+    def __init__(self, settings: dict=None, jobs: int=1, force: bool=False):
+        self.settings = settings or {}
+        self.jobs = jobs or multiprocessing.cpu_count()
+        self.force = force
+
+    def output_filename(self, output_dir: str, source: str) -> str:
+        "Returns where the source, relative to its directory, is compiled to"
+
+        base, _ = os.path.splitext(source)
+        return os.path.join(output_dir, base + OUTPUT_EXTENSION)
+
+    def is_up_to_date(self, input_filename: str, output_filename: str) -> bool:
+        "Whether the output is at least as new as the input"
+
+        try:
+            output_mtime = os.stat(output_filename).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        return output_mtime >= os.stat(input_filename).st_mtime_ns
+
+    def build(self, source_dir: str, output_dir: str) -> OrderedDict:
+        """
+        Compiles the lisp files within source_dir into output_dir, returning
+        a summary of the files compiled, skipped and failed, the tokens
+        lexed, and the time taken
+
+        :param source_dir: directory to search for lisp files
+        :param output_dir: directory to write ``.pyc`` files to
+        """
+
+        start = time.perf_counter()
+
+        pending, skipped = [], 0
+        for source in find_sources(source_dir):
+            input_filename = os.path.join(source_dir, source)
+            output_filename = self.output_filename(output_dir, source)
+
+            if not self.force and self.is_up_to_date(
+                    input_filename, output_filename):
+                skipped += 1
+            else:
+                pending.append((input_filename, output_filename))
+
+        logger.info('Compiling {} files with {} workers, {} up to date'.format(
+            len(pending), self.jobs, skipped))
+
+        if not pending:
+            results = []
+
+        elif self.jobs < 2 or len(pending) < 2:
+            # not worth starting any processes for
+            results = [
+                _build_file(self.settings, *filenames)
+                for filenames in pending
+            ]
+
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=min(self.jobs, len(pending))) as executor:
+                results = list(executor.map(
+                    _build_file,
+                    [self.settings] * len(pending),
+                    *zip(*pending)
+                ))
+
+        failed = OrderedDict(
+            (input_filename, error)
+            for (input_filename, _), (_, error) in zip(pending, results)
+            if error is not None
+        )
+
+        return OrderedDict([
+            ('compiled', len(pending) - len(failed)),
+            ('skipped', skipped),
+            ('failed', failed),
+            ('tokens', sum(tokens for tokens, _ in results)),
+            ('seconds', time.perf_counter() - start)
+        ])
+
+    def format(self, summary: dict) -> str:
+        """
+        Returns the summary returned by :py:meth:`build` as text, with the
+        throughput in files and tokens per second
+        """
+
+        seconds = max(summary['seconds'], 1e-9)
+        lines = [
+            '{}: {}'.format(input_filename, error)
+            for input_filename, error in summary['failed'].items()
+        ]
+        lines.append(
+            'Compiled {} files, {} up to date, {} failed, in {:.2f}s; '
+            '{:.1f} files/s, {:.0f} tokens/s'.format(
+                summary['compiled'],
+                summary['skipped'],
+                len(summary['failed']),
+                summary['seconds'],
+                summary['compiled'] / seconds,
+                summary['tokens'] / seconds
+            ))
+        return '\n'.join(lines)
@@ -3,10 +3,20 @@ Simple command line interface to Tyrian.
 call like so;
 
 python cli.py <options>
+
+or, to report on the cost of parsing with a grammar;
+
+python cli.py grammar-report <options>
+
+or, to compile every lisp file in a directory tree;
+
+python cli.py build <source dir> <output dir> -j <jobs>
 """
 
 # standard library
+import os
 import sys
+import json
 import logging
 from dis import dis
 
@@ -24,7 +34,23 @@ _verbosity_map = [
 ]
 
 
-def main():
+def add_verbosity(parser):
+    parser.add_argument(
+        '-v', '--verbose', action='count', default=0,
+        help="controls verbosity. Must be used a few times to lower the \
+              barrier to the interesting stuff")
+
+
+def set_verbosity(args) -> int:
+    verbosity = 5 - args.verbose
+
+    assert verbosity in range(0, 6), 'Bad verbosity'
+
+    logger.setLevel(_verbosity_map[verbosity][0])
+    return _verbosity_map[verbosity][0]
+
+
+def compile_file(argv: list):
     import argparse
     parser = argparse.ArgumentParser(
         description='Tyrian is a lisp to python bytecode compiler')
@@ -33,31 +59,163 @@ def main():
         'input_filename', type=str, help="input filename containing LISP")
     parser.add_argument(
         'output_filename', type=str, help="file to write bytecode to")
-
     parser.add_argument(
-        '-v', '--verbose', action='count', default=0,
-        help="controls verbosity. Must be used a few times to lower the \
-              barrier to the interesting stuff")
+        '--cache', type=str,
+        help="file to cache compiled code in, such that unchanged files \
+              need not be compiled again")
 
-    args = parser.parse_args()
-    verbosity = 5 - args.verbose
+    add_verbosity(parser)
 
-    assert verbosity in range(0, 6), 'Bad verbosity'
+    args = parser.parse_args(argv)
+    level = set_verbosity(args)
 
-    logger.setLevel(_verbosity_map[verbosity][0])
+    inst = Tyrian({'compile_cache': args.cache} if args.cache else None)
+    code = inst.compile_code(args.input_filename)
 
-    inst = Tyrian()
-    bytecode = inst.compile(args.input_filename)
+    if level <= logging.INFO:
+        dis(code)
 
-    if _verbosity_map[verbosity][0] <= logging.INFO:
-        dis(bytecode.code())
+    if inst.compile_cache is not None:
+        logger.info('Compile cache: {}'.format(', '.join(
+            '{} {}'.format(value, name)
+            for name, value in inst.compile_cache.stats().items()
+        )))
 
     logger.info('Writing to file...')
     with open(args.output_filename, 'wb') as fh:
-        inst.compiler.write_code_to_file(
-            bytecode.code(),
-            fh, args.input_filename)
+        inst.compiler.write_code_to_file(code, fh, args.input_filename)
+
+
+def grammar_report(argv: list):
+    import argparse
+    from . import nodes
+    from .lexer import Lexer
+    from .typarser import Parser
+    from .typarser.grammar_parser.report import GrammarReport
+    from .typarser.grammar_parser.profiler import ParseProfiler
+
+    resources = os.path.join(os.path.dirname(__file__), 'Grammar')
+
+    parser = argparse.ArgumentParser(
+        prog='tyrian grammar-report',
+        description='Reports on the cost of parsing with a grammar')
+
+    parser.add_argument(
+        '--grammar', type=str, default=os.path.join(resources, 'Grammar'),
+        help="grammar to report on, defaulting to the bundled Grammar")
+    parser.add_argument(
+        '--tokens', type=str, default=os.path.join(resources, 'tokens.json'),
+        help="token definitions, defaulting to the bundled definitions")
+    parser.add_argument(
+        '--sample', type=str,
+        help="file to parse, counting the checks of each rule")
+    parser.add_argument(
+        '--json', action='store_true', help="report as JSON")
+    parser.add_argument(
+        '--profile-json', type=str,
+        help="file to write the profile of the sample to, as JSON")
+    parser.add_argument(
+        '--collapsed', type=str,
+        help="file to write the profile of the sample to, as collapsed \
+              stacks for flamegraph.pl")
+
+    add_verbosity(parser)
+
+    args = parser.parse_args(argv)
+    set_verbosity(args)
+
+    with open(args.tokens) as fh:
+        token_defs = json.load(fh)
+    with open(args.grammar) as fh:
+        raw_grammar = fh.read()
+
+    # the grammar trees are checked as written, rather than as read,
+    # generated or optimised
+    lisp_parser = Parser(
+        token_defs=token_defs,
+        raw_grammar=raw_grammar,
+        grammar_mapping=nodes.grammar_mapping,
+        settings={'parser_engine': 'backtracking', 'optimise_grammars': False}
+    )
+    report = GrammarReport(lisp_parser.grammar_parser)
+
+    sample = None
+    if args.sample:
+        with open(args.sample) as fh:
+            tokens = Lexer(token_defs).lex(fh.read(), args.sample)
+        profiler = ParseProfiler()
+        sample = report.run_sample(lisp_parser, tokens, profiler)
+
+        if args.profile_json:
+            with open(args.profile_json, 'w') as fh:
+                fh.write(profiler.to_json())
+        if args.collapsed:
+            with open(args.collapsed, 'w') as fh:
+                fh.write(profiler.to_collapsed())
+
+    if args.json:
+        print(json.dumps({
+            'rules': report.as_dict(),
+            'sample': sample
+        }, indent=4))
+    else:
+        print(report.format(sample))
+
+
+def build(argv: list) -> int:
+    import argparse
+    from .build import BatchBuilder
+
+    parser = argparse.ArgumentParser(
+        prog='tyrian build',
+        description='Compiles every lisp file within a directory tree')
+
+    parser.add_argument(
+        'source_dir', type=str, help="directory to search for lisp files")
+    parser.add_argument(
+        'output_dir', type=str, help="directory to write bytecode to")
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help="number of worker processes, or zero for one per cpu")
+    parser.add_argument(
+        '-f', '--force', action='store_true',
+        help="compile files even if their bytecode is up to date")
+    parser.add_argument(
+        '--cache', type=str,
+        help="file to cache compiled code in, such that unchanged files \
+              need not be compiled again, even when their bytecode is not \
+              up to date")
+
+    add_verbosity(parser)
+
+    args = parser.parse_args(argv)
+    set_verbosity(args)
+
+    builder = BatchBuilder(
+        settings={'compile_cache': args.cache},
+        jobs=args.jobs,
+        force=args.force
+    )
+    summary = builder.build(args.source_dir, args.output_dir)
+
+    print(builder.format(summary))
+    return 1 if summary['failed'] else 0
+
+
+COMMANDS = {
+    'grammar-report': grammar_report,
+    'build': build
+}
+
+
+def main(argv: list=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    return compile_file(argv)
 
 
 if __name__ == '__main__':
-    main(sys.argv)
+    sys.exit(main())
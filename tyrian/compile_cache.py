@@ -0,0 +1,260 @@
+"""
+Persistent cache of compiled code objects, keyed by the source compiled
+and everything else that goes into compiling it
+"""
+
+# standard library
+import os
+import sys
+import json
+import time
+import marshal
+import sqlite3
+import hashlib
+from types import CodeType
+from collections import OrderedDict
+
+# application specific
+from . import __version__
+from .utils import logger
+from .grammar_cache import PICKLED_MODULES
+
+logger = logger.getChild('CompileCache')
+
+__all__ = ['CompileCache', 'compile_digest']
+
+# bump whenever the format of the cache changes
+CACHE_VERSION = 1
+
+# 64MB of marshalled code
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# modules deciding what the compiled code looks like; those deciding what
+# is parsed, as cached by the GrammarCache, and those walking what was
+# parsed into code. The assembler is stamped as well, see compile_digest
+COMPILER_MODULES = PICKLED_MODULES + ['compiler.py', 'arena.py']
+
+
+def compile_digest(raw_grammar: str, token_defs: dict) -> str:
+    """
+    Returns a hash of everything bar the source that goes into compiling a
+    file; the grammar, the token definitions, the functions of the lisp
+    runtime injected into every file, the modules of the lexer, parser,
+    compiler and assembler, and the versions of tyrian and python
+
+    :param raw_grammar: contents of the Grammar file
+    :param token_defs: token definitions
+    """
+
+    from .lisp_runtime.registry import lisp_registry
+    from peak.util import assembler
+
+    runtime = hashlib.sha1()
+    for name in sorted(lisp_registry):
+        runtime.update(name.encode('utf-8') + b'\0')
+        runtime.update(marshal.dumps(lisp_registry[name].__code__))
+
+    modules = [
+        (module, os.path.join(PACKAGE_DIR, module))
+        for module in COMPILER_MODULES
+    ]
+    modules.append((assembler.__name__, assembler.__file__))
+
+    compiler = []
+    for module, filename in modules:
+        stat = os.stat(filename)
+        compiler.append([module, stat.st_mtime_ns, stat.st_size])
+
+    content = json.dumps(
+        {
+            'cache_version': CACHE_VERSION,
+            'tyrian_version': __version__,
+            'python_version': sys.version_info[:2],
+            'compiler': compiler,
+            'runtime': runtime.hexdigest(),
+            'grammar': raw_grammar,
+            'tokens': token_defs
+        },
+        sort_keys=True
+    )
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class CompileCache(object):
+    """
+    Keeps marshalled code objects in a single SQLite file, keyed by
+    :py:meth:`key`, such that unchanged files need not be lexed, parsed or
+    compiled again.
+
+    Once the marshalled code exceeds max_size bytes, the least recently used
+    entries are evicted. Failure to read or write the cache is logged rather
+    than raised, as the cache is merely an optimisation
+
+    :param filename: path to the SQLite file
+    :param max_size: bytes of marshalled code to keep at most
+    """
+
+    def __init__(self, filename: str, max_size: int=DEFAULT_MAX_SIZE):
+        self.filename = filename
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._connection = None
+        self._pid = None
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection to the SQLite file, creating the file should
+        it not exist; a connection is never shared with a forked process
+        """
+
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.filename, timeout=30)
+            self._pid = os.getpid()
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS code ('
+                'key TEXT PRIMARY KEY, '
+                'marshalled BLOB NOT NULL, '
+                'size INTEGER NOT NULL, '
+                'last_used REAL NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS code_last_used '
+                'ON code (last_used)')
+            self._connection.commit()
+        return self._connection
+
+    def key(self, source: bytes, filename: str, digest: str) -> str:
+        """
+        Returns the key of a source file; the filename is part of the key,
+        as it is baked into the code object
+
+        :param source: contents of the file
+        :param filename: absolute path of the file
+        :param digest: as returned by :py:func:`compile_digest`
+        """
+
+        key = hashlib.sha1(source)
+        key.update(b'\0' + filename.encode('utf-8'))
+        key.update(b'\0' + digest.encode('ascii'))
+        return key.hexdigest()
+
+    def load(self, key: str) -> CodeType:
+        """
+        Returns the cached code object, or None, counting the hit or miss
+
+        :param key: as returned by :py:meth:`key`
+        """
+
+        try:
+            connection = self.connection()
+            row = connection.execute(
+                'SELECT marshalled FROM code WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is not None:
+                code = marshal.loads(row[0])
+                with connection:
+                    connection.execute(
+                        'UPDATE code SET last_used = ? WHERE key = ?',
+                        (time.time(), key))
+
+        except (sqlite3.Error, ValueError, EOFError, TypeError) as e:
+            logger.warning('Could not read compile cache: {!r}'.format(e))
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return code
+
+    def store(self, key: str, code: CodeType):
+        """
+        Writes a code object to the cache, evicting the least recently used
+        entries should the cache have grown too large
+
+        :param key: as returned by :py:meth:`key`
+        :param code: code object to cache
+        """
+
+        marshalled = marshal.dumps(code)
+        if len(marshalled) > self.max_size:
+            return
+
+        try:
+            connection = self.connection()
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO code VALUES (?, ?, ?, ?)',
+                    (key, marshalled, len(marshalled), time.time()))
+                self.evict(connection)
+
+        except sqlite3.Error as e:
+            logger.warning('Could not write compile cache: {!r}'.format(e))
+
+    def evict(self, connection: sqlite3.Connection):
+        """
+        Deletes the least recently used entries until the marshalled code
+        fits within max_size
+        """
+
+        excess = self.size(connection) - self.max_size
+        if excess <= 0:
+            return
+
+        evicted = []
+        rows = connection.execute(
+            'SELECT key, size FROM code ORDER BY last_used').fetchall()
+        for key, size in rows:
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+
+        connection.executemany('DELETE FROM code WHERE key = ?', evicted)
+        logger.info('Evicted {} entries from the compile cache'.format(
+            len(evicted)))
+
+    def size(self, connection: sqlite3.Connection=None) -> int:
+        "Returns the number of bytes of marshalled code in the cache"
+
+        connection = connection or self.connection()
+        return connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM code').fetchone()[0]
+
+    def clear(self):
+        "Deletes every entry, and resets the counters"
+
+        connection = self.connection()
+        with connection:
+            connection.execute('DELETE FROM code')
+        self.hits = self.misses = 0
+
+    def stats(self) -> OrderedDict:
+        "Returns the hit and miss counts, and the size of the cache"
+
+        connection = self.connection()
+        return OrderedDict([
+            ('hits', self.hits),
+            ('misses', self.misses),
+            ('entries', connection.execute(
+                'SELECT COUNT(*) FROM code').fetchone()[0]),
+            ('size', self.size(connection))
+        ])
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __getstate__(self) -> dict:
+        # connections cannot be pickled
+        state = dict(self.__dict__)
+        state['_connection'] = state['_pid'] = None
+        return state
@@ -1,21 +1,14 @@
 # standard libary
 import os
 import types
+import logging
 import marshal
 from types import CodeType
-from py_compile import wr_long, MAGIC
 
 # application specific
-from .nodes import (
-    Node,
-    IDNode,
-    SymbolNode,
-    ListNode,
-    NumberNode,
-    StringNode,
-    AST
-)
-from .utils import logger, enforce_types
+from .nodes import Node, AST
+from .arena import NodeView, NODE_TREE
+from .utils import logger, enforce_types, pyc_header
 
 # third party
 from peak.util.assembler import (
@@ -30,7 +23,14 @@ logger = logger.getChild('Compiler')
 
 class Compiler(object):
     """
-    Handles compilation of :py:class:`AST <tyrian.nodes.AST>`'s
+    Handles compilation of :py:class:`AST <tyrian.nodes.AST>`'s, including
+    :py:class:`ASTArena <tyrian.arena.ASTArena>`'s.
+
+    Nodes are walked by way of a tree; either the
+    :py:class:`NodeTree <tyrian.arena.NodeTree>`, the elements being Nodes,
+    or the ASTArena a :py:class:`NodeView <tyrian.arena.NodeView>` belongs
+    to, the elements being indices into its arrays, such that no views are
+    created below the top level forms
     """
 
     def __init__(self):
@@ -47,6 +47,24 @@ class Compiler(object):
         :rtype: Code
         """
 
+        assert isinstance(parse_tree, AST)
+
+        return self.compile_forms(filename, parse_tree.content)
+
+    @enforce_types
+    def compile_forms(self, filename: str, forms) -> Code:
+        """
+        Takes a filename and an iterable of top level Nodes, such as from \
+        :py:meth:`Parser.iter_parse <tyrian.typarser.Parser.iter_parse>`, \
+        and returns a BytecodeAssembler Code object.
+
+        Each form is compiled as it arrives, and may be discarded thereafter
+
+        :param filename: filename of file to compile
+        :param forms: iterable of top level Nodes to compile
+        :rtype: Code
+        """
+
         filename = os.path.abspath(filename)
 
         line_no = -1
@@ -57,98 +75,137 @@ class Compiler(object):
         line_no += 1
 
         code.co_filename = filename
-        line_no, code = self.compile_parse_tree_internal(
-            codeobject=code,
-            parse_tree=parse_tree,
-            line_no=line_no,
-            filename=filename
-        )
+        for element in forms:
+            tree = NODE_TREE
+            if isinstance(element, NodeView):
+                tree, element = element.arena, element.index
 
-
-        code.return_(None)
-        return code
-
-    @enforce_types
-    def compile_parse_tree_internal(self,
-                                    codeobject: Code,
-                                    parse_tree: AST,
-                                    line_no: int,
-                                    filename: str) -> tuple:
-        """
-        Compiles a single AST
-
-        :param codeobject: Code instance to output opcodes to
-        :param parse_tree: parse_tree to compile
-        :param line_no: current line number
-        :rtype: tuple
-        """
-        assert isinstance(parse_tree, AST)
-
-        for element in parse_tree.content:
-            line_no, codeobject = self.compile_single(
-                codeobject=codeobject,
+            line_no, code = self.compile_single(
+                codeobject=code,
                 filename=filename,
                 element=element,
                 line_no=line_no,
                 result_required=False,
-                scope=[]
+                scope=[],
+                tree=tree
             )
 
-        return line_no, codeobject
+        code.return_(None)
+        return code
 
     @enforce_types
     def compile_single(self,
                        codeobject: Code,
                        filename: str,
-                       element: Node,
+                       element: (Node, int),
                        line_no: int,
                        result_required: bool,
-                       scope: list) -> tuple:
+                       scope: list,
+                       tree: object=NODE_TREE) -> tuple:
+        """
+        compiles a single Node, along with any calls nested within it
+
+        :param element: Node, or index of a node within the tree
+        :param tree: tree to walk the element with, see :py:class:`Compiler`
         """
-        compiles a single Node
+
+        return self.run_steps(self.compile_single_steps(
+            codeobject=codeobject,
+            filename=filename,
+            element=element,
+            line_no=line_no,
+            result_required=result_required,
+            scope=scope,
+            tree=tree
+        ))
+
+    def run_steps(self, steps) -> tuple:
+        """
+        Runs the steps of compiling a Node to completion.
+
+        Whenever the steps yield the arguments for compiling a nested Node,
+        the steps of that Node are run first, and their result sent back;
+        these are kept on an explicit stack rather than recursing, such that
+        the nesting depth is limited only by memory
+
+        :param steps: generator, as from :py:meth:`compile_single_steps`
+        """
+
+        stack = [steps]
+        returned = None
+
+        while stack:
+            try:
+                arguments = stack[-1].send(returned)
+            except StopIteration as e:
+                stack.pop()
+                returned = e.value
+            else:
+                stack.append(self.compile_single_steps(**arguments))
+                returned = None
+
+        return returned
+
+    def compile_single_steps(self,
+                             codeobject: Code,
+                             filename: str,
+                             element,
+                             line_no: int,
+                             result_required: bool,
+                             scope: list,
+                             tree=NODE_TREE):
         """
+        Steps of :py:meth:`compile_single`, see :py:meth:`run_steps`
+        """
+
+        head = tree.first_child(element)
 
-        codeobject.set_lineno(element.content[0].line_no)
-        if isinstance(element.content[0], (IDNode, SymbolNode)):
-            if element.content[0].content == 'defun':
+        codeobject.set_lineno(tree.line_no(head))
+        if tree.kind(head) in ('id', 'symbol'):
+            head_value = tree.value(head)
+            if head_value == 'defun':
                 # wahey! creating a function!
                 line_no, codeobject = self.compile_function(
                     codeobject,
                     filename,
                     element,
-                    line_no
+                    line_no,
+                    tree
                 )
 
-            elif element.content[0].content == 'lambda':
-                raise Exception((element, element.content))
+            elif head_value == 'lambda':
+                raise Exception(tree.describe(element))
 
-            elif element.content[0].content in ('let',
-                                                'defparameter',
-                                                'defvar'):
+            elif head_value in ('let', 'defparameter', 'defvar'):
                 # inline variable assignments
-                line_no, codeobject = self.handle_variable_assignment(
+                steps = self.variable_assignment_steps(
                     codeobject,
                     filename,
                     element,
                     line_no,
-                    scope
+                    scope,
+                    tree
                 )
+                line_no, codeobject = yield from steps
 
             else:
                 # whahey! calling a function!
-                line_no, codeobject = self.call_function(
+                steps = self.call_function_steps(
                     codeobject,
                     filename,
                     element,
                     line_no,
-                    scope
+                    scope,
+                    tree
                 )
+                line_no, codeobject = yield from steps
 
                 if not result_required:
                     # if the result aint required, clean up the stack
                     codeobject.POP_TOP()
         else:
-            raise Exception('{} -> {}'.format(element, element.content))
+            raise Exception('{} -> {}'.format(
+                tree.describe(element), tree.describe(head)))
 
         return line_no, codeobject
 
@@ -156,39 +213,59 @@ class Compiler(object):
     def handle_variable_assignment(self,
                                    codeobject: Code,
                                    filename: str,
-                                   element: Node,
+                                   element: (Node, int),
                                    line_no: int,
-                                   scope: list) -> tuple:
+                                   scope: list,
+                                   tree: object=NODE_TREE) -> tuple:
         """
         Handles an inline variable assignment
         """
 
-        function_name, name, args = element.content
-        name = name.content
+        return self.run_steps(self.variable_assignment_steps(
+            codeobject, filename, element, line_no, scope, tree))
+
+    def variable_assignment_steps(self,
+                                  codeobject: Code,
+                                  filename: str,
+                                  element,
+                                  line_no: int,
+                                  scope: list,
+                                  tree=NODE_TREE):
+        """
+        Steps of :py:meth:`handle_variable_assignment`, see \
+        :py:meth:`run_steps`
+        """
+
+        function_name, name, args = tree.children(element)
+        function_name = tree.value(function_name)
+        name = tree.value(name)
+        kind = tree.kind(args)
 
-        if isinstance(args, ListNode):
+        if kind == 'list':
             # if it has to evaluated first, do so
-            logger.debug('subcall: {} -> {}, with scope {}'.format(
-                args, args.content, scope))
-            line_no, codeobject = self.compile_single(
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('subcall: %s, with scope %s',
+                             tree.describe(args), scope)
+            line_no, codeobject = yield dict(
                 codeobject=codeobject,
                 filename=filename,
                 element=args,
                 line_no=line_no,
                 result_required=True,
-                scope=scope
+                scope=scope,
+                tree=tree
             )
 
-        elif isinstance(args, (NumberNode, StringNode)):
+        elif kind in ('number', 'string'):
             # if it is simply a literal, treat it as such
-            codeobject.LOAD_CONST(args.content)
+            codeobject.LOAD_CONST(tree.value(args))
 
         # global or local
-        if function_name.content == 'let':
+        if function_name == 'let':
             codeobject.STORE_FAST(name)
             self.locals.add(name)
 
-        elif function_name.content in ('defparameter', 'defvar'):
+        elif function_name in ('defparameter', 'defvar'):
             codeobject.STORE_GLOBAL(name)
 
         else:
@@ -200,73 +277,101 @@ class Compiler(object):
     def call_function(self,
                       codeobject: Code,
                       filename: str,
-                      element: Node,
+                      element: (Node, int),
                       line_no: int,
-                      scope: list) -> tuple:
+                      scope: list,
+                      tree: object=NODE_TREE) -> tuple:
         """
         Generates code to call a function, with possible nested calls as
         function arguments
         """
 
-        name, *args = element.content
+        return self.run_steps(self.call_function_steps(
+            codeobject, filename, element, line_no, scope, tree))
+
+    def call_function_steps(self,
+                            codeobject: Code,
+                            filename: str,
+                            element,
+                            line_no: int,
+                            scope: list,
+                            tree=NODE_TREE):
+        """
+        Steps of :py:meth:`call_function`, see :py:meth:`run_steps`
+        """
 
-        name = name.content
+        name, *args = tree.children(element)
+
+        name = tree.value(name)
         codeobject(Global(name))
 
         for arg in args:
-            if isinstance(arg, (IDNode, SymbolNode)):
-                if arg.content in scope:
-                    codeobject.LOAD_FAST(arg.content)
-                elif arg.content in self.locals:
-                    codeobject(Local(arg.content))
+            kind = tree.kind(arg)
+
+            if kind in ('id', 'symbol'):
+                value = tree.value(arg)
+                if value in scope:
+                    codeobject.LOAD_FAST(value)
+                elif value in self.locals:
+                    codeobject(Local(value))
                 else:
-                    codeobject.LOAD_GLOBAL(arg.content)
+                    codeobject.LOAD_GLOBAL(value)
 
-            elif isinstance(arg, ListNode):
-                logger.debug('subcall -> {}, with scope {}'.format(
-                    arg.content, scope)
-                )
+            elif kind == 'list':
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('subcall -> %s, with scope %s',
+                                 tree.describe(arg), scope)
 
-                line_no, codeobject = self.compile_single(
+                line_no, codeobject = yield dict(
                     codeobject=codeobject,
                     filename=filename,
                     element=arg,
                     line_no=line_no,
                     result_required=True,
-                    scope=scope
+                    scope=scope,
+                    tree=tree
                 )
 
-            elif isinstance(arg, (NumberNode, StringNode)):
-                codeobject(Const(arg.content))
+            elif kind in ('number', 'string'):
+                codeobject(Const(tree.value(arg)))
 
             else:
-                raise Exception(arg)
+                raise Exception(tree.describe(arg))
 
         codeobject.CALL_FUNCTION(len(args))
 
         return line_no, codeobject
 
+    def has_content(self, element, tree=NODE_TREE) -> bool:
+        """
+        Whether a list has any members, or an atom a truthy value
+        """
+
+        if tree.kind(element) == 'list':
+            return any(True for _ in tree.children(element))
+        return bool(tree.value(element))
+
     @enforce_types
     def compile_function(self,
                          codeobject: Code,
                          filename: str,
-                         element: Node,
-                         line_no: int) -> tuple:
+                         element: (Node, int),
+                         line_no: int,
+                         tree: object=NODE_TREE) -> tuple:
         """
         'Compiles' function, using the last functions return value
         in the function body as the return value for the function proper
         """
-        _, name, args, *body = element.content
-
-        name = name.content
-        args = args.content
+        _, name, args, *body = tree.children(element)
 
-        args = [arg.content for arg in args]
+        name = tree.value(name)
+        args = [tree.value(arg) for arg in tree.children(args)]
 
         func_code = codeobject.nested(name, args)
 
-        if body and any(el.content for el in body):
-            *body, return_func = [el for el in body if el.content]
+        body = [el for el in body if self.has_content(el, tree)]
+        if body:
+            *body, return_func = body
 
             # compile all bar the last statement
             for body_frag in body:
@@ -276,7 +381,8 @@ class Compiler(object):
                     element=body_frag,
                     line_no=line_no,
                     result_required=False,
-                    scope=args
+                    scope=args,
+                    tree=tree
                 )
 
             # compile the last statement, and ask for the result value
@@ -286,7 +392,8 @@ class Compiler(object):
                 element=return_func,
                 line_no=line_no,
                 result_required=True,
-                scope=args
+                scope=args,
+                tree=tree
             )
             func_code.RETURN_VALUE()
 
@@ -345,20 +452,18 @@ class Compiler(object):
         """
 
         st = os.stat(filename or __file__)
-        size = st.st_size & 0xFFFFFFFF
-        timestamp = int(st.st_mtime)
+        header = pyc_header(st.st_mtime, st.st_size)
 
         # write a placeholder for the MAGIC
         filehandler.write(b'\0\0\0\0')
 
-        wr_long(filehandler, timestamp)
-        wr_long(filehandler, size)
+        filehandler.write(header[4:])
         marshal.dump(codeobject, filehandler)
         filehandler.flush()
 
         # write the magic to the start
         filehandler.seek(0, 0)
-        filehandler.write(MAGIC)
+        filehandler.write(header[:4])
 
     @enforce_types
     def bootstrap_obj(self, codeobject: Code) -> Code:
@@ -0,0 +1,183 @@
+"""
+On-disk cache of the lexer and parser built from the Grammar and token
+definitions
+"""
+
+# standard library
+import os
+import sys
+import json
+import pickle
+import hashlib
+
+# application specific
+from . import __version__
+from .utils import logger
+
+logger = logger.getChild('GrammarCache')
+
+__all__ = ['GrammarCache', 'grammar_digest']
+
+# bump whenever the format of the cache changes
+CACHE_VERSION = 1
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# modules defining the classes of the objects in the cache
+PICKLED_MODULES = [
+    os.path.join(*path.split('/')) for path in [
+        'lexer.py',
+        'nodes.py',
+        'typarser/typarser.py',
+        'typarser/form_cache.py',
+        'typarser/grammar_parser/analysis.py',
+        'typarser/grammar_parser/backtracking.py',
+        'typarser/grammar_parser/grammar_nodes.py',
+        'typarser/grammar_parser/grammar_parser.py',
+        'typarser/grammar_parser/optimiser.py',
+        'typarser/grammar_parser/packrat.py',
+        'typarser/grammar_parser/predictive.py',
+        'typarser/grammar_parser/profiler.py',
+        'typarser/grammar_parser/reader.py',
+        'typarser/grammar_parser/generator.py'
+    ]
+]
+
+# caches that could not be read or written, so as to only warn of each once
+_warned = set()
+
+# settings the parser is built with; any others have no bearing on what
+# is cached, and would only cause needless rebuilds
+PARSER_SETTINGS = [
+    'start_token',
+    'parser_engine',
+    'generated_parser',
+    'optimise_grammars',
+    'packrat',
+    'packrat_size',
+    'profile',
+    'form_cache',
+    'compact_ast'
+]
+
+
+def _source_stamp() -> list:
+    """
+    Returns the modification time and size of each module defining classes
+    that are pickled, so that they are not loaded into classes that have
+    since changed
+    """
+
+    stamp = []
+    for module in PICKLED_MODULES:
+        stat = os.stat(os.path.join(PACKAGE_DIR, module))
+        stamp.append([module, stat.st_mtime_ns, stat.st_size])
+    return stamp
+
+
+def grammar_digest(raw_grammar: str, token_defs: dict, settings: dict) -> str:
+    """
+    Returns a hash of everything that goes into building the lexer and
+    parser; of the settings, only those in PARSER_SETTINGS are hashed
+
+    :param raw_grammar: contents of the Grammar file
+    :param token_defs: token definitions
+    :param settings: settings the parser is built with
+    """
+
+    settings = {
+        key: value for key, value in settings.items()
+        if key in PARSER_SETTINGS
+    }
+
+    content = json.dumps(
+        {
+            'cache_version': CACHE_VERSION,
+            'tyrian_version': __version__,
+            'python_version': sys.version_info[:2],
+            'source': _source_stamp(),
+            'grammar': raw_grammar,
+            'tokens': token_defs,
+            'settings': settings
+        },
+        sort_keys=True,
+        default=repr
+    )
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class GrammarCache(object):
+    """
+    Pickles the :py:class:`Lexer <tyrian.lexer.Lexer>` and
+    :py:class:`Parser <tyrian.typarser.Parser>`, along with their grammar
+    trees, prediction tables and compiled regular expressions, into a single
+    file, such that they need not be rebuilt on each startup.
+
+    The cache is keyed by a digest from :py:func:`grammar_digest`, and
+    rebuilt whenever the digest differs
+
+    :param filename: path to the cache file
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+
+    def load(self, digest: str):
+        """
+        Returns a tuple of the cached lexer and parser, or None if the cache
+        is missing, unreadable or was built with a different digest
+
+        :param digest: digest the cache must have been built with
+        """
+
+        try:
+            with open(self.filename, 'rb') as fh:
+                if fh.readline().decode('ascii', 'replace').strip() != digest:
+                    logger.info('Grammar cache is stale')
+                    return None
+
+                cached = pickle.load(fh)
+
+        except FileNotFoundError:
+            return None
+
+        except Exception as e:
+            if self.filename not in _warned:
+                _warned.add(self.filename)
+                logger.warning('Could not load grammar cache: {!r}'.format(e))
+            return None
+
+        logger.info('Loaded grammar cache from {}'.format(self.filename))
+        return cached['lexer'], cached['parser']
+
+    def store(self, digest: str, lexer, parser):
+        """
+        Writes the lexer and parser to the cache; failure to do so is logged
+        rather than raised, as the cache is merely an optimisation
+
+        :param digest: digest the lexer and parser were built with
+        :param lexer: Lexer to cache
+        :param parser: Parser to cache
+        """
+
+        # write then rename, so that others never see a partial file
+        temp_filename = '{}.{}.tmp'.format(self.filename, os.getpid())
+        try:
+            with open(temp_filename, 'wb') as fh:
+                fh.write(digest.encode('ascii') + b'\n')
+                pickle.dump(
+                    {'lexer': lexer, 'parser': parser},
+                    fh,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(temp_filename, self.filename)
+
+        except (OSError, pickle.PicklingError, AttributeError, TypeError) as e:
+            if self.filename not in _warned:
+                _warned.add(self.filename)
+                logger.warning('Could not write grammar cache: {!r}'.format(e))
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+        else:
+            logger.info('Wrote grammar cache to {}'.format(self.filename))
@@ -0,0 +1,267 @@
+"""
+Imports lisp files as python modules, caching their bytecode in
+``__pycache__`` as is done for python sources
+"""
+
+# standard library
+import os
+import sys
+import types
+import marshal
+import importlib.abc
+import importlib.util
+
+# application specific
+from . import __version__
+from .utils import logger, MAGIC_NUMBER, pyc_header
+
+logger = logger.getChild('LispImporter')
+
+__all__ = ['LispFinder', 'LispLoader', 'install', 'uninstall', 'cache_path']
+
+SOURCE_EXTENSION = '.lisp'
+
+# flags of the pyc header, as described by PEP 552
+CHECKED_HASH_FLAGS = 0b11
+
+# hash based caches need python 3.7 onwards
+HASH_BASED_SUPPORTED = hasattr(importlib.util, 'source_hash')
+
+# the Tyrian shared by every loader, built when first compiling
+_tyrian = None
+_settings = {}
+
+
+def cache_path(filename: str) -> str:
+    """
+    Returns the path of the bytecode cached for a lisp file; the name keeps
+    the extension of the lisp file, such that it never collides with that of
+    a python file of the same name, and the version of tyrian that compiled
+    it
+    """
+
+    directory, name = os.path.split(filename)
+    return os.path.join(directory, '__pycache__', '{}.tyrian-{}.{}.pyc'.format(
+        name, __version__, sys.implementation.cache_tag))
+
+
+def _get_tyrian():
+    global _tyrian
+    if _tyrian is None:
+        from .tyrian import Tyrian
+        _tyrian = Tyrian(_settings)
+    return _tyrian
+
+
+class LispLoader(importlib.abc.Loader):
+    """
+    Loads a lisp file as a module, compiling it with
+    :py:meth:`Tyrian.compile_code <tyrian.tyrian.Tyrian.compile_code>`
+    unless the bytecode cached at :py:func:`cache_path` is still valid.
+
+    By default, the cache is valid if it records the modification time and
+    size of the lisp file, as for python sources; should hash_based be set,
+    it must instead record a hash of the contents of the lisp file
+
+    :param fullname: name of the module
+    :param path: path to the lisp file
+    :param hash_based: whether to validate the cache by hash
+    """
+
+    def __init__(self, fullname: str, path: str, hash_based: bool=False):
+        self.name = fullname
+        self.path = path
+        self.hash_based = hash_based
+
+    def create_module(self, spec):
+        # the default module will do
+        return None
+
+    def exec_module(self, module):
+        exec(self.get_code(module.__name__), module.__dict__)
+
+    def load_module(self, fullname: str):
+        """
+        Loads the module the way python 3.3 does, for want of
+        :py:meth:`exec_module` there
+        """
+
+        module = sys.modules.get(fullname)
+        is_reload = module is not None
+        if not is_reload:
+            module = sys.modules[fullname] = types.ModuleType(fullname)
+
+        module.__file__ = self.path
+        module.__cached__ = cache_path(self.path)
+        module.__loader__ = self
+        module.__package__ = fullname.rpartition('.')[0]
+
+        try:
+            self.exec_module(module)
+        except BaseException:
+            if not is_reload:
+                del sys.modules[fullname]
+            raise
+
+        return sys.modules[fullname]
+
+    def get_filename(self, fullname: str) -> str:
+        return self.path
+
+    def get_source(self, fullname: str) -> str:
+        with open(self.path) as fh:
+            return fh.read()
+
+    def header(self, source: bytes) -> bytes:
+        """
+        Returns the header a valid cache for the lisp file would start with
+
+        :param source: contents of the lisp file
+        """
+
+        if self.hash_based:
+            return (
+                MAGIC_NUMBER +
+                CHECKED_HASH_FLAGS.to_bytes(4, 'little') +
+                importlib.util.source_hash(source)
+            )
+
+        stat = os.stat(self.path)
+        return pyc_header(stat.st_mtime, stat.st_size)
+
+    def get_code(self, fullname: str):
+        """
+        Returns the code object of the module, from the cache should it be
+        valid, otherwise compiling the lisp file and caching the result
+        """
+
+        with open(self.path, 'rb') as fh:
+            source = fh.read()
+        header = self.header(source)
+        cached = cache_path(self.path)
+
+        try:
+            with open(cached, 'rb') as fh:
+                data = fh.read()
+        except OSError:
+            data = None
+
+        if data is not None and data[:len(header)] == header:
+            try:
+                return marshal.loads(data[len(header):])
+            except (ValueError, EOFError, TypeError) as e:
+                logger.warning('Could not load {}: {!r}'.format(cached, e))
+
+        code = _get_tyrian().compile_code(self.path)
+
+        if not sys.dont_write_bytecode:
+            self.write_cache(cached, header + marshal.dumps(code))
+
+        return code
+
+    def write_cache(self, cached: str, data: bytes):
+        """
+        Writes the cache; failure to do so is logged rather than raised, as
+        the cache is merely an optimisation
+        """
+
+        # write then rename, so that others never see a partial file
+        temp_filename = '{}.{}.tmp'.format(cached, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+            with open(temp_filename, 'wb') as fh:
+                fh.write(data)
+            os.replace(temp_filename, cached)
+
+        except OSError as e:
+            logger.warning('Could not write {}: {!r}'.format(cached, e))
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+
+class LispFinder(importlib.abc.MetaPathFinder):
+    """
+    Finds lisp files on ``sys.path``, or within the ``__path__`` of a
+    package, for :py:class:`LispLoader`; a python module of the same name is
+    preferred, as the finder is placed after the default finders.
+
+    Python 3.3 calls :py:meth:`find_module` rather than :py:meth:`find_spec`
+
+    :param hash_based: see :py:class:`LispLoader`, unsupported before \
+    python 3.7
+    """
+
+    def __init__(self, hash_based: bool=False):
+        if hash_based and not HASH_BASED_SUPPORTED:
+            logger.warning('Hash based caches need python 3.7, '
+                           'validating by modification time instead')
+            hash_based = False
+
+        self.hash_based = hash_based
+
+    def find_filename(self, fullname: str, path=None) -> str:
+        "Returns the path to the lisp file of the module, if any"
+
+        name = fullname.rpartition('.')[2]
+
+        for entry in (path if path is not None else sys.path):
+            if not isinstance(entry, str):
+                continue
+
+            filename = os.path.join(entry or os.getcwd(), name)
+            filename += SOURCE_EXTENSION
+            if os.path.isfile(filename):
+                return filename
+
+        return None
+
+    def find_spec(self, fullname: str, path=None, target=None):
+        filename = self.find_filename(fullname, path)
+        if filename is None:
+            return None
+
+        loader = LispLoader(fullname, filename, self.hash_based)
+        spec = importlib.util.spec_from_file_location(
+            fullname, filename, loader=loader)
+        # only set for the suffixes of python sources, otherwise
+        spec.cached = cache_path(filename)
+        return spec
+
+    def find_module(self, fullname: str, path=None):
+        filename = self.find_filename(fullname, path)
+        if filename is None:
+            return None
+
+        return LispLoader(fullname, filename, self.hash_based)
+
+    def invalidate_caches(self):
+        pass
+
+
+def install(settings: dict=None, hash_based: bool=False) -> LispFinder:
+    """
+    Appends a :py:class:`LispFinder` to ``sys.meta_path``, such that lisp
+    files can be imported, returning it. Any previous LispFinder is removed
+
+    :param settings: settings for the :py:class:`Tyrian <tyrian.tyrian.Tyrian>` \
+    compiling the lisp files
+    :param hash_based: see :py:class:`LispLoader`
+    """
+
+    global _tyrian, _settings
+
+    uninstall()
+    _tyrian, _settings = None, dict(settings or {})
+
+    finder = LispFinder(hash_based)
+    sys.meta_path.append(finder)
+    return finder
+
+
+def uninstall():
+    "Removes any LispFinder from ``sys.meta_path``"
+
+    sys.meta_path[:] = [
+        finder for finder in sys.meta_path
+        if not isinstance(finder, LispFinder)
+    ]
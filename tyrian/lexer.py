@@ -4,13 +4,15 @@ Code to perform lexing accourding to token definitions
 
 # standard library
 import re
-import logging
+import mmap
 import operator
 import functools
+from array import array
 
 # application specific
 from .utils import logger, enforce_types
 from .exceptions import InvalidToken
+from .tokens import Token, TokenBuffer, MappedTokenBuffer
 
 logger = logger.getChild('Lexer')
 
@@ -58,7 +60,8 @@ class Lexer(object):
     def load_token_definitions(self, token_defs: dict):
         """
         Iterates through the supplied token_defs dictionary, creates wrappers
-        for literals and compiles regex's
+        for literals and compiles regex's, then compiles the combined
+        regular expression used by :py:meth:`_scan`
 
         :param token_defs: contains token definitions; see \
         :py:meth:`GrammarParser.load_token_definitions \
@@ -66,77 +69,348 @@ class Lexer(object):
          for format
         """
 
+        self.token_defs = token_defs
+        self.tokens = self._build_tokens(token_defs)
+
+        self.master_re, group_names = self.build_master_regex(token_defs)
+        # used when lexing bytes, such as a memory mapped file
+        self.master_re_bytes = re.compile(
+            self.master_re.pattern.encode('utf-8'))
+
+        # tokens refer to their names by index into token_names
+        self.token_names = []
+        self.group_ids = {}
+        for group, name in group_names.items():
+            if name not in self.token_names:
+                self.token_names.append(name)
+            self.group_ids[group] = self.token_names.index(name)
+
+        self.tokens_loaded = True
+
+    def _build_tokens(self, token_defs: dict) -> dict:
+        tokens = {}
+
         for k, v in token_defs['literal'].items():
             k = self.match_with(k)
-            self.tokens[k] = v
+            tokens[k] = v
 
         for k, v in token_defs['regex'].items():
             k = re.compile(k)
-            self.tokens[k] = v
+            tokens[k] = v
 
-        self.tokens_loaded = True
+        return tokens
+
+    def __getstate__(self) -> dict:
+        # the literal matchers are built on the fly, and cannot be pickled
+        state = self.__dict__.copy()
+        state.pop('tokens', None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        if self.tokens_loaded:
+            self.tokens = self._build_tokens(self.token_defs)
+        else:
+            self.tokens = {}
+
+    def build_master_regex(self, token_defs: dict) -> tuple:
+        """
+        Compiles the token definitions into a single alternation, so that a
+        whole buffer can be tokenized in one pass with ``finditer``.
+
+        Each definition gets a named group; literals come first, and must be
+        followed by a separator, whilst regular expressions need only match
+        the start of a token, the remainder of which is swallowed.
+        This gives the same results as splitting on whitespace and testing
+        each fragment against each definition in turn.
+
+        Any whitespace separates tokens; tabs and carriage returns included.
+        Lines used to be split on spaces alone, such that a tab or carriage
+        return within a line was kept as part of the token it touched, or
+        made it invalid
+
+        Returns the compiled regex and a dictionary mapping group names to
+        token names
+
+        :param token_defs: see :py:meth:`load_token_definitions`
+        """
+
+        split_on = [chr(char) for char in self.TRANS]
+        separators = re.escape(''.join(split_on))
+        boundary = '(?=[\\s{0}]|$)'.format(separators)
+        token_char = '[^\\s{0}]'.format(separators)
+
+        group_names = {}
+        literals, regexes = [], []
+
+        for literal, name in token_defs['literal'].items():
+            if not literal or any(char.isspace() for char in literal):
+                # whitespace is never part of a token
+                continue
+
+            group = 't{}'.format(len(group_names))
+            group_names[group] = name
+
+            literals.append('(?P<{}>{}){}'.format(
+                group,
+                re.escape(literal),
+                '' if literal in split_on else boundary
+            ))
+
+        for regex, name in token_defs['regex'].items():
+            group = 't{}'.format(len(group_names))
+            group_names[group] = name
+
+            regexes.append('(?P<{}>{})'.format(group, regex))
+
+        alternatives = ['(?P<NEWLINE>\\n)'] + literals
+        if regexes:
+            alternatives.append(
+                '(?:{}){}*'.format('|'.join(regexes), token_char))
+        alternatives.append(
+            '(?P<INVALID>{}+|[{}])'.format(token_char, separators))
+
+        return re.compile('|'.join(alternatives)), group_names
 
     @enforce_types
-    def lex(self, content: str, filename: str=None) -> list:
+    def lex(self,
+            content: str,
+            filename: str=None,
+            line_no: int=1) -> TokenBuffer:
         """
         Takes a string to lex according to token definition loaded
         via load_token_definitions
 
         :param content: content of file being lexed
         :param filename: name of file being lexed
+        :param line_no: line number of the first line in content
+        :rtype: :py:class:`TokenBuffer <tyrian.tokens.TokenBuffer>`
         """
 
         assert self.tokens_loaded, (
             'Please call load_token_definitions before calling this function')
 
-        lines = content.split('\n')
+        tokens = TokenBuffer(self.token_names, content, filename)
+        append = tokens.append
 
-        tokens = []
-        for line_no, line in enumerate(lines, start=1):
-            for token in self._lex(line, line_no, filename):
-                tokens.append(token)
+        for name_id, start, end, line_no in self._scan(
+                content, line_no, filename):
+            append(name_id, start, end, line_no)
 
         return tokens
 
+    @enforce_types
+    def lex_mmap(self, filename: str) -> MappedTokenBuffer:
+        """
+        Lexes a file by memory mapping it, rather than reading it in.
+
+        The returned buffer refers to offsets within the mapping, and the text
+        of each token is decoded only when requested; as such memory use
+        remains flat regardless of the size of the file.
+
+        Note that as the bytes are lexed directly, classes such as ``\\w`` \
+        in token definitions only match ASCII characters. The mapping stays \
+        open until the buffer is closed, so use it in a ``with`` block, or \
+        call its ``close`` once done with it.
+
+        :param filename: name of file to lex
+        :rtype: :py:class:`MappedTokenBuffer <tyrian.tokens.MappedTokenBuffer>`
+        """
+
+        assert self.tokens_loaded, (
+            'Please call load_token_definitions before calling this function')
+
+        with open(filename, 'rb') as fh:
+            if fh.seek(0, 2):
+                # the mapping outlives the file handle
+                content = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # empty files cannot be mapped
+                content = b''
+
+        tokens = MappedTokenBuffer(self.token_names, content, filename)
+        append = tokens.append
+
+        for name_id, start, end, line_no in self._scan(content, 1, filename):
+            append(name_id, start, end, line_no)
+
+        return tokens
+
+    @enforce_types
+    def relex(self,
+              tokens: TokenBuffer,
+              start_line: int,
+              end_line: int,
+              text: str) -> TokenBuffer:
+        """
+        Applies an edit to previously lexed content, replacing lines
+        start_line through end_line (inclusive) with text, and updates the
+        tokens in place to match the edited content, returning them.
+
+        Only the new text is lexed; its tokens are spliced into the arrays in
+        place of those of the replaced lines, and the tokens after them are
+        shifted to account for any change in length or in the number of
+        lines. Slice the tokens beforehand (``tokens[:]``) to keep a copy of
+        them as they were.
+
+        :param tokens: tokens returned by :py:meth:`lex` or a previous call \
+        to relex
+        :param start_line: first line replaced by the edit
+        :param end_line: last line replaced by the edit
+        :param text: replacement for the lines, without a trailing newline
+        :rtype: :py:class:`TokenBuffer <tyrian.tokens.TokenBuffer>`
+        """
+
+        assert self.tokens_loaded, (
+            'Please call load_token_definitions before calling this function')
+        assert isinstance(tokens.source, str), (
+            'Can only relex tokens lexed from a string')
+        assert 1 <= start_line <= end_line, 'Invalid line range'
+
+        source = tokens.source
+
+        start = tokens.line_offset(start_line)
+        assert start is not None, 'No such line as {}'.format(start_line)
+
+        end = tokens.line_offset(end_line + 1)
+        end = len(source) if end is None else end - 1
+
+        first, last = tokens.line_range(start_line, end_line)
+
+        relexed = TokenBuffer(tokens.names)
+        append = relexed.append
+        for name_id, token_start, token_end, line_no in self._scan(
+                text, start_line, tokens.filename):
+            append(name_id, token_start + start, token_end + start, line_no)
+
+        tokens.name_ids[first:last] = relexed.name_ids
+        tokens.line_nos[first:last] = relexed.line_nos
+        tokens.starts[first:last] = relexed.starts
+        tokens.ends[first:last] = relexed.ends
+
+        # shift the tokens that follow the edit
+        offset_delta = len(text) - (end - start)
+        line_delta = text.count('\n') - (end_line - start_line)
+        following = first + len(relexed)
+
+        def shift(values, delta):
+            if delta:
+                values[following:] = array(
+                    values.typecode, map(delta.__add__, values[following:]))
+
+        shift(tokens.line_nos, line_delta)
+        shift(tokens.starts, offset_delta)
+        shift(tokens.ends, offset_delta)
+
+        # strings being immutable, the source is the one thing copied whole
+        tokens.source = source[:start] + text + source[end:]
+
+        return tokens
+
+    @enforce_types
+    def lex_stream(self, fileobj, filename: str=None, chunk_size: int=65536):
+        """
+        Lazily lexes the contents of a file handle, reading it in chunks.
+
+        As tokens never span lines, each chunk is only lexed up to its last
+        newline, with the remainder carried over to the next chunk; as such
+        only a single chunk (or the longest line) is held in memory at once.
+
+        :param fileobj: file handle opened in text mode
+        :param filename: name of file being lexed, defaults to fileobj.name
+        :param chunk_size: number of characters to read at a time
+
+        yields :py:class:`Token <tyrian.tokens.Token>`'s
+        """
+
+        assert self.tokens_loaded, (
+            'Please call load_token_definitions before calling this function')
+
+        if filename is None:
+            filename = getattr(fileobj, 'name', None)
+
+        line_no = 1
+        pending = []
+
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+
+            split = chunk.rfind('\n') + 1
+            if not split:
+                # we have yet to see the end of this line
+                pending.append(chunk)
+                continue
+
+            pending.append(chunk[:split])
+            content = ''.join(pending)
+            pending = [chunk[split:]]
+
+            yield from self._tokens(content, line_no, filename)
+            line_no += content.count('\n')
+
+        yield from self._tokens(''.join(pending), line_no, filename)
+
     @enforce_types
     def _lex(self, line: str, line_no: int, filename: str):
         """
-        used internally by lex, does actual lexing
+        lexes a single line, see :py:meth:`_scan`
 
         :param line: line from source file
         :param line_no: line number of provided line
         :param filename: name of file from which the line originates
 
-        yields tokens of format
-
-        .. code-block:: json
-
-            {
-                "name": str,
-                "token": str,
-                "line_no": int,
-                'filename': str
-            }
-        """
-
-        line = (line.translate(self.TRANS)
-                    .strip()
-                    .split(' '))
-
-        for current_token in line:
-            for definition, name in self.tokens.items():
-                logging.debug(definition.match(current_token), current_token)
-                if definition.match(current_token):
-                    yield {
-                        "name": name,
-                        "token": current_token,
-                        "line_no": line_no,
-                        'filename': filename
-                    }
-                    break
+        yields :py:class:`Token <tyrian.tokens.Token>`'s
+        """
+
+        return self._tokens(line, line_no, filename)
+
+    def _tokens(self, content: str, line_no: int, filename: str):
+        """
+        wraps the output of :py:meth:`_scan` in
+        :py:class:`Token <tyrian.tokens.Token>`'s
+        """
+
+        names = self.token_names
+
+        for name_id, start, end, line_no in self._scan(
+                content, line_no, filename):
+            yield Token(names[name_id], content[start:end], line_no, filename)
+
+    def _scan(self, content: str, line_no: int, filename: str):
+        """
+        used internally by lex, does actual lexing
+
+        :param content: content to lex, may span several lines; either a \
+        string or a bytes-like object
+        :param line_no: line number of the first line in content
+        :param filename: name of file from which the content originates
+
+        yields tuples of the token's name id, its start and end offsets
+        within content, and its line number
+        """
+
+        group_ids = self.group_ids
+        is_text = isinstance(content, str)
+        master_re = self.master_re if is_text else self.master_re_bytes
+
+        for match in master_re.finditer(content):
+            group = match.lastgroup
+
+            if group == 'NEWLINE':
+                line_no += 1
+
+            elif group == 'INVALID':
+                token = match.group()
+                if not is_text:
+                    token = token.decode('utf-8', 'replace')
+
+                msg = '"{}" on line {}'.format(token, line_no)
+                if filename:
+                    msg += ' of file {}'.format(filename)
+                raise InvalidToken(msg)
+
             else:
-                if current_token.strip():
-                    msg = '"{}" on line {}'.format(current_token, line_no)
-                    if filename:
-                        msg += ' of file {}'.format(filename)
-                    raise InvalidToken(msg)
+                start, end = match.span()
+                yield group_ids[group], start, end, line_no
@@ -35,7 +35,7 @@ def lisp_function(**kwargs):
 
     def decorator(func):
         name = kwargs['name']
-        logger.debug('Registering function with name: {}'.format(name))
+        logger.debug('Registering function with name: %s', name)
 
         assert name not in lisp_registry, (
             'Function "{}" already exists'.format(name))
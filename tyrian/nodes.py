@@ -17,44 +17,67 @@ class AST(object):
         return '\n'.join(self._pprint(self.content))
 
     def _pprint(self, node, indent=0):
-        if isinstance(node, list):
-            name = '<list len={}>'.format(len(node))
-        else:
-            name = node.__repr__()
+        lines = []
 
-        cur_lines = []
-        cur_lines.append('{}{}'.format('\t' * indent, name))
+        # with an explicit stack, as the nesting may be deep; each entry
+        # is either a node and its indent, or a closing line
+        stack = [(node, indent, None)]
+        while stack:
+            node, indent, closing = stack.pop()
+            if closing is not None:
+                lines.append(closing)
+                continue
 
-        if type(node) in [ListNode, ContainerNode, list]:
-            try:
+            if isinstance(node, list):
+                name = '<list len={}>'.format(len(node))
+            else:
+                name = node.__repr__()
+
+            lines.append('{}{}'.format('\t' * indent, name))
+
+            if type(node) in [ListNode, ContainerNode, list]:
                 iterable = (
                     node.content if issubclass(type(node), Node)
                     else node
                 )
 
-                for sub_node in iterable:
-                    if sub_node == node:
-                        continue
-                    cur_lines += self._pprint(sub_node, indent + 1)
+                try:
+                    sub_nodes = [
+                        sub_node for sub_node in iterable
+                        if sub_node != node
+                    ]
+                except TypeError:
+                    stack.append((iterable, indent + 1, None))
+                    continue
 
-                cur_lines.append('{}</{}>'.format('\t' * indent, name[1:-1]))
-            except TypeError:
-                cur_lines += self._pprint(iterable, indent + 1)
+                stack.append((
+                    None,
+                    indent,
+                    '{}</{}>'.format('\t' * indent, name[1:-1])
+                ))
+                for sub_node in reversed(sub_nodes):
+                    stack.append((sub_node, indent + 1, None))
 
-        return cur_lines
+        return lines
 
 
 class Node(object):
     """
-    Base object for Node's
+    Base object for Node's; each names its ``kind``, one of
+    :py:data:`KINDS <tyrian.arena.KINDS>`, such that Node's and
+    :py:class:`NodeView <tyrian.arena.NodeView>`'s can be told apart alike
     """
+    __slots__ = ()
+    kind = None
 
 
 class ListNode(Node):
     """
     Represents a () in LISP
     """
+    __slots__ = ('content',)
     __spec_name = 'LN'
+    kind = 'list'
 
     def __init__(self, content, strip=True):
         # strip away the brackets
@@ -74,51 +97,74 @@ class ContainerNode(ListNode):
     this Node does not represent anything in the AST,
     it simply serves as a container; hence the name
     """
+    __slots__ = ()
     __spec_name = 'CN'
 
 
-class IDNode(Node):
-    "Represents an ID"
+class AtomNode(Node):
+    """
+    Base object for Node's of a single token; the content is decoded from
+    the parse tree of the token when first asked for, such as by the
+    :py:class:`Compiler <tyrian.compiler.Compiler>`, after which the parse
+    tree is let go of
+    """
+    __slots__ = ('tree', 'line_no', '_content')
+
     def __init__(self, content):
+        self.tree = content
         self.line_no = content.line_no
 
-        content = content.content
-        self.content = content
+    @property
+    def content(self):
+        try:
+            return self._content
+        except AttributeError:
+            self._content = self.decode(self.tree)
+            self.tree = None
+            return self._content
+
+    def decode(self, tree):
+        return tree.content
+
+
+class IDNode(AtomNode):
+    "Represents an ID"
+    __slots__ = ()
+    kind = 'id'
 
     def __repr__(self):
         return '<IDNode content="{}">'.format(self.content)
 
 
-class NumberNode(Node):
+class NumberNode(AtomNode):
     "Represents a number"
-    def __init__(self, content):
-        self.line_no = content.line_no
+    __slots__ = ()
+    kind = 'number'
 
-        self.content = int(content.content)
+    def decode(self, tree):
+        return int(tree.content)
 
     def __repr__(self):
         return '<NumberNode content={}>'.format(self.content)
 
 
-class StringNode(Node):
+class StringNode(AtomNode):
     "Represents a string, per se"
+    __slots__ = ()
+    kind = 'string'
+
     def __init__(self, content):
         # remove the quotes, grab the content
-        content = content[1:-1][0]
-        self.content = content.content
-
-        self.line_no = content.line_no
+        super().__init__(content[1:-1][0])
 
     def __repr__(self):
         return '<StringNode content="{}">'.format(self.content)
 
 
-class SymbolNode(Node):
+class SymbolNode(AtomNode):
     "Represents a mathematical symbol"
-    def __init__(self, content):
-        self.line_no = content.line_no
-
-        self.content = content.content
+    __slots__ = ()
+    kind = 'symbol'
 
     def __repr__(self):
         return '<SymbolNode content="{}">'.format(self.content)
@@ -128,6 +174,8 @@ class QuotedNode(Node):
     """
     Represents a quoted token
     """
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         raise NotImplementedError()
 
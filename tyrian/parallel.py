@@ -0,0 +1,242 @@
+"""
+Lexes and parses the top level forms of a source in a pool of processes
+"""
+
+# standard library
+import os
+import re
+import pickle
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# application specific
+from .nodes import AST
+from .utils import logger
+
+logger = logger.getChild('ParallelParser')
+
+__all__ = ['ParallelParser', 'split_source']
+
+# smallest chunk worth sending to another process, in characters
+MIN_CHUNK_SIZE = 16384
+
+# the pickled lexer and parser of each worker process, and the lexer and
+# parser themselves
+_worker = None
+
+
+def _can_fork() -> bool:
+    "Whether worker processes are forked, inheriting the globals set here"
+
+    if os.name != 'posix':
+        return False
+    try:
+        return multiprocessing.get_start_method() == 'fork'
+    except AttributeError:
+        # python 3.3 always forks on posix
+        return True
+
+
+def split_source(source: str,
+                 chunk_size: int,
+                 open_bracket: str='(',
+                 close_bracket: str=')') -> list:
+    """
+    Splits source into chunks of whole lines, each at least chunk_size
+    characters long bar the last, and each ending where the brackets balance,
+    such that every chunk holds whole top level forms.
+
+    Only the brackets are looked at, rather than the tokens; this relies on
+    brackets only ever being lexed as tokens of their own, as is the case
+    for the bundled token definitions. As tokens never span lines, splitting
+    between lines never splits a token.
+
+    Returns a list of tuples of the line number of the first line of each
+    chunk, and the chunk itself
+
+    :param source: source to split
+    :param chunk_size: minimum size of each chunk, in characters
+    :param open_bracket: text of the token opening a form
+    :param close_bracket: text of the token closing a form
+    """
+
+    pattern = re.compile('|'.join(
+        map(re.escape, [open_bracket, close_bracket, '\n'])))
+
+    chunks = []
+    start = 0
+    start_line = line_no = 1
+    depth = 0
+
+    for match in pattern.finditer(source):
+        token = match.group()
+
+        if token == open_bracket:
+            depth += 1
+
+        elif token == close_bracket:
+            # a stray closing bracket ends a form, as for Parser.iter_forms
+            depth = max(depth - 1, 0)
+
+        else:
+            line_no += 1
+
+            end = match.end()
+            if depth == 0 and end - start >= chunk_size:
+                chunks.append((start_line, source[start:end]))
+                start, start_line = end, line_no
+
+    if start < len(source):
+        chunks.append((start_line, source[start:]))
+
+    return chunks
+
+
+def _set_worker(state: bytes):
+    "Unpickles the lexer and parser of the worker process from state"
+
+    global _worker
+    _worker = state, pickle.loads(state)
+
+
+def _get_worker(state: bytes=None) -> tuple:
+    """
+    Returns the lexer and parser of the worker process; should state be
+    sent along with each chunk, they are only unpickled the first time the
+    worker is sent it, otherwise the worker was set up on starting
+    """
+
+    if state is not None and (_worker is None or _worker[0] != state):
+        _set_worker(state)
+    return _worker[1]
+
+
+def _parse_chunk(state: bytes,
+                 filename: str,
+                 line_no: int,
+                 chunk: str) -> list:
+    lexer, parser = _get_worker(state)
+    # an ASTArena, should compact_ast be set, is far cheaper to send back
+    return parser.parse(lexer.lex(chunk, filename, line_no))
+
+
+class ParallelParser(object):
+    """
+    Splits a source into chunks of top level forms with
+    :py:func:`split_source`, then lexes and parses the chunks in a
+    ``ProcessPoolExecutor``, each worker holding its own copy of the lexer
+    and parser. The resulting ListNode's are stitched back together in
+    source order; should the parser have ``compact_ast`` set, the workers
+    send back :py:class:`ASTArena <tyrian.arena.ASTArena>`'s instead, and
+    :py:class:`NodeView <tyrian.arena.NodeView>`'s are yielded.
+
+    Errors are raised as they would be had the source been parsed in one go,
+    albeit only once the forms before them have been returned
+
+    :param lexer: :py:class:`Lexer <tyrian.lexer.Lexer>` to lex with
+    :param parser: :py:class:`Parser <tyrian.typarser.Parser>` to parse with
+    :param jobs: number of worker processes, defaulting to the number of \
+    cpus
+    :param chunk_size: minimum size of each chunk, in characters; by default \
+    the source is split into a few chunks per worker
+    """
+
+    def __init__(self,
+                 lexer,
+                 parser,
+                 jobs: int=None,
+                 chunk_size: int=None):
+        self.lexer = lexer
+        self.parser = parser
+        self.jobs = jobs or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+
+    def split(self, source: str) -> list:
+        """
+        Returns the chunks of source, see :py:func:`split_source`
+        """
+
+        chunk_size = self.chunk_size
+        if chunk_size is None:
+            chunk_size = max(len(source) // (self.jobs * 4), MIN_CHUNK_SIZE)
+
+        return split_source(
+            source,
+            chunk_size,
+            self.parser.open_bracket,
+            self.parser.close_bracket
+        )
+
+    def iter_parse(self, source: str, filename: str=None):
+        """
+        Yields the top level ListNode's of source, in source order
+
+        :param source: source to parse
+        :param filename: name of file the source was read from
+        """
+
+        global _worker
+
+        chunks = self.split(source)
+        logger.info('Parsing {} chunks with {} workers'.format(
+            len(chunks), self.jobs))
+
+        if len(chunks) < 2 or self.jobs < 2:
+            # not worth starting any processes for
+            for line_no, chunk in chunks:
+                tokens = self.lexer.lex(chunk, filename, line_no)
+                yield from self.parser.parse(tokens).content
+            return
+
+        state = pickle.dumps(
+            (self.lexer, self.parser), protocol=pickle.HIGHEST_PROTOCOL)
+        max_workers = min(self.jobs, len(chunks))
+
+        # the lexer and parser are sent to each worker once, as it starts,
+        # rather than along with every chunk
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_set_worker,
+                initargs=(state,)
+            )
+            chunk_state = None
+            inherit = False
+
+        except TypeError:
+            # before python 3.7, there is no initializer; forked workers
+            # inherit the global instead, otherwise each chunk has to carry
+            # the lexer and parser
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+            inherit = _can_fork()
+            chunk_state = None if inherit else state
+
+        with executor:
+            if inherit:
+                previous = _worker
+                _worker = state, (self.lexer, self.parser)
+
+            try:
+                # every worker is started by the first chunk submitted
+                parsed = executor.map(
+                    _parse_chunk,
+                    [chunk_state] * len(chunks),
+                    [filename] * len(chunks),
+                    *zip(*chunks)
+                )
+            finally:
+                if inherit:
+                    _worker = previous
+
+            for ast in parsed:
+                yield from ast.content
+
+    def parse(self, source: str, filename: str=None) -> AST:
+        """
+        Returns the :py:class:`AST <tyrian.nodes.AST>` of source
+
+        :param source: source to parse
+        :param filename: name of file the source was read from
+        """
+
+        return AST(list(self.iter_parse(source, filename)))
@@ -0,0 +1,232 @@
+"""
+Compact representations of lexed tokens
+"""
+
+# standard library
+import io
+from copy import copy
+from array import array
+from bisect import bisect_left, bisect_right
+
+__all__ = ['Token', 'TokenBuffer', 'MappedTokenBuffer']
+
+
+class Token(object):
+    """
+    A single token, as yielded by
+    :py:meth:`Lexer.lex_stream <tyrian.lexer.Lexer.lex_stream>`
+
+    :param name: name of the token definition that matched
+    :param token: text of the token
+    :param line_no: line the token was found on
+    :param filename: name of the file the token was found in
+    """
+    __slots__ = ('name', 'token', 'line_no', 'filename')
+
+    def __init__(self, name: str, token: str, line_no: int, filename: str):
+        self.name = name
+        self.token = token
+        self.line_no = line_no
+        self.filename = filename
+
+    def __repr__(self) -> str:
+        return '<Token name={} token={} line_no={}>'.format(
+            self.name, repr(self.token), self.line_no)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Token) and
+            self.name == other.name and
+            self.token == other.token and
+            self.line_no == other.line_no and
+            self.filename == other.filename
+        )
+
+
+class TokenBuffer(object):
+    """
+    Stores tokens as parallel arrays of name ids, line numbers and offsets
+    into the source, with a single filename for the whole buffer.
+
+    Indexing with an integer returns a :py:class:`Token`, and slicing returns
+    another TokenBuffer sharing the same source; however the accessors
+    :py:meth:`name`, :py:meth:`text` and :py:meth:`line_no` avoid creating
+    intermediate objects.
+
+    :param names: list of token names, indexed by name id
+    :param source: string the token offsets refer to
+    :param filename: name of the file the tokens were lexed from
+    """
+
+    def __init__(self, names: list, source: str='', filename: str=None):
+        self.names = names
+        self.source = source
+        self.filename = filename
+
+        self.name_ids = array('B' if len(names) < 256 else 'H')
+        self.line_nos = array('L')
+        self.starts = array('L')
+        self.ends = array('L')
+
+    @classmethod
+    def from_tokens(cls, names: list, tokens, filename: str=None):
+        """
+        Builds a TokenBuffer from an iterable of :py:class:`Token`'s,
+        such as that returned by
+        :py:meth:`Lexer.lex_stream <tyrian.lexer.Lexer.lex_stream>`.
+
+        Only the text of the tokens is kept, concatenated into a new source
+
+        :param names: list of token names, indexed by name id
+        :param tokens: iterable of tokens
+        :param filename: name of the file the tokens were lexed from
+        """
+
+        buffer = cls(names, filename=filename)
+        name_ids = {name: name_id for name_id, name in enumerate(names)}
+
+        source = io.StringIO()
+        offset = 0
+        for token in tokens:
+            end = offset + source.write(token.token)
+            buffer.append(name_ids[token.name], offset, end, token.line_no)
+            offset = end
+
+        buffer.source = source.getvalue()
+        return buffer
+
+    def append(self, name_id: int, start: int, end: int, line_no: int):
+        """
+        Appends a token
+
+        :param name_id: index of the token name in names
+        :param start: offset of the start of the token in source
+        :param end: offset of the end of the token in source
+        :param line_no: line the token was found on
+        """
+
+        self.name_ids.append(name_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.line_nos.append(line_no)
+
+    def name(self, index: int) -> str:
+        "Returns the name of the token at index"
+        return self.names[self.name_ids[index]]
+
+    def text(self, index: int) -> str:
+        "Returns the text of the token at index"
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def line_no(self, index: int) -> int:
+        "Returns the line number of the token at index"
+        return self.line_nos[index]
+
+    def line_range(self, start_line: int, end_line: int) -> tuple:
+        """
+        Returns the indices of the first token on or after start_line, and
+        of the first token after end_line
+
+        :param start_line: first line of the range
+        :param end_line: last line of the range, inclusive
+        """
+
+        return (
+            bisect_left(self.line_nos, start_line),
+            bisect_right(self.line_nos, end_line)
+        )
+
+    def line_offset(self, line_no: int) -> int:
+        """
+        Returns the offset of the start of line_no within the source,
+        or None if the source has fewer lines.
+
+        Rather than scanning the source from the start, this begins at the
+        last token before the line
+
+        :param line_no: line to find
+        """
+
+        index = bisect_left(self.line_nos, line_no)
+        if index:
+            offset, current = self.ends[index - 1], self.line_nos[index - 1]
+        else:
+            offset, current = 0, 1
+
+        while current < line_no:
+            offset = self.source.find('\n', offset)
+            if offset == -1:
+                return None
+
+            offset += 1
+            current += 1
+
+        return offset
+
+    def __len__(self) -> int:
+        return len(self.name_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            buffer = copy(self)
+            buffer.name_ids = self.name_ids[index]
+            buffer.line_nos = self.line_nos[index]
+            buffer.starts = self.starts[index]
+            buffer.ends = self.ends[index]
+            return buffer
+
+        return Token(
+            self.name(index),
+            self.text(index),
+            self.line_nos[index],
+            self.filename
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return '<{} len={} filename={}>'.format(
+            type(self).__name__, len(self), self.filename)
+
+
+class MappedTokenBuffer(TokenBuffer):
+    """
+    A :py:class:`TokenBuffer` whose source is a bytes-like object, such as
+    an ``mmap`` of the file being lexed.
+
+    Offsets refer to bytes within the source, and the text of a token is only
+    decoded when asked for. Should the source be an ``mmap``, it is closed
+    by :py:meth:`close`, or on leaving a ``with`` block, after which the
+    text of no token, nor of any slice of the buffer, can be read
+
+    :param names: list of token names, indexed by name id
+    :param source: bytes-like object the token offsets refer to
+    :param filename: name of the file the tokens were lexed from
+    :param encoding: encoding used to decode token text
+    """
+
+    def __init__(self,
+                 names: list,
+                 source=b'',
+                 filename: str=None,
+                 encoding: str='utf-8'):
+        super().__init__(names, source, filename)
+        self.encoding = encoding
+
+    def text(self, index: int) -> str:
+        "Returns the decoded text of the token at index"
+        return self.source[self.starts[index]:self.ends[index]].decode(
+            self.encoding)
+
+    def close(self):
+        "Closes the source, should it be an mmap, releasing the file"
+        if hasattr(self.source, 'close'):
+            self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
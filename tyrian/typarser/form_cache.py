@@ -0,0 +1,154 @@
+"""
+Caches the parse trees of top level forms, such that only the forms that
+have changed since the last parse are parsed again
+"""
+
+# standard library
+import hashlib
+from array import array
+
+# application specific
+from ..utils import logger
+
+logger = logger.getChild('FormCache')
+
+__all__ = ['FormCache', 'shift_line_nos']
+
+
+def shift_line_nos(nodes: list, delta: int):
+    """
+    Shifts the line numbers of the nodes, and of everything within them, by
+    delta; nodes are changed in place, bar namedtuples, which are replaced
+    within their containing list
+
+    :param nodes: list of nodes to shift
+    :param delta: number of lines to shift by
+    """
+
+    if not delta:
+        return
+
+    # with an explicit stack, as the nesting may be deep
+    pending = [nodes]
+    while pending:
+        container = pending.pop()
+
+        for index, node in enumerate(container):
+            if isinstance(node, list):
+                pending.append(node)
+                continue
+
+            if hasattr(node, 'line_no'):
+                if isinstance(node, tuple):
+                    node = node._replace(line_no=node.line_no + delta)
+                    container[index] = node
+                else:
+                    node.line_no += delta
+
+                # tokens hold no further nodes, and their content need not
+                # be decoded
+                continue
+
+            content = getattr(node, 'content', None)
+            if type(content) == list:
+                pending.append(content)
+
+
+class FormCache(object):
+    """
+    Keeps the parse trees of the top level forms of the last parse, keyed by
+    a hash of the text of their tokens and of the lines they lie on relative
+    to the first; forms are parsed only if no form with the same key was
+    found by the last parse.
+
+    Each cached form is used at most once per parse, such that repeated
+    forms do not share nodes; as the line numbers of reused nodes are
+    shifted in place, ASTs from earlier parses should not be relied upon
+    once the source has been parsed again.
+
+    Forms not found by a parse are dropped from the cache
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> dict:
+        # the cache is only of use to the process that filled it
+        return {}
+
+    def __setstate__(self, state: dict):
+        self.__init__()
+
+    def key(self, form) -> bytes:
+        """
+        Returns the key of a form
+
+        :param form: :py:class:`TokenBuffer <tyrian.tokens.TokenBuffer>` \
+        holding a single form
+        """
+
+        source = form.source
+        first_line = form.line_nos[0]
+
+        # mapped sources are already bytes
+        encode = isinstance(source, str)
+
+        content = hashlib.sha1()
+        for start, end in zip(form.starts, form.ends):
+            text = source[start:end]
+            content.update(text.encode('utf-8') if encode else text)
+            content.update(b'\0')
+        content.update(array(
+            'L', [line_no - first_line for line_no in form.line_nos]))
+        return content.digest()
+
+    def parse(self, forms, parse_form) -> list:
+        """
+        Returns the top level nodes of the forms, in order, reusing those of
+        any cached forms
+
+        :param forms: iterable of :py:class:`TokenBuffer <tyrian.tokens.TokenBuffer>`'s \
+        holding a single form each, as from :py:meth:`Parser.iter_forms <tyrian.typarser.Parser.iter_forms>`
+        :param parse_form: function returning the list of top level nodes \
+        of a form
+        """
+
+        previous = self.entries
+        entries = {}
+        nodes = []
+        hits = misses = 0
+
+        try:
+            for form in forms:
+                key = self.key(form)
+                line_no = form.line_nos[0]
+
+                pool = previous.get(key)
+                if pool:
+                    cached_line_no, form_nodes = pool.pop()
+                    shift_line_nos(form_nodes, line_no - cached_line_no)
+                    hits += 1
+                else:
+                    form_nodes = parse_form(form)
+                    misses += 1
+
+                entries.setdefault(key, []).append((line_no, form_nodes))
+                nodes.extend(form_nodes)
+
+        except Exception:
+            # keep what we had, along with what has since been parsed
+            for key, pool in entries.items():
+                previous.setdefault(key, []).extend(pool)
+            raise
+
+        else:
+            self.entries = entries
+
+        finally:
+            self.hits += hits
+            self.misses += misses
+
+        logger.info('{} forms reused, {} parsed'.format(hits, misses))
+        return nodes
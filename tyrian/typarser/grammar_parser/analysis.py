@@ -0,0 +1,397 @@
+"""
+Static analysis of grammar trees, as produced by
+:py:meth:`GrammarParser.parse_grammars <tyrian.typarser.grammar_parser.GrammarParser.parse_grammars>`
+"""
+
+# standard library
+import re
+
+# application specific
+from .grammar_nodes import (
+    SubGrammarWrapper,
+    ContainerNode,
+    LiteralNode,
+    MultiNode,
+    RENode,
+    ORNode
+)
+
+__all__ = [
+    'Terminal',
+    'GrammarAnalysis',
+    'children',
+    'alternatives',
+    'symbol',
+    'EOF',
+    'ANY'
+]
+
+
+class Terminal(object):
+    """
+    Something that can match a single token; either a literal or a regular
+    expression
+
+    :param kind: one of "literal", "regex", "eof" or "any"
+    :param value: literal content, or regular expression
+    :param name: name of the token in the grammar
+    """
+    __slots__ = ('kind', 'value', 'name', 'regex')
+
+    def __init__(self, kind: str, value: str, name: str):
+        self.kind = kind
+        self.value = value
+        self.name = name
+        self.regex = re.compile(value) if kind == 'regex' else None
+
+    @classmethod
+    def from_node(cls, node):
+        """
+        Returns the Terminal for a
+        :py:class:`LiteralNode <tyrian.typarser.grammar_parser.grammar_nodes.LiteralNode>`
+        or :py:class:`RENode <tyrian.typarser.grammar_parser.grammar_nodes.RENode>`
+        """
+
+        if isinstance(node, LiteralNode):
+            return cls('literal', node.content, node.settings.get('token'))
+        else:
+            return cls('regex', node.raw_re, node.name)
+
+    def __repr__(self) -> str:
+        return '<Terminal {}>'.format(self.name or self.value)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Terminal) and
+            self.kind == other.kind and
+            self.value == other.value
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.kind, self.value))
+
+    def matches(self, text: str) -> bool:
+        """
+        Whether the text of a token would be matched by this Terminal
+        """
+
+        if self.kind == 'literal':
+            return text == self.value
+        elif self.kind == 'regex':
+            return bool(self.regex.match(text))
+        else:
+            return False
+
+    def overlaps(self, other) -> bool:
+        """
+        Whether a single token could be matched by both this and the other
+        Terminal; as regular expressions cannot be compared, any two
+        distinct regular expressions are assumed to overlap
+        """
+
+        if self == other:
+            return True
+        elif 'eof' in (self.kind, other.kind):
+            return False
+        elif 'any' in (self.kind, other.kind):
+            return True
+        elif self.kind == other.kind == 'literal':
+            return False
+        elif self.kind == 'literal':
+            return other.matches(self.value)
+        elif other.kind == 'literal':
+            return self.matches(other.value)
+        else:
+            return True
+
+
+# marks the end of the tokens in FOLLOW sets
+EOF = Terminal('eof', None, '<EOF>')
+
+# stands for any token at all in FOLLOW sets
+ANY = Terminal('any', None, '<ANY>')
+
+
+def children(node) -> list:
+    """
+    Returns the direct sub nodes of a grammar node
+    """
+
+    if isinstance(node, ContainerNode):
+        return node.subs
+    elif isinstance(node, ORNode):
+        return [node.left, node.right]
+    elif isinstance(node, MultiNode):
+        return [node.subs]
+    else:
+        return []
+
+
+def alternatives(node) -> list:
+    """
+    Returns the alternatives of a chain of ORNode's, in order of preference,
+    each as a list of nodes.
+
+    As the parse trees of ORNode's and ContainerNode's are flattened, the
+    parse tree of the chain is that of the matching alternative's nodes
+    """
+
+    if isinstance(node, ORNode):
+        return alternatives(node.left) + alternatives(node.right)
+
+    elif isinstance(node, ContainerNode):
+        if len(node.subs) == 1 and isinstance(node.subs[0], ORNode):
+            return alternatives(node.subs[0])
+        return [list(node.subs)]
+
+    return [[node]]
+
+
+def symbol(node):
+    """
+    Nodes with the same symbol produce the same parse tree, and can be
+    factored out of alternatives
+    """
+
+    if isinstance(node, (LiteralNode, RENode)):
+        terminal = Terminal.from_node(node)
+        return ('terminal', terminal, terminal.name)
+    elif isinstance(node, SubGrammarWrapper):
+        return ('grammar', node.key.upper())
+    else:
+        return ('node', id(node))
+
+
+def overlapping(left, right) -> bool:
+    """
+    Whether any Terminal in left overlaps any Terminal in right
+    """
+
+    return any(a.overlaps(b) for a in left for b in right)
+
+
+class GrammarAnalysis(object):
+    """
+    Computes the FIRST and FOLLOW sets and the nullability of each node in a
+    set of grammar trees, as well as which grammars are left recursive
+
+    :param grammars: dictionary mapping grammar names to grammar trees
+    :param start_token: name of the grammar parsing starts from, if any
+    """
+
+    def __init__(self, grammars: dict, start_token: str=None):
+        self.grammars = grammars
+        self.start_token = start_token
+
+        self.nullable = {}
+        self.first = {}
+        self.follow = {}
+
+        self.rule_nullable = {key: False for key in grammars}
+        self.rule_first = {key: frozenset() for key in grammars}
+        self.rule_follow = {key: set() for key in grammars}
+
+        self._compute_first()
+        self._compute_follow()
+        self.left_recursive = self._find_left_recursion()
+
+    def nodes(self, key: str) -> list:
+        """
+        Returns every node within the named grammar, parents first
+        """
+
+        found, pending = [], [self.grammars[key]]
+        while pending:
+            node = pending.pop()
+            found.append(node)
+            pending.extend(reversed(children(node)))
+        return found
+
+    def _compute_first(self):
+        changed = True
+        while changed:
+            changed = False
+            for key, root in self.grammars.items():
+                self._visit_first(root)
+
+                if (self.first[root] != self.rule_first[key] or
+                        self.nullable[root] != self.rule_nullable[key]):
+                    self.rule_first[key] = self.first[root]
+                    self.rule_nullable[key] = self.nullable[root]
+                    changed = True
+
+    def _visit_first(self, node):
+        subs = children(node)
+        for sub in subs:
+            self._visit_first(sub)
+
+        if isinstance(node, (LiteralNode, RENode)):
+            first, nullable = frozenset([Terminal.from_node(node)]), False
+
+        elif isinstance(node, SubGrammarWrapper):
+            key = node.key.upper()
+            first = self.rule_first.get(key, frozenset())
+            nullable = self.rule_nullable.get(key, False)
+
+        elif isinstance(node, ContainerNode):
+            first, nullable = frozenset(), True
+            for sub in subs:
+                first |= self.first[sub]
+                if not self.nullable[sub]:
+                    nullable = False
+                    break
+
+        elif isinstance(node, ORNode):
+            first = self.first[node.left] | self.first[node.right]
+            nullable = self.nullable[node.left] or self.nullable[node.right]
+
+        elif isinstance(node, MultiNode):
+            first, nullable = self.first[node.subs], self.nullable[node.subs]
+
+        else:
+            raise TypeError(node)
+
+        self.first[node] = first
+        self.nullable[node] = nullable
+
+    def first_of_sequence(self, nodes: list) -> tuple:
+        """
+        Returns the FIRST set of a sequence of nodes, and whether the
+        sequence as a whole is nullable
+        """
+
+        first = frozenset()
+        for node in nodes:
+            first |= self.first[node]
+            if not self.nullable[node]:
+                return first, False
+        return first, True
+
+    def _compute_follow(self):
+        for key in self.grammars:
+            for node in self.nodes(key):
+                self.follow[node] = set()
+
+        if self.start_token in self.grammars:
+            # the start grammar is matched once per top level form, and
+            # whatever follows a form is only checked once the form has been
+            # matched; that may be the end, another form, or something that
+            # is no form at all, so any token may follow the start grammar
+            self.rule_follow[self.start_token] |= {EOF, ANY}
+
+        changed = True
+        while changed:
+            changed = False
+            for key, root in self.grammars.items():
+                for node in self.nodes(key):
+                    changed |= self._propagate_follow(key, root, node)
+
+    def _propagate_follow(self, key: str, root, node) -> bool:
+        def add(target: set, terminals) -> bool:
+            size = len(target)
+            target |= terminals
+            return len(target) != size
+
+        changed = False
+        follow = self.follow[node]
+        if node is root:
+            changed |= add(follow, self.rule_follow[key])
+
+        if isinstance(node, ContainerNode):
+            for index, sub in enumerate(node.subs):
+                first, nullable = self.first_of_sequence(
+                    node.subs[index + 1:])
+                changed |= add(self.follow[sub], first)
+                if nullable:
+                    changed |= add(self.follow[sub], follow)
+
+        elif isinstance(node, ORNode):
+            changed |= add(self.follow[node.left], follow)
+            changed |= add(self.follow[node.right], follow)
+
+        elif isinstance(node, MultiNode):
+            changed |= add(self.follow[node.subs], self.first[node.subs])
+            changed |= add(self.follow[node.subs], follow)
+
+        elif isinstance(node, SubGrammarWrapper):
+            sub_key = node.key.upper()
+            if sub_key in self.rule_follow:
+                changed |= add(self.rule_follow[sub_key], follow)
+
+        return changed
+
+    def left_calls(self, node) -> set:
+        """
+        Returns the names of the grammars that may be checked by the node
+        before it has consumed any tokens
+        """
+
+        if isinstance(node, SubGrammarWrapper):
+            return {node.key.upper()}
+
+        elif isinstance(node, ContainerNode):
+            calls = set()
+            for sub in node.subs:
+                calls |= self.left_calls(sub)
+                if not self.nullable[sub]:
+                    break
+            return calls
+
+        else:
+            calls = set()
+            for sub in children(node):
+                calls |= self.left_calls(sub)
+            return calls
+
+    def _find_left_recursion(self) -> set:
+        calls = {
+            key: self.left_calls(root)
+            for key, root in self.grammars.items()
+        }
+
+        left_recursive = set()
+        for key in self.grammars:
+            seen, pending = set(), list(calls[key])
+            while pending:
+                current = pending.pop()
+                if current == key:
+                    left_recursive.add(key)
+                    break
+                if current in seen or current not in calls:
+                    continue
+                seen.add(current)
+                pending.extend(calls[current])
+
+        return left_recursive
+
+    def decided_by_first(self, node, _seen: frozenset=frozenset()) -> bool:
+        """
+        Whether the node always succeeds when the first token is in its
+        FIRST set, and always fails otherwise
+        """
+
+        if isinstance(node, (LiteralNode, RENode)):
+            return True
+
+        elif isinstance(node, SubGrammarWrapper):
+            key = node.key.upper()
+            if key in _seen or key not in self.grammars:
+                return False
+            return self.decided_by_first(self.grammars[key], _seen | {key})
+
+        elif isinstance(node, ContainerNode):
+            return (
+                len(node.subs) == 1 and
+                self.decided_by_first(node.subs[0], _seen)
+            )
+
+        elif isinstance(node, ORNode):
+            return (
+                self.decided_by_first(node.left, _seen) and
+                self.decided_by_first(node.right, _seen)
+            )
+
+        elif isinstance(node, MultiNode):
+            return self.decided_by_first(node.subs, _seen)
+
+        return False
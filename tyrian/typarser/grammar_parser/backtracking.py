@@ -0,0 +1,307 @@
+"""
+Checks the grammar trees with an explicit stack, rather than by recursion
+"""
+
+# application specific
+from ...utils import logger, flatten
+from ...exceptions import NoSuchGrammar
+from .grammar_nodes import (
+    Result,
+    FAILURE,
+    SubGrammarWrapper,
+    ContainerNode,
+    ChoiceNode,
+    MultiNode,
+    ORNode
+)
+
+logger = logger.getChild('BacktrackingParser')
+
+__all__ = ['BacktrackingParser']
+
+
+class BacktrackingParser(object):
+    """
+    Checks the grammar trees of a
+    :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`
+    exactly as would
+    :py:meth:`GrammarNode.check <tyrian.typarser.grammar_parser.grammar_nodes.GrammarNode.check>`,
+    backtracking wherever they would, but keeping the nodes being checked on
+    an explicit stack; as such the nesting depth of the tokens is limited
+    only by memory, rather than by the recursion limit.
+
+    The optimised grammar trees are checked, see
+    :py:class:`GrammarOptimiser <tyrian.typarser.grammar_parser.optimiser.GrammarOptimiser>`.
+    Terminals, and any nodes of types unknown to it, are checked by their
+    own `check()`.
+
+    Each grammar checked is recorded by the
+    :py:class:`ParseProfiler <tyrian.typarser.grammar_parser.profiler.ParseProfiler>`
+    of the GrammarParser, if any
+
+    :param grammar_parser: GrammarParser with parsed grammars
+    """
+
+    def __init__(self, grammar_parser):
+        self.grammar_parser = grammar_parser
+
+    def check(self, key: str, tokens, position: int) -> Result:
+        """
+        Checks the named grammar against the tokens, starting at position.
+
+        Returns a :py:class:`Result <tyrian.typarser.grammar_parser.grammar_nodes.Result>`
+        as would :py:meth:`PredictiveParser.check <tyrian.typarser.grammar_parser.predictive.PredictiveParser.check>`
+
+        :param key: name of the grammar
+        :param tokens: tokens to check against
+        :param position: position to start at
+        """
+
+        try:
+            root = self.grammar_parser.optimised_grammars[key]
+        except KeyError:
+            raise NoSuchGrammar('No such grammar as "{}"'.format(key))
+
+        profiler = self.grammar_parser.profiler
+        if profiler is None:
+            return self.check_node(root, tokens, position)
+
+        depth = profiler.enter(key)
+        result = FAILURE
+        try:
+            result = self.check_node(root, tokens, position)
+            return result
+        finally:
+            profiler.unwind(
+                depth, None if result is FAILURE else result.consumed)
+
+    def check_node(self, node, tokens, position: int) -> Result:
+        """
+        Checks a grammar node against the tokens, starting at position
+
+        :param node: GrammarNode to check
+        :param tokens: tokens to check against
+        :param position: position to start at
+        """
+
+        grammars = self.grammar_parser.optimised_grammars
+        memo = self.grammar_parser.memo
+        profiler = self.grammar_parser.profiler
+
+        # each frame holds the node, its progress, the parse trees of its
+        # sub nodes (or its grammar name, for the memo), the position it started at, and the
+        # position it has reached
+        stack = [[node, 0, [], position, position]]
+
+        # the result of the last frame popped, if not yet taken up
+        returned = None
+
+        while stack:
+            frame = stack[-1]
+            node = frame[0]
+            kind = type(node)
+
+            if kind is ContainerNode:
+                if returned is not None:
+                    if returned is FAILURE:
+                        stack.pop()
+                        continue
+
+                    frame[2].append(returned.parse_tree)
+                    frame[4] += returned.consumed
+                    returned = None
+
+                index = frame[1]
+                if index < len(node.subs):
+                    frame[1] = index + 1
+                    stack.append([node.subs[index], 0, [], frame[4], frame[4]])
+                    continue
+
+                parse_tree = frame[2]
+                if len(parse_tree) == 1:
+                    parse_tree = flatten(parse_tree[0], can_return_single=True)
+                returned = Result(frame[4] - frame[3], parse_tree)
+
+            elif kind is SubGrammarWrapper:
+                if frame[1]:
+                    # the grammar has been checked
+                    if returned is not FAILURE:
+                        returned = Result(
+                            returned.consumed,
+                            node.build_parse_tree(returned.parse_tree)
+                        )
+
+                    if memo is not None:
+                        memo.put(frame[2], frame[3], returned)
+
+                    if profiler is not None:
+                        profiler.leave(
+                            None if returned is FAILURE else returned.consumed)
+
+                else:
+                    key = node.key.upper()
+
+                    if memo is not None:
+                        returned = memo.get(key, frame[3])
+                        if returned is not None:
+                            if profiler is not None:
+                                profiler.memo_hit(key, (
+                                    None if returned is FAILURE
+                                    else returned.consumed))
+                            stack.pop()
+                            continue
+                        frame[2] = key
+
+                    try:
+                        grammar = grammars[key]
+                    except KeyError:
+                        raise NoSuchGrammar(
+                            'No such grammar as "{}"'.format(key))
+
+                    if profiler is not None:
+                        profiler.enter(key)
+
+                    frame[1] = 1
+                    stack.append([grammar, 0, [], frame[3], frame[3]])
+                    continue
+
+            elif kind is ORNode:
+                if frame[1] == 0:
+                    frame[1] = 1
+                    stack.append([node.left, 0, [], frame[3], frame[3]])
+                    continue
+
+                if frame[1] == 1 and returned is FAILURE:
+                    frame[1] = 2
+                    returned = None
+                    stack.append([node.right, 0, [], frame[3], frame[3]])
+                    continue
+
+                if (returned is not FAILURE and
+                        type(returned.parse_tree) == list):
+                    returned = Result(
+                        returned.consumed,
+                        flatten(returned.parse_tree, can_return_single=True)
+                    )
+
+            elif kind is ChoiceNode:
+                returned = self.advance_choice(frame, returned, tokens)
+                if type(returned) is not Result:
+                    stack.append([returned, 0, [], frame[4], frame[4]])
+                    returned = None
+                    continue
+
+            elif kind is MultiNode:
+                if returned is not None and returned is not FAILURE:
+                    frame[2].append(returned.parse_tree)
+                    frame[4] += returned.consumed
+                    returned = None
+
+                if returned is None and len(tokens) > frame[4]:
+                    stack.append([node.subs, 0, [], frame[4], frame[4]])
+                    continue
+
+                # the sub node has failed, or we have run out of tokens
+                parse_tree = frame[2]
+                if not parse_tree:
+                    returned = FAILURE
+                else:
+                    if len(parse_tree) == 1:
+                        parse_tree = flatten(
+                            parse_tree[0], can_return_single=True)
+                    returned = Result(frame[4] - frame[3], parse_tree)
+
+            else:
+                returned = node.check(tokens, frame[3])
+
+            stack.pop()
+
+        return returned
+
+    def next_tail(self, tails: list, index: int, tokens, position: int):
+        """
+        Returns the index of the first of the tails of a group of a
+        ChoiceNode, from index onwards, not rejected by its guard
+        """
+
+        for index in range(index, len(tails)):
+            guard = tails[index][0]
+            if guard is None or guard.accepts(tokens, position):
+                return index
+        return None
+
+    def advance_choice(self, frame: list, returned: Result, tokens):
+        """
+        Moves on a frame checking a
+        :py:class:`ChoiceNode <tyrian.typarser.grammar_parser.grammar_nodes.ChoiceNode>`,
+        given the result of its last sub node, if any; returns the next sub
+        node to check, or the Result of the ChoiceNode
+        """
+
+        groups = frame[0].groups
+
+        # the index of the group being checked, the index of the tail being
+        # checked (or -1 whilst checking the prefix), the index of the next
+        # node to check, and the position and parse trees of the prefix
+        state = frame[1]
+
+        if not state:
+            state = frame[1] = [-1, -1, 0, None, None]
+            failed = True
+
+        elif returned is FAILURE:
+            failed = True
+
+        else:
+            frame[2].append(returned.parse_tree)
+            frame[4] += returned.consumed
+            state[2] += 1
+            failed = False
+
+        while True:
+            if failed:
+                index = None
+                if state[1] != -1:
+                    # try the next tail of the group
+                    index = self.next_tail(
+                        groups[state[0]][2], state[1] + 1, tokens, state[3])
+
+                if index is None:
+                    # try the next group
+                    index = state[0] + 1
+                    while index < len(groups):
+                        guard = groups[index][0]
+                        if guard is None or guard.accepts(tokens, frame[3]):
+                            break
+                        index += 1
+                    else:
+                        return FAILURE
+
+                    state[0], state[1], state[2] = index, -1, 0
+                    frame[2], frame[4] = [], frame[3]
+
+                else:
+                    state[1], state[2] = index, 0
+                    frame[2], frame[4] = list(state[4]), state[3]
+
+                failed = False
+
+            _, prefix, tails = groups[state[0]]
+            nodes = prefix if state[1] == -1 else tails[state[1]][1]
+            if state[2] < len(nodes):
+                return nodes[state[2]]
+
+            if state[1] != -1:
+                parse_tree = frame[2]
+                if len(parse_tree) == 1:
+                    parse_tree = flatten(parse_tree[0], can_return_single=True)
+                return Result(frame[4] - frame[3], parse_tree)
+
+            # the prefix has matched, so on to the first tail
+            state[3], state[4] = frame[4], frame[2]
+            index = self.next_tail(tails, 0, tokens, frame[4])
+            if index is None:
+                failed = True
+            else:
+                state[1], state[2] = index, 0
+                frame[2] = list(state[4])
@@ -0,0 +1,491 @@
+"""
+Generates specialised recursive descent parsers from grammar trees
+"""
+
+# standard library
+import os
+import re
+import sys
+import json
+import types
+import hashlib
+import importlib.util
+import importlib.machinery
+
+# application specific
+from ...utils import logger, flatten
+from ...exceptions import NoSuchGrammar
+from .analysis import alternatives
+from .grammar_nodes import (
+    Result,
+    FAILURE,
+    SubGrammarWrapper,
+    ContainerNode,
+    LiteralNode,
+    MultiNode,
+    RENode,
+    ORNode
+)
+
+logger = logger.getChild('ParserGenerator')
+
+__all__ = ['ParserGenerator', 'GeneratedParser', 'load_generated_parser']
+
+# bump whenever the generated source changes, to invalidate cached modules
+GENERATOR_VERSION = 3
+
+HEADER = '''\
+# tyrian generated parser, grammar hash {digest}
+"""
+Recursive descent parser generated from the grammar trees by
+tyrian.typarser.grammar_parser.generator; do not edit, as it is
+regenerated whenever the grammar or token definitions change
+"""
+
+import re
+
+GRAMMAR_HASH = {digest!r}
+
+
+def build(grammar_mapping, flatten, LiteralTree, RETree, NoSuchGrammar):
+    """
+    Returns a parse(key, tokens, position) function, which returns the
+    parse tree of the named grammar and the position after it, or None
+    """
+
+    n = 0
+    text = line_nos = None
+'''
+
+FOOTER = '''
+    def parse(key, tokens, position):
+        nonlocal n, text, line_nos
+        n, text, line_nos = len(tokens), tokens.text, tokens.line_nos
+        return roots[key](position)
+
+    return parse
+'''
+
+# files the generated parser could not be cached in, so as to only warn of
+# each once
+_unwritable = set()
+
+
+class ParserGenerator(object):
+    """
+    Generates the source of a Python module containing a recursive descent
+    function for each grammar of a
+    :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`.
+
+    The generated functions produce the same parse trees as checking the
+    grammar nodes, but compare tokens inline and call the grammar mapping
+    directly, passing around positions rather than result dictionaries.
+
+    :param grammar_parser: GrammarParser with parsed grammars
+    """
+
+    def __init__(self, grammar_parser):
+        self.grammar_parser = grammar_parser
+        self.grammars = grammar_parser.grammars
+
+    def digest(self) -> str:
+        """
+        Returns a hash of the grammars and token definitions the parser is
+        generated from
+        """
+
+        content = json.dumps(
+            {
+                'version': GENERATOR_VERSION,
+                'grammars': self.grammar_parser.loaded_grammars,
+                'tokens': self.grammar_parser.token_defs
+            },
+            sort_keys=True
+        )
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def generate(self) -> str:
+        """
+        Returns the source of the generated module
+        """
+
+        self.functions = []
+        self.regexes = {}
+        self.counter = 0
+
+        self.names = {}
+        for key in self.grammars:
+            name = re.sub(r'\W', '_', key.lower())
+            while name in self.names.values():
+                name += '_'
+            self.names[key] = name
+
+        for key, root in self.grammars.items():
+            name = self.names[key]
+            self.functions.append(['# {} ::= {}'.format(
+                key.lower(),
+                ' '.join(self.grammar_parser.loaded_grammars[key]))])
+            self.compile(root, 'root_' + name)
+            self.function('rule_' + name, [
+                'result = root_{}(position)'.format(name),
+                'if result is None:',
+                '    return None',
+                'tree = flatten(result[0])',
+                'assert tree',
+                'if mapping_{} is None:'.format(name),
+                '    return tree, result[1]',
+                'try:',
+                '    return mapping_{}(tree), result[1]'.format(name),
+                'except TypeError:',
+                '    raise TypeError({!r}.format(mapping_{}.__qualname__))'
+                .format('{} accepts no arguments', name)
+            ])
+
+        lines = [HEADER.format(digest=self.digest())]
+
+        for regex, name in self.regexes.items():
+            lines.append('    {} = re.compile({!r})'.format(name, regex))
+        lines.append('')
+
+        for key, name in self.names.items():
+            lines.append('    mapping_{} = grammar_mapping.get({!r})'.format(
+                name, key))
+
+        previous = None
+        for function in self.functions:
+            if not (previous and previous[0].startswith('#')):
+                lines.append('')
+            lines.extend('    ' + line for line in function)
+            previous = function
+
+        lines.append('')
+        lines.append('    roots = {')
+        for key, name in self.names.items():
+            lines.append('        {!r}: root_{},'.format(key, name))
+        lines.append('    }')
+
+        lines.append(FOOTER)
+
+        return '\n'.join(lines)
+
+    def function(self, name: str, body: list):
+        self.functions.append(['def {}(position):'.format(name)] + [
+            '    ' + line for line in body
+        ])
+
+    def compile(self, node, name: str=None) -> str:
+        """
+        Generates a function for a ContainerNode, ORNode or MultiNode,
+        returning the name of the function
+
+        :param node: node to generate a function for
+        :param name: name for the function, if not numbered
+        """
+
+        if name is None:
+            name = 'node_{}'.format(self.counter)
+            self.counter += 1
+
+        # as parse trees are flattened, a container holding only another
+        # container, choice or repeat has the same parse tree as it does
+        while (isinstance(node, ContainerNode) and len(node.subs) == 1 and
+                isinstance(node.subs[0], (ContainerNode, ORNode, MultiNode))):
+            node = node.subs[0]
+
+        if isinstance(node, ContainerNode):
+            body = self.sequence(node.subs)
+
+        elif isinstance(node, ORNode):
+            body = self.choice(node)
+
+        elif isinstance(node, MultiNode):
+            body = ['trees = []', 'while position < n:']
+            body += ['    ' + line for line in self.inline(node.subs, 'break')]
+            body += [
+                '    trees.append(tree)',
+                'if not trees:',
+                '    return None',
+                'if len(trees) == 1:',
+                '    return flatten(tree, True), position',
+                'return trees, position'
+            ]
+
+        else:
+            raise TypeError(node)
+
+        self.function(name, body)
+        return name
+
+    def sequence(self, subs: list) -> list:
+        """
+        Returns the body of a function checking each of the nodes in turn
+        """
+
+        if not subs:
+            return ['return [], position']
+
+        elif len(subs) == 1:
+            body = self.inline(subs[0], 'return None')
+            if isinstance(subs[0], (LiteralNode, RENode)):
+                return body + ['return tree, position']
+            return body + ['return flatten(tree, True), position']
+
+        body = ['trees = []']
+        for sub in subs:
+            body += self.inline(sub, 'return None')
+            body.append('trees.append(tree)')
+
+        # a list of several trees is left as is by flatten
+        return body + ['return trees, position']
+
+    def choice(self, node: ORNode) -> list:
+        """
+        Returns the body of a function trying each alternative of a chain of
+        ORNode's in turn
+        """
+
+        body = []
+        for nodes in alternatives(node):
+            sub = nodes[0] if len(nodes) == 1 else None
+
+            if isinstance(sub, LiteralNode):
+                body += [
+                    'if position < n and text(position) == {!r}:'.format(
+                        sub.content),
+                    '    return LiteralTree({!r}, line_nos[position]), '
+                    'position + 1'.format(sub.content)
+                ]
+                continue
+
+            elif isinstance(sub, RENode):
+                body += [
+                    'if position < n:',
+                    '    match = {}.match(text(position))'.format(
+                        self.regex(sub)),
+                    '    if match is not None:',
+                    '        return RETree(match, {!r}, '
+                    'line_nos[position]), position + 1'.format(sub.name)
+                ]
+                continue
+
+            if sub is not None and not isinstance(sub, ContainerNode):
+                call = self.call(sub)
+            else:
+                call = self.function_for(nodes)
+
+            body += [
+                'result = {}(position)'.format(call),
+                'if result is not None:',
+                '    return flatten(result[0], True), result[1]'
+                if sub is not None else
+                '    return result'
+            ]
+
+        return body + ['return None']
+
+    def function_for(self, nodes: list) -> str:
+        name = 'node_{}'.format(self.counter)
+        self.counter += 1
+        self.function(name, self.sequence(nodes))
+        return name
+
+    def regex(self, node: RENode) -> str:
+        """
+        Returns the name of the compiled regular expression for a RENode
+        """
+
+        return self.regexes.setdefault(
+            node.raw_re, 'regex_{}'.format(len(self.regexes)))
+
+    def call(self, node) -> str:
+        """
+        Returns the name of the function to call to check a node
+        """
+
+        if isinstance(node, SubGrammarWrapper):
+            key = node.key.upper()
+            if key in self.names:
+                return 'rule_' + self.names[key]
+
+            name = 'missing_{}'.format(self.counter)
+            self.counter += 1
+            self.function(name, ['raise NoSuchGrammar({!r})'.format(
+                'No such grammar as "{}"'.format(key))])
+            return name
+
+        return self.compile(node)
+
+    def inline(self, node, on_fail: str) -> list:
+        """
+        Returns lines checking a node at position; on success these leave
+        its parse tree in tree and advance position, otherwise they run
+        on_fail
+
+        :param node: node to check
+        :param on_fail: statement to run should the node not match
+        """
+
+        if isinstance(node, LiteralNode):
+            return [
+                'if position >= n or text(position) != {!r}:'.format(
+                    node.content),
+                '    ' + on_fail,
+                'tree = LiteralTree({!r}, line_nos[position])'.format(
+                    node.content),
+                'position += 1'
+            ]
+
+        elif isinstance(node, RENode):
+            return [
+                'if position >= n:',
+                '    ' + on_fail,
+                'match = {}.match(text(position))'.format(self.regex(node)),
+                'if match is None:',
+                '    ' + on_fail,
+                'tree = RETree(match, {!r}, line_nos[position])'
+                .format(node.name),
+                'position += 1'
+            ]
+
+        elif (isinstance(node, ContainerNode) and len(node.subs) == 1 and
+                not isinstance(node.subs[0], (LiteralNode, RENode))):
+            return self.inline(node.subs[0], on_fail) + [
+                'tree = flatten(tree, True)'
+            ]
+
+        return [
+            'result = {}(position)'.format(self.call(node)),
+            'if result is None:',
+            '    ' + on_fail,
+            'tree, position = result'
+        ]
+
+
+class GeneratedParser(object):
+    """
+    Wraps a generated module, binding it to a grammar mapping.
+
+    The generated functions recurse once per level of nesting, so tokens
+    nested too deeply for them are instead checked by the fallback, if any
+
+    :param module: module generated by :py:class:`ParserGenerator`
+    :param grammar_mapping: dictionary mapping grammar names to Nodes
+    :param fallback: check function taking the same arguments as \
+    :py:meth:`check`
+    """
+
+    def __init__(self, module, grammar_mapping: dict, fallback=None):
+        self.module = module
+        self.fallback = fallback
+        self.parse = module.build(
+            grammar_mapping,
+            flatten,
+            LiteralNode.LiteralNode,
+            RENode.RENode,
+            NoSuchGrammar
+        )
+
+    def check(self, key: str, tokens, position: int) -> Result:
+        """
+        Checks the named grammar against the tokens, starting at position.
+
+        Returns a :py:class:`Result <tyrian.typarser.grammar_parser.grammar_nodes.Result>`
+        as would :py:meth:`PredictiveParser.check <tyrian.typarser.grammar_parser.predictive.PredictiveParser.check>`
+
+        :param key: name of the grammar
+        :param tokens: tokens to check against
+        :param position: position to start at
+        """
+
+        try:
+            result = self.parse(key, tokens, position)
+        except RuntimeError:
+            # RecursionError, before python 3.5
+            if self.fallback is None:
+                raise
+
+            logger.info('Nested too deeply for the generated parser')
+            return self.fallback(key, tokens, position)
+
+        if result is None:
+            return FAILURE
+
+        parse_tree, end = result
+        return Result(end - position, parse_tree)
+
+
+def _import(filename: str, digest: str):
+    name = 'tyrian_generated_parser_{}'.format(digest[:12])
+    loader = importlib.machinery.SourceFileLoader(name, filename)
+
+    if not hasattr(importlib.util, 'module_from_spec'):
+        # python 3.3 and 3.4; the module is kept out of sys.modules, as it
+        # would be otherwise
+        try:
+            return loader.load_module(name)
+        finally:
+            sys.modules.pop(name, None)
+
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+def _is_fresh(filename: str, digest: str) -> bool:
+    try:
+        with open(filename) as fh:
+            return digest in fh.readline()
+    except OSError:
+        return False
+
+
+def load_generated_parser(grammar_parser, filename: str=None) -> GeneratedParser:
+    """
+    Returns a :py:class:`GeneratedParser` for the grammars of a
+    :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`.
+
+    The generated module is cached in filename, and only regenerated when it
+    was generated from different grammars or token definitions; without a
+    filename, or where it cannot be written, the module is kept in memory
+
+    :param grammar_parser: GrammarParser with parsed grammars
+    :param filename: path to cache the generated module at
+    """
+
+    generator = ParserGenerator(grammar_parser)
+    digest = generator.digest()
+
+    module = None
+    if filename and _is_fresh(filename, digest):
+        logger.info('Importing generated parser from {}'.format(filename))
+        module = _import(filename, digest)
+
+    if module is None or module.GRAMMAR_HASH != digest:
+        logger.info('Generating parser')
+        source = generator.generate()
+
+        if filename:
+            try:
+                # write then rename, so that others never see a partial file
+                temp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+                with open(temp_filename, 'w') as fh:
+                    fh.write(source)
+                os.replace(temp_filename, filename)
+                module = _import(filename, digest)
+            except OSError as e:
+                if filename not in _unwritable:
+                    _unwritable.add(filename)
+                    logger.warning(
+                        'Could not cache generated parser: {}'.format(e))
+
+        if module is None or module.GRAMMAR_HASH != digest:
+            module = types.ModuleType('tyrian_generated_parser')
+            exec(compile(source, filename or '<generated parser>', 'exec'),
+                 module.__dict__)
+
+    return GeneratedParser(
+        module,
+        grammar_parser.grammar_mapping,
+        grammar_parser.backtracking_parser.check
+    )
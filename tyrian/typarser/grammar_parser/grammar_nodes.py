@@ -5,30 +5,69 @@ from collections import namedtuple
 
 # application specific
 from ...utils import logger, flatten
+from ...tokens import TokenBuffer
 from ...exceptions import NoSuchGrammar
 
 logger = logger.getChild('GrammerNodes')
 
 __all__ = [
+    'Result',
+    'FAILURE',
     'GrammarNode',
     'SubGrammarWrapper',
     'MultiNode',
     'LiteralNode',
     'ContainerNode',
     'RENode',
-    'ORNode'
+    'ORNode',
+    'decode_match',
+    'InlinedGrammar',
+    'Guard',
+    'ChoiceNode'
 ]
 
 
+class Result(object):
+    """
+    The outcome of a successful check; failed checks instead return the
+    shared :py:data:`FAILURE`, so that failing allocates nothing.
+
+    Results may be shared, and so are never modified
+
+    :param consumed: number of tokens consumed
+    :param parse_tree: parse tree of the consumed tokens
+    """
+    __slots__ = ('consumed', 'parse_tree')
+
+    def __init__(self, consumed: int, parse_tree):
+        self.consumed = consumed
+        self.parse_tree = parse_tree
+
+    def __repr__(self) -> str:
+        if self is FAILURE:
+            return '<Result FAILURE>'
+        return '<Result consumed={} parse_tree={}>'.format(
+            self.consumed, self.parse_tree)
+
+
+# returned by every failed check
+FAILURE = Result(0, None)
+
+
 class GrammarNode(object):
     """
     Base GrammarNode
+
+    Nodes are checked against a shared
+    :py:class:`TokenBuffer <tyrian.tokens.TokenBuffer>`, starting at the
+    given position, and return a :py:class:`Result` reporting how many
+    tokens they consumed, or :py:data:`FAILURE`
     """
 
     def __repr__(self) -> str:
         raise NotImplementedError()
 
-    def check(self, tokens: list, path: str) -> dict:
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
         raise NotImplementedError()
 
 
@@ -66,26 +105,64 @@ class SubGrammarWrapper(GrammarNode):
                     grammar_mapping[key].__qualname__
                 ))
         else:
-            logger.debug('No mapping found for {}'.format(key))
+            logger.debug('No mapping found for %s', key)
             return token
 
-    def check(self, tokens: list, path: str) -> dict:
-        path += '.<{}>'.format(self.key)
-        logger.debug(path)
-
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
         key = self.key.upper()
+
+        memo = self.grammar_parser_inst.memo
+        if memo is not None:
+            result = memo.get(key, position)
+            if result is not None:
+                return result
+
         try:
             grammar = self.grammar_parser_inst.grammars[key]
         except KeyError:
             raise NoSuchGrammar('No such grammar as "{}"'.format(key))
 
-        result = grammar.check(tokens, path)
-        if result['result']:
-            result['parse_tree'] = self.build_parse_tree(result['parse_tree'])
+        result = grammar.check(tokens, position)
+        if result is not FAILURE:
+            result = Result(
+                result.consumed, self.build_parse_tree(result.parse_tree))
+
+        if memo is not None:
+            memo.put(key, position, result)
 
         return result
 
 
+class InlinedGrammar(SubGrammarWrapper):
+    """
+    Checks the grammar tree of a subgrammar in place of a
+    :py:class:`SubGrammarWrapper`, for subgrammars too simple to be worth
+    looking up or memoising; the grammar mapping is applied as usual
+
+    :param sub: grammar tree of the subgrammar
+    """
+    def __init__(self,
+                 settings: dict,
+                 key: str,
+                 grammar_parser_inst,
+                 sub) -> None:
+        super().__init__(settings, key, grammar_parser_inst)
+
+        sub.parent = self
+        self.sub = sub
+
+    def __repr__(self) -> str:
+        return '<InlinedGrammar key="{}">'.format(self.key)
+
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
+        result = self.sub.check(tokens, position)
+        if result is FAILURE:
+            return FAILURE
+
+        return Result(
+            result.consumed, self.build_parse_tree(result.parse_tree))
+
+
 class ContainerNode(GrammarNode):
     """
     Serves as a container for one or more sub Nodes
@@ -107,39 +184,23 @@ class ContainerNode(GrammarNode):
     def __repr__(self) -> str:
         return '<ContainerNode len(subs)=={}>'.format(len(self.subs))
 
-    def check(self, tokens: list, path: str) -> dict:
-        logger.debug(path + '.CN')
-
-        response = {
-            'tokens': [],
-            'parse_tree': []
-        }
-
-        result = True
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
+        parse_tree = []
         consumed = 0
         for node in self.subs:
-            cur = node.check(tokens[consumed:], path)
+            cur = node.check(tokens, position + consumed)
 
-            result = result and cur['result']
-            if result:
-                consumed += cur['consumed']
-                response['tokens'] += cur['tokens']
+            if cur is FAILURE:
+                return FAILURE
 
-                response['parse_tree'].append(cur['parse_tree'])
-            else:
-                logger.debug(path + ' failed')
-                break
+            consumed += cur.consumed
+            parse_tree.append(cur.parse_tree)
 
-        response.update({
-            'result': result,
-            'consumed': consumed if result else 0,
-            'parse_tree': flatten(
-                response['parse_tree'],
-                can_return_single=True
-            )
-        })
+        if len(parse_tree) == 1:
+            # as would flatten(parse_tree, can_return_single=True)
+            parse_tree = flatten(parse_tree[0], can_return_single=True)
 
-        return response
+        return Result(consumed, parse_tree)
 
 
 class LiteralNode(GrammarNode):
@@ -149,6 +210,8 @@ class LiteralNode(GrammarNode):
     :param content: content against which to test
     """
     LiteralNode = namedtuple('LiteralNode', 'content,line_no')
+    # such that parse trees can be pickled
+    LiteralNode.__qualname__ = 'LiteralNode.LiteralNode'
 
     def __init__(self, settings: dict, content):
         # these setting are for the grammar mappings and such
@@ -159,21 +222,30 @@ class LiteralNode(GrammarNode):
     def __repr__(self) -> str:
         return '<LiteralNode content={}>'.format(repr(self.content))
 
-    def check(self, tokens: list, path: str) -> dict:
-        logger.debug(path + '.LN<' + self.content + '>')
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
+        if position >= len(tokens):
+            # we have run out of tokens
+            return FAILURE
 
-        if tokens:
-            token = tokens[0]['token']
-            result = token == self.content
-        else:
-            result = False
+        token = tokens.text(position)
+        if token != self.content:
+            return FAILURE
+
+        return Result(1, self.LiteralNode(token, tokens.line_no(position)))
 
-        return {
-            'result': result,
-            'consumed': 1 if result else 0,
-            'tokens': [token] if result else [],
-            'parse_tree': self.LiteralNode(token, tokens[0]['line_no'])
-        }
+
+def decode_match(match):
+    """
+    Returns the value of a token matched by a regular expression; the first
+    group of the match, as a float should it read as one
+    """
+
+    try:
+        match = match.groups()[0]
+        match = float(match)
+    except (IndexError, TypeError, ValueError):
+        pass
+    return match
 
 
 class RENode(GrammarNode):
@@ -183,7 +255,64 @@ class RENode(GrammarNode):
     :param regex: regular expression to match against
     :param name: name of what the regular expression tests for
     """
-    RENode = namedtuple('RENode', 'content,name,line_no')
+
+    class RENode(object):
+        """
+        Parse tree of a token matched by a RENode.
+
+        Only the text of the token and the regular expression are kept; the
+        content, as returned by :py:func:`decode_match`, is decoded when
+        first asked for, such that the trees of branches thrown away by
+        backtracking, or of tokens never compiled, cost no more than that
+
+        It may still be taken apart as the tuple of content, name and line
+        number it used to be, such as by a
+        :py:class:`ListNode <tyrian.nodes.ListNode>` built from a single
+        token
+
+        :param match: match of the regular expression against the token
+        :param name: name of what the regular expression tests for
+        :param line_no: line the token was found on
+        """
+        __slots__ = ('text', 'regex', 'name', 'line_no', '_content')
+
+        def __init__(self, match, name: str, line_no: int):
+            self.text = match.string
+            self.regex = match.re
+            self.name = name
+            self.line_no = line_no
+
+        @property
+        def content(self):
+            try:
+                return self._content
+            except AttributeError:
+                self._content = decode_match(self.regex.match(self.text))
+                return self._content
+
+        def __len__(self) -> int:
+            return 3
+
+        def __getitem__(self, index):
+            return (self.content, self.name, self.line_no)[index]
+
+        def __iter__(self):
+            return iter((self.content, self.name, self.line_no))
+
+        def __eq__(self, other) -> bool:
+            return (
+                isinstance(other, RENode.RENode) and
+                self.text == other.text and
+                self.name == other.name and
+                self.line_no == other.line_no
+            )
+
+        def __hash__(self) -> int:
+            return hash((self.text, self.name, self.line_no))
+
+        def __repr__(self) -> str:
+            return 'RENode(content={!r}, name={!r}, line_no={!r})'.format(
+                self.content, self.name, self.line_no)
 
     def __init__(self, settings: dict, regex, name):
         # these setting are for the grammar mappings and such
@@ -196,35 +325,22 @@ class RENode(GrammarNode):
     def __repr__(self) -> str:
         return '<RENode regex="{}">'.format(self.raw_re)
 
-    def check(self, tokens: list, path: str) -> dict:
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
+        if position >= len(tokens):
+            # we have run out of tokens
+            return FAILURE
 
-        token = tokens[0]['token']
+        token = tokens.text(position)
 
-        logger.debug(path + '.REN<' + self.raw_re + '><' + token + '>')
         match = self.RE.match(token)
-        result = bool(match)
+        if not match:
+            return FAILURE
 
-        if result:
-            try:
-                match = match.groups()[0]
-                match = float(match)
-            except:
-                pass
-
-            parse_tree = self.RENode(
-                match,
-                self.name,
-                tokens[0]['line_no']
-            )
-        else:
-            parse_tree = None
-
-        return {
-            'result': result,
-            'consumed': 1 if result else 0,
-            'tokens': [token] if result else [],
-            'parse_tree': parse_tree
-        }
+        return Result(1, self.RENode(
+            match,
+            self.name,
+            tokens.line_no(position)
+        ))
 
 
 class ORNode(GrammarNode):
@@ -248,33 +364,19 @@ class ORNode(GrammarNode):
         return '<ORNode left={} right={}>'.format(
             self.left, self.right)
 
-    def check(self, tokens: list, path: str) -> dict:
-        path += '.ORN'
-        logger.debug(path)
-
-        left_result = self.left.check(tokens, path)
-        logger.debug('Left: {}'.format(left_result))
-
-        if left_result['result']:
-            left_result['parse_tree'] = flatten(
-                left_result['parse_tree'], can_return_single=True)
-            return left_result
-
-        right_result = self.right.check(tokens, path)
-        right_result.__repr__()
-
-        logger.debug('Right: {}'.format(right_result))
-        if right_result['result']:
-            right_result['parse_tree'] = flatten(
-                right_result['parse_tree'], can_return_single=True)
-            return right_result
-
-        return {
-            'result': False,
-            'consumed': 0,
-            'tokens': [],
-            'parse_tree': False
-        }
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
+        result = self.left.check(tokens, position)
+        if result is FAILURE:
+            result = self.right.check(tokens, position)
+            if result is FAILURE:
+                return FAILURE
+
+        if type(result.parse_tree) == list:
+            result = Result(
+                result.consumed,
+                flatten(result.parse_tree, can_return_single=True)
+            )
+        return result
 
 
 class MultiNode(GrammarNode):
@@ -293,34 +395,139 @@ class MultiNode(GrammarNode):
     def __repr__(self) -> str:
         return '<MultiNode token={}>'.format(self.subs)
 
-    def check(self, tokens: list, path: str) -> dict:
-        path += '.MN'
-        logger.debug(path)
-
-        response = {
-            'tokens': [],
-            'result': False,
-            'parse_tree': []
-        }
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
+        parse_tree = []
         consumed = 0
-        while len(tokens) > consumed and tokens[consumed:]:
-            r = self.subs.check(tokens[consumed:], path)
-
-            if r['result']:
-                response['result'] = True
-                response['parse_tree'].append(r['parse_tree'])
-            else:
-                logger.debug(path + ' failed')
+        while len(tokens) > position + consumed:
+            r = self.subs.check(tokens, position + consumed)
+
+            if r is FAILURE:
                 break
 
-            consumed += r['consumed']
-            response['tokens'] += r['tokens']
+            consumed += r.consumed
+            parse_tree.append(r.parse_tree)
 
-        response["consumed"] = consumed if response['result'] else 0
-        if not response['result']:
-            response['tokens'] = []
-            response['parse_tree'] = []
-        else:
-            response['parse_tree'] = flatten(
-                response['parse_tree'], can_return_single=True)
-        return response
+        if not parse_tree:
+            return FAILURE
+
+        if len(parse_tree) == 1:
+            # as would flatten(parse_tree, can_return_single=True)
+            parse_tree = flatten(parse_tree[0], can_return_single=True)
+
+        return Result(consumed, parse_tree)
+
+
+class Guard(object):
+    """
+    Tests whether the token at a position could start a match, given the
+    literals and regular expressions making up a FIRST set. Only nodes that
+    cannot match nothing may be guarded, as no token is found at the end of
+    the tokens
+
+    :param literals: literal contents of tokens that may start a match
+    :param regexes: raw regular expressions matching tokens that may \
+    start a match
+    """
+    __slots__ = ('literals', 'regexes')
+
+    def __init__(self, literals, regexes):
+        self.literals = frozenset(literals)
+        self.regexes = [re.compile(regex) for regex in sorted(set(regexes))]
+
+    def __repr__(self) -> str:
+        return '<Guard literals={} regexes={}>'.format(
+            sorted(self.literals),
+            [regex.pattern for regex in self.regexes])
+
+    def accepts(self, tokens: TokenBuffer, position: int) -> bool:
+        if position >= len(tokens):
+            return False
+
+        token = tokens.text(position)
+        if token in self.literals:
+            return True
+
+        for regex in self.regexes:
+            if regex.match(token):
+                return True
+        return False
+
+
+class ChoiceNode(GrammarNode):
+    """
+    Checks alternative sequences of nodes in turn, producing the same parse
+    trees as would a chain of ORNode's between ContainerNode's.
+
+    Consecutive alternatives sharing their leading nodes are grouped, such
+    that those nodes are only checked once for the group, and each group and
+    alternative may be guarded by the tokens it can start with.
+
+    Produced by the :py:class:`GrammarOptimiser <tyrian.typarser.grammar_parser.optimiser.GrammarOptimiser>`
+
+    :param groups: list of (guard, prefix, tails) tuples; the :py:class:`Guard` \
+    of the group or None, the nodes shared by the group, and a list of \
+    (guard, nodes) tuples for the remainder of each alternative
+    """
+    def __init__(self, settings: dict, groups: list):
+        # these setting are for the grammar mappings and such
+        self.settings = copy(settings)
+
+        for _, prefix, tails in groups:
+            for node in prefix:
+                node.parent = self
+            for _, nodes in tails:
+                for node in nodes:
+                    node.parent = self
+
+        self.groups = groups
+
+    def __repr__(self) -> str:
+        return '<ChoiceNode alternatives={}>'.format(
+            sum(len(tails) for _, _, tails in self.groups))
+
+    def sequence(self,
+                 nodes: list,
+                 tokens: TokenBuffer,
+                 position: int) -> Result:
+        "Checks each of the nodes in turn, collecting their parse trees"
+
+        parse_tree = []
+        consumed = 0
+        for node in nodes:
+            cur = node.check(tokens, position + consumed)
+            if cur is FAILURE:
+                return FAILURE
+
+            consumed += cur.consumed
+            parse_tree.append(cur.parse_tree)
+
+        return Result(consumed, parse_tree)
+
+    def check(self, tokens: TokenBuffer, position: int) -> Result:
+        for guard, prefix, tails in self.groups:
+            if guard is not None and not guard.accepts(tokens, position):
+                continue
+
+            shared = self.sequence(prefix, tokens, position)
+            if shared is FAILURE:
+                continue
+
+            for tail_guard, nodes in tails:
+                tail_position = position + shared.consumed
+                if (tail_guard is not None and
+                        not tail_guard.accepts(tokens, tail_position)):
+                    continue
+
+                rest = self.sequence(nodes, tokens, tail_position)
+                if rest is FAILURE:
+                    continue
+
+                parse_tree = shared.parse_tree + rest.parse_tree
+                if len(parse_tree) == 1:
+                    # as would flatten(parse_tree, can_return_single=True)
+                    parse_tree = flatten(
+                        parse_tree[0], can_return_single=True)
+
+                return Result(shared.consumed + rest.consumed, parse_tree)
+
+        return FAILURE
@@ -13,6 +13,13 @@ from .grammar_nodes import (
     RENode,
     ORNode
 )
+from .packrat import PackratMemo
+from .predictive import PredictiveParser
+from .backtracking import BacktrackingParser
+from .optimiser import GrammarOptimiser
+from .profiler import ParseProfiler
+from .generator import load_generated_parser
+from .reader import SExpressionReader
 from ...utils import logger
 from ...exceptions import GrammarDefinitionError
 
@@ -28,6 +35,27 @@ class GrammarParser(object):
     :func:`load_grammar <tyrian.typarser.grammar_parser.GrammarParser.load_grammar>`
     :param token_defs: dictionary of token definitions, see \
     :func:`load_token_definitions <tyrian.typarser.grammar_parser.GrammarParser.load_token_definitions>`
+    :param settings: dictionary of settings; setting ``packrat`` memoises \
+    the result of each grammar at each position, keeping up to \
+    ``packrat_size`` results; only the \
+    :py:class:`BacktrackingParser <tyrian.typarser.grammar_parser.backtracking.BacktrackingParser>` \
+    consults the memo, so it pays off only alongside a ``parser_engine`` \
+    of ``"backtracking"``. Setting ``parser_engine`` to \
+    ``"backtracking"`` disables the \
+    :py:class:`PredictiveParser <tyrian.typarser.grammar_parser.predictive.PredictiveParser>`, \
+    whilst setting it to ``"generated"``, or setting ``generated_parser`` \
+    to the path to cache it at, uses a parser generated by the \
+    :py:class:`ParserGenerator <tyrian.typarser.grammar_parser.generator.ParserGenerator>`. \
+    The bundled Grammar is read by the \
+    :py:class:`SExpressionReader <tyrian.typarser.grammar_parser.reader.SExpressionReader>` \
+    unless ``parser_engine`` names another engine. Setting \
+    ``optimise_grammars`` to False has the \
+    :py:class:`BacktrackingParser <tyrian.typarser.grammar_parser.backtracking.BacktrackingParser>` \
+    check the grammar trees as parsed, rather than as optimised by the \
+    :py:class:`GrammarOptimiser <tyrian.typarser.grammar_parser.optimiser.GrammarOptimiser>`. \
+    Setting ``profile`` records the grammars checked in a \
+    :py:class:`ParseProfiler <tyrian.typarser.grammar_parser.profiler.ParseProfiler>`, \
+    kept as `profiler`
     """
 
     def __init__(self,
@@ -36,7 +64,7 @@ class GrammarParser(object):
                  grammar_mapping: dict=None,
                  settings: dict=None):
 
-        self.settings = {}
+        self.settings = dict(settings or {})
         self.loaded_grammars = {}
         self.tokens_loaded = False
         self.grammar_loaded = False
@@ -49,6 +77,17 @@ class GrammarParser(object):
             '\n': ' '
         })
 
+        if self.settings.get('packrat'):
+            self.memo = PackratMemo(
+                int(self.settings.get('packrat_size', 100000)))
+        else:
+            self.memo = None
+
+        if self.settings.get('profile'):
+            self.profiler = ParseProfiler()
+        else:
+            self.profiler = None
+
         if grammar_mapping:
             self.load_grammar_mapping(grammar_mapping)
 
@@ -258,6 +297,59 @@ class GrammarParser(object):
         logger.info('Grammar trees loaded')
 
         self.grammars = parsed_grammars
+        self.backtracking_parser = BacktrackingParser(self)
+
+        logger.info('Building prediction tables')
+        self.predictive_parser = PredictiveParser(self)
+
+        if self.settings.get('optimise_grammars', True):
+            logger.info('Optimising grammar trees')
+            self.optimised_grammars = GrammarOptimiser(
+                self, self.predictive_parser.analysis).optimise()
+        else:
+            self.optimised_grammars = self.grammars
+
+        engine = self.settings.get('parser_engine')
+        if self.memo is not None and engine != 'backtracking':
+            logger.warning('Packrat parsing only applies to the backtracking '
+                           'engine, set parser_engine to "backtracking"')
+
+        if engine in (None, 'reader') and SExpressionReader.supports(self):
+            logger.info('Using the s-expression reader')
+            self.reader = SExpressionReader(self)
+        else:
+            if engine == 'reader':
+                logger.warning('The s-expression reader does not support '
+                               'this grammar')
+            self.reader = None
+
+        self.prepare_generated_parser()
+
+    def prepare_generated_parser(self):
+        """
+        Loads the generated parser, should the settings call for it
+        """
+
+        engine = self.settings.get('parser_engine')
+        filename = self.settings.get('generated_parser')
+        if (engine == 'generated' or
+                (engine is None and filename and self.reader is None)):
+            self.generated_parser = load_generated_parser(self, filename)
+        else:
+            self.generated_parser = None
+
+    def __getstate__(self) -> dict:
+        # the generated parser is a module, and is reloaded instead
+        state = self.__dict__.copy()
+        state.pop('generated_parser', None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        if 'grammars' in state:
+            self.prepare_generated_parser()
+        else:
+            self.generated_parser = None
 
     def parse_grammar(self,
                       grammar: str,
@@ -283,7 +375,7 @@ class GrammarParser(object):
             # grab the first token, tell the Nodes
             token = grammar.pop(0)
             settings['token'] = token
-            logger.debug('token: {}'.format(token))
+            logger.debug('token: %s', token)
 
             if token.upper() in self.token_defs['literal']:
                 # if its a literal token
@@ -0,0 +1,226 @@
+"""
+Rewrites grammar trees into trees that produce the same parse trees, but
+are quicker to check
+"""
+
+# standard library
+from collections import OrderedDict
+
+# application specific
+from ...utils import logger
+from .analysis import alternatives, symbol
+from .grammar_nodes import (
+    SubGrammarWrapper,
+    InlinedGrammar,
+    ContainerNode,
+    LiteralNode,
+    ChoiceNode,
+    MultiNode,
+    RENode,
+    ORNode,
+    Guard
+)
+
+logger = logger.getChild('GrammarOptimiser')
+
+__all__ = ['GrammarOptimiser']
+
+
+class GrammarOptimiser(object):
+    """
+    Optimises the grammar trees of a
+    :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`,
+    for checking by the
+    :py:class:`BacktrackingParser <tyrian.typarser.grammar_parser.backtracking.BacktrackingParser>`;
+
+    * subgrammars consisting only of terminals, such as
+      ``number ::= NUMBER_RE``, are inlined
+    * ContainerNode's holding a single node are replaced by that node
+    * chains of ORNode's are replaced by
+      :py:class:`ChoiceNode <tyrian.typarser.grammar_parser.grammar_nodes.ChoiceNode>`'s,
+      left factoring consecutive alternatives sharing their leading nodes,
+      and guarding each by its FIRST set, such that an alternative can be
+      rejected by peeking at a single token
+
+    As ORNode's prefer their left side, the alternatives keep their order;
+    as such, only consecutive alternatives are factored.
+
+    The original trees are left untouched
+
+    :param grammar_parser: GrammarParser with parsed grammars
+    :param analysis: :py:class:`GrammarAnalysis <tyrian.typarser.grammar_parser.analysis.GrammarAnalysis>` \
+    of the grammars
+    """
+
+    def __init__(self, grammar_parser, analysis):
+        self.grammar_parser = grammar_parser
+        self.grammars = grammar_parser.grammars
+        self.grammar_mapping = grammar_parser.grammar_mapping
+        self.analysis = analysis
+
+        self.stats = OrderedDict(
+            (name, 0)
+            for name in ['inlined', 'collapsed', 'factored', 'guarded']
+        )
+
+    def optimise(self) -> dict:
+        """
+        Returns a dictionary mapping grammar names to optimised grammar
+        trees
+        """
+
+        optimised = {
+            key: self.optimise_node(root)
+            for key, root in self.grammars.items()
+        }
+
+        logger.info('Optimised grammars: {}'.format(', '.join(
+            '{} {}'.format(count, name)
+            for name, count in self.stats.items()
+        )))
+
+        return optimised
+
+    def is_mapped(self, node) -> bool:
+        """
+        Whether the node is a subgrammar with a grammar mapping; the parse
+        trees of any other node are never lists of a single item
+        """
+
+        return (
+            isinstance(node, SubGrammarWrapper) and
+            node.key.upper() in self.grammar_mapping
+        )
+
+    def optimise_node(self, node):
+        """
+        Returns the optimised equivalent of a grammar node
+        """
+
+        if isinstance(node, SubGrammarWrapper):
+            return self.inline(node)
+
+        elif isinstance(node, ContainerNode):
+            subs = [self.optimise_node(sub) for sub in node.subs]
+
+            if len(subs) == 1 and not self.is_mapped(subs[0]):
+                # the parse tree of the sub node would only be flattened
+                self.stats['collapsed'] += 1
+                return subs[0]
+
+            if all(new is old for new, old in zip(subs, node.subs)):
+                return node
+            return ContainerNode(dict(node.settings), subs)
+
+        elif isinstance(node, MultiNode):
+            sub = self.optimise_node(node.subs)
+            if sub is node.subs:
+                return node
+            return MultiNode(dict(node.settings), sub)
+
+        elif isinstance(node, ORNode):
+            return self.choice(node)
+
+        return node
+
+    def terminals(self, key: str) -> list:
+        """
+        Returns the terminals making up the named grammar, or None should
+        it consist of anything else
+        """
+
+        node = self.grammars[key.upper()]
+        while (isinstance(node, ContainerNode) and len(node.subs) == 1 and
+                isinstance(node.subs[0], ContainerNode)):
+            node = node.subs[0]
+
+        terminals = (LiteralNode, RENode)
+        if node.subs and all(isinstance(sub, terminals) for sub in node.subs):
+            return node.subs
+        return None
+
+    def inline(self, node: SubGrammarWrapper):
+        """
+        Returns the terminals of a subgrammar consisting only of terminals,
+        in place of the SubGrammarWrapper; those with a grammar mapping are
+        wrapped in an
+        :py:class:`InlinedGrammar <tyrian.typarser.grammar_parser.grammar_nodes.InlinedGrammar>`
+        """
+
+        terminals = self.terminals(node.key)
+        if terminals is None:
+            return node
+
+        self.stats['inlined'] += 1
+
+        if len(terminals) == 1:
+            sub = terminals[0]
+        else:
+            sub = ContainerNode(dict(node.settings), list(terminals))
+
+        if not self.is_mapped(node):
+            return sub
+
+        return InlinedGrammar(
+            dict(node.settings), node.key, node.grammar_parser_inst, sub)
+
+    def guard(self, nodes: list) -> Guard:
+        """
+        Returns a :py:class:`Guard <tyrian.typarser.grammar_parser.grammar_nodes.Guard>`
+        for the FIRST set of the sequences of nodes, or None should any
+        sequence be able to match nothing
+
+        :param nodes: list of sequences of nodes
+        """
+
+        literals, regexes = [], []
+        for sequence in nodes:
+            first, nullable = self.analysis.first_of_sequence(sequence)
+            if nullable:
+                return None
+
+            for terminal in first:
+                if terminal.kind == 'literal':
+                    literals.append(terminal.value)
+                else:
+                    regexes.append(terminal.value)
+
+        self.stats['guarded'] += 1
+        return Guard(literals, regexes)
+
+    def choice(self, node: ORNode) -> ChoiceNode:
+        """
+        Returns the :py:class:`ChoiceNode <tyrian.typarser.grammar_parser.grammar_nodes.ChoiceNode>`
+        equivalent to a chain of ORNode's
+        """
+
+        # runs of consecutive alternatives starting with the same symbol
+        runs = []
+        for alternative in alternatives(node):
+            if (runs and runs[-1][0] and alternative and
+                    symbol(runs[-1][0][0]) == symbol(alternative[0])):
+                runs[-1].append(alternative)
+            else:
+                runs.append([alternative])
+
+        groups = []
+        for run in runs:
+            shared = 0
+            while (shared < min(map(len, run)) and
+                    len({symbol(nodes[shared]) for nodes in run}) == 1):
+                shared += 1
+
+            if len(run) > 1:
+                self.stats['factored'] += 1
+
+            prefix = [self.optimise_node(sub) for sub in run[0][:shared]]
+            tails = [
+                (
+                    self.guard([nodes[shared:]]) if len(run) > 1 else None,
+                    [self.optimise_node(sub) for sub in nodes[shared:]]
+                )
+                for nodes in run
+            ]
+            groups.append((self.guard(run), prefix, tails))
+
+        return ChoiceNode(dict(node.settings), groups)
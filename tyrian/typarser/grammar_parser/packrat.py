@@ -0,0 +1,115 @@
+"""
+Memoisation of grammar checks, for packrat parsing
+"""
+
+# standard library
+from array import array
+
+# application specific
+from .grammar_nodes import Result, FAILURE
+
+__all__ = ['PackratMemo']
+
+# marks in the tables of tokens consumed, for positions not yet checked and
+# for failures
+UNKNOWN = -1
+FAILED = -2
+
+
+class PackratMemo(object):
+    """
+    Maps a grammar and a position in the tokens to the result of checking
+    that grammar at that position, such that no grammar is checked twice at
+    the same position.
+
+    Each grammar has a table of its own, indexed by position, holding an
+    array of the tokens consumed and a list of the parse trees; storing a
+    result thus allocates nothing, the Result being rebuilt on a hit, and
+    failures as the shared
+    :py:data:`FAILURE <tyrian.typarser.grammar_parser.grammar_nodes.FAILURE>`.
+    Once full, the memo starts afresh
+
+    :param max_size: maximum number of results to hold
+    """
+
+    def __init__(self, max_size: int=100000):
+        self.max_size = max_size
+        self.tables = {}
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return '<PackratMemo len={} hits={} misses={}>'.format(
+            self.size, self.hits, self.misses)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get(self, key: str, position: int) -> Result:
+        """
+        Returns the result stored for the grammar at position, or None
+
+        :param key: name of the grammar
+        :param position: position the grammar was checked at
+        """
+
+        table = self.tables.get(key)
+        if table is not None:
+            consumed, parse_trees = table
+            if position < len(consumed):
+                count = consumed[position]
+                if count != UNKNOWN:
+                    self.hits += 1
+                    if count == FAILED:
+                        return FAILURE
+                    return Result(count, parse_trees[position])
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, position: int, result: Result):
+        """
+        Stores the result of the grammar at position, first forgetting every
+        stored result if the memo is full
+
+        :param key: name of the grammar
+        :param position: position the grammar was checked at
+        :param result: result of the check
+        """
+
+        if self.size >= self.max_size:
+            self.tables.clear()
+            self.size = 0
+
+        try:
+            consumed, parse_trees = self.tables[key]
+        except KeyError:
+            consumed, parse_trees = self.tables[key] = array('l'), []
+
+        missing = position + 1 - len(consumed)
+        if missing > 0:
+            consumed.extend(array('l', [UNKNOWN]) * missing)
+            parse_trees.extend([None] * missing)
+
+        if consumed[position] == UNKNOWN:
+            self.size += 1
+
+        if result is FAILURE:
+            consumed[position] = FAILED
+            parse_trees[position] = None
+        else:
+            consumed[position] = result.consumed
+            parse_trees[position] = result.parse_tree
+
+    def clear(self):
+        """
+        Forgets all stored results; as positions are only meaningful within a
+        single list of tokens, this must be called before parsing another
+        """
+
+        self.tables.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
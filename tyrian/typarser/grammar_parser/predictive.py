@@ -0,0 +1,442 @@
+"""
+Table driven, predictive parsing for those grammars that are LL(1)
+"""
+
+# standard library
+from collections import OrderedDict
+
+# application specific
+from ...utils import logger, flatten
+from .analysis import (
+    GrammarAnalysis,
+    alternatives,
+    overlapping,
+    symbol
+)
+from .grammar_nodes import (
+    Result,
+    FAILURE,
+    SubGrammarWrapper,
+    ContainerNode,
+    LiteralNode,
+    MultiNode,
+    RENode,
+    ORNode
+)
+
+logger = logger.getChild('PredictiveParser')
+
+__all__ = ['PredictiveParser']
+
+TERMINAL, RULE, SEQUENCE, REPEAT, CHOICE = range(5)
+
+# outcomes of a prediction, besides the index of a branch
+END, FAIL = -1, -2
+
+# the prediction tables are keyed by token text; stop remembering
+# predictions past this many distinct tokens, so as not to grow unbounded
+TABLE_LIMIT = 4096
+
+# marks that a frame has yet to receive a parse tree from a sub frame
+NOTHING = object()
+
+
+class Decision(object):
+    """
+    A row of the prediction table; picks an outcome by testing the next
+    token against the FIRST set of each option in turn.
+
+    Predictions are remembered by token text, so that after warming up
+    each decision costs a single dictionary lookup
+
+    :param options: list of (FIRST set, outcome) tuples
+    :param default: outcome when no option matches
+    """
+    __slots__ = ('options', 'default', 'table')
+
+    def __init__(self, options: list, default):
+        self.options = options
+        self.default = default
+        self.table = {}
+
+    def predict(self, tokens, position: int):
+        if position >= len(tokens):
+            return self.default
+
+        text = tokens.text(position)
+        try:
+            return self.table[text]
+        except KeyError:
+            pass
+
+        for first, outcome in self.options:
+            if any(terminal.matches(text) for terminal in first):
+                break
+        else:
+            outcome = self.default
+
+        if len(self.table) < TABLE_LIMIT:
+            self.table[text] = outcome
+
+        return outcome
+
+
+class Item(object):
+    """
+    A grammar node compiled for the predictive engine
+    """
+    __slots__ = ('kind', 'node', 'items', 'decision', 'trie')
+
+    def __init__(self, kind: int, node, items: list=None,
+                 decision: Decision=None, trie=None):
+        self.kind = kind
+        self.node = node
+        self.items = items
+        self.decision = decision
+        self.trie = trie
+
+
+class Trie(object):
+    """
+    The left factored alternatives of a chain of ORNode's.
+
+    Alternatives sharing a leading node are reached through the same edge,
+    such that the shared node is only checked once
+
+    :param end: index of the alternative that ends here, if any
+    """
+    __slots__ = ('edges', 'end', 'decision')
+
+    def __init__(self, end: int=None):
+        self.edges = []
+        self.end = end
+        self.decision = None
+
+
+class PredictiveParser(object):
+    """
+    Compiles the grammars of a
+    :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`
+    into items driven by prediction tables, built from their FIRST and FOLLOW
+    sets, and checks them with an explicit stack rather than by recursion.
+
+    Grammars that are not LL(1), even after left factoring, are checked by
+    the :py:class:`BacktrackingParser <tyrian.typarser.grammar_parser.backtracking.BacktrackingParser>`
+    instead.
+
+    As ORNode's prefer their left side, terminals are tested in the order
+    the alternatives are defined in; overlapping terminals are permitted
+    where the earlier alternative is decided by its first token alone.
+
+    :param grammar_parser: GrammarParser with parsed grammars
+    """
+
+    def __init__(self, grammar_parser):
+        self.grammar_parser = grammar_parser
+        self.grammars = grammar_parser.grammars
+        self.backtracking = grammar_parser.backtracking_parser
+
+        start_token = grammar_parser.settings.get('start_token')
+        self.analysis = GrammarAnalysis(
+            self.grammars,
+            start_token.upper() if start_token else None
+        )
+
+        self.conflicts = OrderedDict()
+        self.rules = {}
+
+        for key, root in self.grammars.items():
+            self.conflicts[key] = []
+            if key in self.analysis.left_recursive:
+                self.conflicts[key].append('left recursive')
+
+            item = self.compile(key, root)
+            if not self.conflicts[key]:
+                self.rules[key] = item
+
+        logger.info('LL(1) grammars: {}'.format(', '.join(self.rules)))
+        for key, conflicts in self.conflicts.items():
+            for conflict in conflicts:
+                logger.info('{} is not LL(1): {}'.format(key, conflict))
+
+    def is_ll1(self, key: str) -> bool:
+        """
+        Whether the named grammar is checked by the predictive engine
+        """
+
+        return key.upper() in self.rules
+
+    def compile(self, key: str, node) -> Item:
+        """
+        Compiles a grammar node into an :py:class:`Item`, noting any
+        conflicts found against the named grammar
+
+        :param key: name of the grammar being compiled
+        :param node: node to compile
+        """
+
+        if isinstance(node, (LiteralNode, RENode)):
+            return Item(TERMINAL, node)
+
+        elif isinstance(node, SubGrammarWrapper):
+            return Item(RULE, node)
+
+        elif isinstance(node, ContainerNode):
+            return Item(
+                SEQUENCE, node, [self.compile(key, sub) for sub in node.subs])
+
+        elif isinstance(node, MultiNode):
+            return self.compile_repeat(key, node)
+
+        elif isinstance(node, ORNode):
+            options = list(enumerate(alternatives(node)))
+            return Item(
+                CHOICE, node, trie=self.build_trie(key, node, options, 0))
+
+        raise TypeError(node)
+
+    def compile_repeat(self, key: str, node: MultiNode) -> Item:
+        analysis = self.analysis
+        sub = node.subs
+
+        if analysis.nullable[sub]:
+            self.conflicts[key].append(
+                '{} repeats something that can match nothing'.format(node))
+
+        elif (overlapping(analysis.first[sub], analysis.follow[node]) and
+                not analysis.decided_by_first(sub)):
+            self.conflicts[key].append(
+                'FIRST/FOLLOW conflict in {}'.format(node))
+
+        return Item(
+            REPEAT,
+            node,
+            items=[self.compile(key, sub)],
+            decision=Decision([(analysis.first[sub], True)], False)
+        )
+
+    def build_trie(self,
+                   key: str,
+                   or_node: ORNode,
+                   alternatives: list,
+                   depth: int) -> Trie:
+        """
+        Left factors the alternatives, each of which share their first
+        `depth` nodes, into a :py:class:`Trie`
+
+        :param key: name of the grammar being compiled
+        :param or_node: outermost ORNode of the chain
+        :param alternatives: list of (index, list of nodes) tuples
+        :param depth: number of nodes already shared
+        """
+
+        trie = Trie()
+        groups = OrderedDict()
+
+        for index, nodes in alternatives:
+            if len(nodes) == depth:
+                if trie.end is None:
+                    trie.end = index
+            else:
+                groups.setdefault(
+                    symbol(nodes[depth]), []).append((index, nodes))
+
+        for group in groups.values():
+            first_index, nodes = group[0]
+            if trie.end is not None and first_index > trie.end:
+                # an earlier alternative will always have matched
+                continue
+
+            trie.edges.append((
+                nodes[depth],
+                self.compile(key, nodes[depth]),
+                self.build_trie(key, or_node, group, depth + 1)
+            ))
+
+        self.check_trie(key, or_node, trie)
+
+        if not trie.edges or (len(trie.edges) == 1 and trie.end is None):
+            # nothing to decide between
+            trie.decision = None
+        else:
+            trie.decision = Decision(
+                [
+                    (self.analysis.first[node], index)
+                    for index, (node, _, _) in enumerate(trie.edges)
+                ],
+                FAIL if trie.end is None else END
+            )
+
+        return trie
+
+    def check_trie(self, key: str, or_node: ORNode, trie: Trie):
+        """
+        Notes any conflicts between the edges of a trie
+        """
+
+        analysis = self.analysis
+        conflicts = self.conflicts[key]
+
+        if len(trie.edges) < 2 and trie.end is None:
+            return
+
+        for index, (node, _, child) in enumerate(trie.edges):
+            if analysis.nullable[node]:
+                conflicts.append(
+                    '{} in {} can match nothing'.format(node, or_node))
+
+            # an earlier alternative decided by its first token alone
+            # will win over any later ones, as it would when backtracking
+            decided = (
+                not child.edges and
+                analysis.decided_by_first(node)
+            )
+
+            for other, _, _ in trie.edges[index + 1:]:
+                if (not decided and
+                        overlapping(analysis.first[node], analysis.first[other])):
+                    conflicts.append(
+                        'FIRST/FIRST conflict between {} and {} in {}'.format(
+                            node, other, or_node))
+
+        if trie.end is not None:
+            # the edges are all preferred to the end, so an edge decided by
+            # its first token alone wins whatever follows, as it would when
+            # backtracking
+            for node, _, child in trie.edges:
+                decided = (
+                    not child.edges and
+                    analysis.decided_by_first(node)
+                )
+                if not decided and overlapping(
+                        analysis.first[node], analysis.follow[or_node]):
+                    conflicts.append(
+                        'FIRST/FOLLOW conflict for {} in {}'.format(
+                            node, or_node))
+
+    def check(self, key: str, tokens, position: int) -> Result:
+        """
+        Checks the named grammar against the tokens, starting at position.
+
+        Returns a :py:class:`Result <tyrian.typarser.grammar_parser.grammar_nodes.Result>`
+        as would :py:meth:`GrammarNode.check <tyrian.typarser.grammar_parser.grammar_nodes.GrammarNode.check>`,
+        save that the grammar mapping for the named grammar itself is not
+        applied
+
+        :param key: name of an LL(1) grammar
+        :param tokens: tokens to check against
+        :param position: position to start at
+        """
+
+        profiler = self.grammar_parser.profiler
+        if profiler is None:
+            return self._check(key, tokens, position, None)
+
+        # checks left under way by a failure are unwound as failures
+        depth = profiler.enter(key)
+        result = FAILURE
+        try:
+            result = self._check(key, tokens, position, profiler)
+            return result
+        finally:
+            profiler.unwind(
+                depth, None if result is FAILURE else result.consumed)
+
+    def _check(self, key: str, tokens, position: int, profiler) -> Result:
+        start = position
+
+        # each frame holds the item, its progress, the parse trees of
+        # its sub items, and the position it started at
+        stack = [[self.rules[key], 0, [], position]]
+        returned = NOTHING
+
+        while stack:
+            frame = stack[-1]
+            item = frame[0]
+            kind = item.kind
+
+            if kind == TERMINAL:
+                result = item.node.check(tokens, position)
+                if result is FAILURE:
+                    return FAILURE
+
+                position += 1
+                returned = result.parse_tree
+
+            elif kind == SEQUENCE:
+                if returned is not NOTHING:
+                    frame[2].append(returned)
+                    returned = NOTHING
+
+                index = frame[1]
+                if index < len(item.items):
+                    frame[1] = index + 1
+                    stack.append([item.items[index], 0, [], position])
+                    continue
+
+                returned = flatten(frame[2], can_return_single=True)
+
+            elif kind == RULE:
+                if frame[1]:
+                    returned = item.node.build_parse_tree(returned)
+                    if profiler is not None:
+                        profiler.leave(position - frame[3])
+
+                else:
+                    rule_key = item.node.key.upper()
+                    rule = self.rules.get(rule_key)
+                    if rule is not None:
+                        if profiler is not None:
+                            profiler.enter(rule_key)
+
+                        frame[1] = 1
+                        stack.append([rule, 0, [], position])
+                        continue
+
+                    # not LL(1), so we fall back to backtracking
+                    result = self.backtracking.check_node(
+                        item.node, tokens, position)
+                    if result is FAILURE:
+                        return FAILURE
+
+                    position += result.consumed
+                    returned = result.parse_tree
+
+            elif kind == REPEAT:
+                if returned is not NOTHING:
+                    frame[2].append(returned)
+                    returned = NOTHING
+
+                if item.decision.predict(tokens, position):
+                    stack.append([item.items[0], 0, [], position])
+                    continue
+
+                if not frame[2]:
+                    return FAILURE
+
+                returned = flatten(frame[2], can_return_single=True)
+
+            elif kind == CHOICE:
+                if returned is not NOTHING:
+                    frame[2].append(returned)
+                    returned = NOTHING
+
+                trie = frame[1] or item.trie
+                if trie.decision is None:
+                    outcome = 0 if trie.edges else END
+                else:
+                    outcome = trie.decision.predict(tokens, position)
+
+                if outcome == FAIL:
+                    return FAILURE
+
+                elif outcome != END:
+                    _, sub_item, frame[1] = trie.edges[outcome]
+                    stack.append([sub_item, 0, [], position])
+                    continue
+
+                returned = flatten(frame[2], can_return_single=True)
+
+            stack.pop()
+
+        return Result(position - start, returned)
@@ -0,0 +1,202 @@
+"""
+Opt-in profiling of the grammars checked whilst parsing
+"""
+
+# standard library
+import json
+import time
+from collections import OrderedDict
+
+__all__ = ['ParseProfiler', 'RuleProfile']
+
+
+class RuleProfile(object):
+    """
+    What was recorded of a single grammar
+
+    :param key: name of the grammar
+    """
+    __slots__ = (
+        'key', 'calls', 'successes', 'failures', 'tokens', 'seconds',
+        'memo_hits'
+    )
+
+    def __init__(self, key: str):
+        self.key = key
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.tokens = 0
+        self.seconds = 0.0
+        self.memo_hits = 0
+
+    def __repr__(self) -> str:
+        return '<RuleProfile key="{}" calls={}>'.format(self.key, self.calls)
+
+    def as_dict(self) -> OrderedDict:
+        return OrderedDict(
+            (name, getattr(self, name)) for name in self.__slots__[1:])
+
+
+class ParseProfiler(object):
+    """
+    Records, for each grammar checked by the
+    :py:class:`BacktrackingParser <tyrian.typarser.grammar_parser.backtracking.BacktrackingParser>`
+    or the
+    :py:class:`PredictiveParser <tyrian.typarser.grammar_parser.predictive.PredictiveParser>`,
+    the number of calls, successes and failures, the number of tokens
+    consumed, and the cumulative time spent checking it. Results found in
+    the packrat memo count as calls, successes or failures, and memo hits.
+
+    Subgrammars inlined by the
+    :py:class:`GrammarOptimiser <tyrian.typarser.grammar_parser.optimiser.GrammarOptimiser>`
+    are not recorded, bar by setting ``optimise_grammars`` to False.
+
+    Time spent within recursive checks of a grammar is counted once, for
+    the outermost check. The time spent in each stack of grammars, less
+    that spent in the grammars it checked, is kept for flamegraphs.
+
+    Enabled by the ``profile`` setting of the
+    :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`,
+    or by setting its `profiler` attribute
+    """
+
+    def __init__(self):
+        self.rules = OrderedDict()
+
+        # each node of the call tree holds the index of its parent, the name
+        # of its grammar, and the time spent in it less that in its children
+        self.tree = []
+        self.tree_index = {}
+
+        # each frame holds the rule, the index of its node in the call tree,
+        # the time it started, the time spent in its children, and whether
+        # it is the outermost check of its grammar
+        self.stack = []
+        self.active = {}
+
+        self.timer = time.perf_counter
+
+    def rule(self, key: str) -> RuleProfile:
+        try:
+            return self.rules[key]
+        except KeyError:
+            profile = self.rules[key] = RuleProfile(key)
+            return profile
+
+    def enter(self, key: str) -> int:
+        """
+        Notes that a grammar is about to be checked, returning the number of
+        checks that were under way beforehand, for :py:meth:`unwind`
+        """
+
+        depth = len(self.stack)
+        parent = self.stack[-1][1] if self.stack else -1
+
+        node = self.tree_index.get((parent, key))
+        if node is None:
+            node = self.tree_index[parent, key] = len(self.tree)
+            self.tree.append([parent, key, 0.0])
+
+        active = self.active.get(key, 0)
+        self.active[key] = active + 1
+
+        self.stack.append(
+            [self.rule(key), node, self.timer(), 0.0, not active])
+        return depth
+
+    def leave(self, consumed: int=None):
+        """
+        Notes that the grammar last entered has been checked
+
+        :param consumed: number of tokens consumed, or None on failure
+        """
+
+        profile, node, start, children, outermost = self.stack.pop()
+        elapsed = self.timer() - start
+
+        self.tree[node][2] += elapsed - children
+        if self.stack:
+            self.stack[-1][3] += elapsed
+
+        self.active[profile.key] -= 1
+        if outermost:
+            profile.seconds += elapsed
+
+        profile.calls += 1
+        if consumed is None:
+            profile.failures += 1
+        else:
+            profile.successes += 1
+            profile.tokens += consumed
+
+    def memo_hit(self, key: str, consumed: int=None):
+        """
+        Notes that the result of a grammar was found in the packrat memo
+
+        :param consumed: number of tokens consumed, or None on failure
+        """
+
+        profile = self.rule(key)
+        profile.memo_hits += 1
+        profile.calls += 1
+        if consumed is None:
+            profile.failures += 1
+        else:
+            profile.successes += 1
+            profile.tokens += consumed
+
+    def unwind(self, depth: int, consumed: int=None):
+        """
+        Leaves each check entered since :py:meth:`enter` returned depth;
+        all but the outermost of them are taken to have failed
+
+        :param depth: as returned by :py:meth:`enter`
+        :param consumed: tokens consumed by the outermost check, or None
+        """
+
+        while len(self.stack) > depth + 1:
+            self.leave()
+        if len(self.stack) > depth:
+            self.leave(consumed)
+
+    def clear(self):
+        "Forgets everything recorded so far"
+        self.__init__()
+
+    def as_dict(self) -> OrderedDict:
+        """
+        Returns the profile of each grammar, most time consuming first
+        """
+
+        ordered = sorted(
+            self.rules.values(), key=lambda profile: -profile.seconds)
+        return OrderedDict(
+            (profile.key, profile.as_dict()) for profile in ordered)
+
+    def to_json(self) -> str:
+        "Returns :py:meth:`as_dict` as JSON"
+        return json.dumps(self.as_dict(), indent=4)
+
+    def collapsed_stacks(self) -> list:
+        """
+        Returns the time spent in each stack of grammars, less that spent in
+        the grammars it checked, as lines of semicolon separated grammar
+        names followed by microseconds, as read by ``flamegraph.pl``
+        """
+
+        paths = []
+        lines = []
+        for parent, key, seconds in self.tree:
+            # parents always precede their children
+            path = key if parent == -1 else paths[parent] + ';' + key
+            paths.append(path)
+
+            microseconds = int(round(seconds * 1e6))
+            if microseconds:
+                lines.append('{} {}'.format(path, microseconds))
+        return lines
+
+    def to_collapsed(self) -> str:
+        "Returns :py:meth:`collapsed_stacks` as text"
+        return ''.join(line + '\n' for line in self.collapsed_stacks())
@@ -0,0 +1,276 @@
+"""
+A dedicated reader for the bundled s-expression Grammar
+"""
+
+# standard library
+import re
+
+# application specific
+from ...utils import logger, flatten
+from .grammar_nodes import Result, FAILURE, LiteralNode, RENode
+
+logger = logger.getChild('SExpressionReader')
+
+__all__ = ['SExpressionReader']
+
+# the bundled Grammar, as loaded by GrammarParser.load_grammar
+GRAMMAR = {
+    'LIST': [
+        'OPEN_BRACKET', 'CLOSE_BRACKET', '|',
+        'OPEN_BRACKET', 'MEMBERS', 'CLOSE_BRACKET'
+    ],
+    'MEMBERS': ['(', 'MEMBER', ')', '+'],
+    'MEMBER': ['QUOTED_SEXPR', '|', 'SEXPR'],
+    'QUOTED_SEXPR': ['ACCENT', 'SEXPR'],
+    'SEXPR': ['LIST', '|', 'ATOM'],
+    'ATOM': ['STRING', '|', 'ID', '|', 'SYMBOL', '|', 'NUMBER'],
+    'NUMBER': ['NUMBER_RE'],
+    'SYMBOL': ['SYMBOL_RE'],
+    'ID': ['ID_RE'],
+    'STRING': ['(', 'DOUBLE_QUOTE', 'STRING_RE', 'DOUBLE_QUOTE', ')']
+}
+
+LITERALS = {
+    'OPEN_BRACKET': '(',
+    'CLOSE_BRACKET': ')',
+    'ACCENT': '`',
+    'DOUBLE_QUOTE': '"'
+}
+
+# atoms are tried in this order, after strings
+ATOMS = ['ID', 'SYMBOL', 'NUMBER']
+
+
+class SExpressionReader(object):
+    """
+    Reads s-expressions with a single pass over the tokens, without
+    backtracking and without recursion, producing the same parse trees as
+    the grammar nodes would for the bundled Grammar.
+
+    Only usable when :py:meth:`supports` is true of the grammars; the
+    regular expressions are taken from the token definitions, but must not
+    match any of the brackets, quotes or accents, such that no token can be
+    read in more than one way
+
+    :param grammar_parser: GrammarParser with parsed grammars
+    """
+
+    def __init__(self, grammar_parser):
+        token_defs = grammar_parser.token_defs
+        self.mapping = grammar_parser.grammar_mapping
+
+        # token names as written in the Grammar, used in the parse trees
+        self.atoms = []
+        for key in ATOMS:
+            name = grammar_parser.loaded_grammars[key][0]
+            self.atoms.append((
+                key,
+                re.compile(token_defs['regex'][name.upper()]),
+                name
+            ))
+
+        # without mappings for these grammars, their parse trees are those
+        # of their sub grammars, so long as those are not lists
+        self.plain_members = not (
+            self.mapping.get('SEXPR') or self.mapping.get('MEMBER'))
+        self.plain_atoms = not self.mapping.get('ATOM')
+
+        string_name = grammar_parser.loaded_grammars['STRING'][2]
+        self.string_re = re.compile(token_defs['regex'][string_name.upper()])
+        self.string_name = string_name
+
+    @classmethod
+    def supports(cls, grammar_parser) -> bool:
+        """
+        Whether the grammars of a
+        :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`
+        are those of the bundled Grammar
+        """
+
+        start_token = grammar_parser.settings.get('start_token')
+        if not start_token or start_token.upper() != 'LIST':
+            return False
+
+        loaded = {
+            key: [token.upper() for token in value]
+            for key, value in grammar_parser.loaded_grammars.items()
+        }
+        if loaded != GRAMMAR:
+            return False
+
+        token_defs = grammar_parser.token_defs
+        for name, literal in LITERALS.items():
+            if token_defs['literal'].get(name) != literal:
+                return False
+
+        for name in ['NUMBER_RE', 'SYMBOL_RE', 'ID_RE', 'STRING_RE']:
+            if name not in token_defs['regex']:
+                return False
+
+            regex = re.compile(token_defs['regex'][name])
+            if any(regex.match(literal) for literal in LITERALS.values()):
+                return False
+
+        return True
+
+    def build(self, key: str, tree):
+        """
+        Applies the grammar mapping, as would
+        :py:meth:`SubGrammarWrapper.build_parse_tree <tyrian.typarser.grammar_parser.grammar_nodes.SubGrammarWrapper.build_parse_tree>`
+        """
+
+        tree = flatten(tree)
+        assert tree
+
+        mapping = self.mapping.get(key)
+        if mapping is None:
+            return tree
+
+        try:
+            return mapping(tree)
+        except TypeError:
+            raise TypeError('{} accepts no arguments'.format(
+                mapping.__qualname__))
+
+    def member(self, tree, quote):
+        """
+        Wraps the parse tree of a list or an atom in those of the grammars
+        leading to it from a member of a list
+        """
+
+        if (self.plain_members and quote is None and
+                type(tree) != list and tree):
+            return tree
+
+        tree = self.build('SEXPR', flatten(tree, can_return_single=True))
+
+        if quote is not None:
+            tree = self.build('QUOTED_SEXPR', [quote, tree])
+
+        tree = self.build('MEMBER', flatten(tree, can_return_single=True))
+        return flatten(tree, can_return_single=True)
+
+    def atom(self, tokens, position: int):
+        """
+        Returns the parse tree of the atom at position, and the number of
+        tokens it spans, or None
+        """
+
+        text = tokens.text(position)
+        line_no = tokens.line_nos[position]
+
+        if text == '"':
+            if (position + 2 < len(tokens) and
+                    tokens.text(position + 2) == '"'):
+                match = self.string_re.match(tokens.text(position + 1))
+                if match:
+                    tree = self.build('STRING', [
+                        LiteralNode.LiteralNode(text, line_no),
+                        RENode.RENode(
+                            match,
+                            self.string_name,
+                            tokens.line_nos[position + 1]
+                        ),
+                        LiteralNode.LiteralNode(
+                            text, tokens.line_nos[position + 2])
+                    ])
+                    return self.wrap_atom(tree), 3
+            return None
+
+        for key, regex, name in self.atoms:
+            match = regex.match(text)
+            if match:
+                tree = self.build(
+                    key, RENode.RENode(match, name, line_no))
+                return self.wrap_atom(tree), 1
+
+        return None
+
+    def wrap_atom(self, tree):
+        if self.plain_atoms and type(tree) != list and tree:
+            return tree
+        return self.build('ATOM', flatten(tree, can_return_single=True))
+
+    def check(self, key: str, tokens, position: int) -> Result:
+        """
+        Reads the list starting at position.
+
+        Returns a :py:class:`Result <tyrian.typarser.grammar_parser.grammar_nodes.Result>`
+        as would :py:meth:`PredictiveParser.check <tyrian.typarser.grammar_parser.predictive.PredictiveParser.check>`
+
+        :param key: name of the grammar, which must be the start grammar
+        :param tokens: tokens to check against
+        :param position: position to start at
+        """
+
+        assert key.upper() == 'LIST', 'Can only read lists'
+
+        text = tokens.text
+        line_nos = tokens.line_nos
+        Literal = LiteralNode.LiteralNode
+        end = len(tokens)
+
+        # each frame holds the literal of the opening bracket, the parse
+        # trees of the members so far, and the literal of any quote
+        stack = []
+        quote = None
+        pos = position
+        tree = None
+
+        while True:
+            if tree is None:
+                # expecting a member, or the start of the outermost list
+                if pos >= end:
+                    return FAILURE
+
+                token = text(pos)
+
+                if token == '`' and stack and quote is None:
+                    quote = Literal(token, line_nos[pos])
+                    pos += 1
+                    continue
+
+                elif token == '(':
+                    opening = Literal(token, line_nos[pos])
+                    if pos + 1 < end and text(pos + 1) == ')':
+                        tree = [opening, Literal(')', line_nos[pos + 1])]
+                        pos += 2
+                    else:
+                        stack.append((opening, [], quote))
+                        quote = None
+                        pos += 1
+                        continue
+
+                elif token == ')' and stack and quote is None:
+                    opening, members, quote = stack.pop()
+                    if not members:
+                        return FAILURE
+
+                    if len(members) == 1:
+                        members = flatten(members[0], can_return_single=True)
+                    members = self.build(
+                        'MEMBERS', flatten(members, can_return_single=True))
+
+                    tree = [opening, members, Literal(token, line_nos[pos])]
+                    pos += 1
+
+                elif stack:
+                    atom = self.atom(tokens, pos)
+                    if atom is None:
+                        return FAILURE
+
+                    tree, consumed = atom
+                    pos += consumed
+                    stack[-1][1].append(self.member(tree, quote))
+                    quote, tree = None, None
+                    continue
+
+                else:
+                    return FAILURE
+
+            # a list has been read
+            if not stack:
+                return Result(pos - position, tree)
+
+            stack[-1][1].append(self.member(self.build('LIST', tree), quote))
+            quote, tree = None, None
@@ -0,0 +1,367 @@
+"""
+Reports on the cost of checking a set of grammar trees, as produced by
+:py:meth:`GrammarParser.parse_grammars <tyrian.typarser.grammar_parser.GrammarParser.parse_grammars>`
+"""
+
+# standard library
+import time
+from collections import OrderedDict
+
+# application specific
+from .analysis import children, alternatives, overlapping
+from .grammar_nodes import (
+    SubGrammarWrapper,
+    ContainerNode,
+    LiteralNode,
+    MultiNode,
+    RENode,
+    ORNode
+)
+from .profiler import ParseProfiler
+
+__all__ = ['GrammarReport', 'describe']
+
+
+def describe(node) -> str:
+    """
+    Returns a grammar node written out much as it would be in a Grammar file
+    """
+
+    if isinstance(node, (LiteralNode, RENode)):
+        return node.settings.get('token') or str(node)
+    elif isinstance(node, SubGrammarWrapper):
+        return node.key.lower()
+    elif isinstance(node, MultiNode):
+        sub = describe(node.subs)
+        if isinstance(node.subs, ContainerNode) and len(node.subs.subs) > 1:
+            sub = '(' + sub + ')'
+        return sub + '+'
+    elif isinstance(node, ORNode):
+        return ' | '.join(
+            ' '.join(map(describe, nodes)) for nodes in alternatives(node))
+    elif isinstance(node, ContainerNode):
+        return ' '.join(
+            '(' + describe(sub) + ')'
+            if isinstance(sub, ORNode) and len(node.subs) > 1
+            else describe(sub)
+            for sub in node.subs
+        )
+    return str(node)
+
+
+class GrammarReport(object):
+    """
+    Statically analyses the grammars of a
+    :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`,
+    as written rather than as optimised, reporting left recursion, rules
+    that can match nothing, FIRST/FIRST conflicts between the alternatives
+    of each chain of ORNode's, and an estimate of how much backtracking
+    each rule can cause.
+
+    The backtracking factor of a rule estimates how many times the tokens
+    it matches may be checked over when backtracking; a chain of ORNode's
+    costs the work of the alternative that matches, plus that of every
+    earlier alternative with an overlapping FIRST set that can consume an
+    unbounded number of tokens before failing. References back to a rule
+    count once, such that a factor greater than one in a recursive rule is
+    multiplied at each level of nesting; that is, grows exponentially with
+    the nesting depth of the tokens, unless packrat parsing is enabled.
+
+    :param grammar_parser: GrammarParser with parsed grammars
+    """
+
+    def __init__(self, grammar_parser):
+        self.grammar_parser = grammar_parser
+        self.grammars = grammar_parser.grammars
+        self.analysis = grammar_parser.predictive_parser.analysis
+        self.conflicts = grammar_parser.predictive_parser.conflicts
+
+        self.calls = {
+            key: {
+                node.key.upper()
+                for node in self.analysis.nodes(key)
+                if isinstance(node, SubGrammarWrapper)
+            }
+            for key in self.grammars
+        }
+
+        self._factors = {}
+        self._bounded = {}
+
+    def is_recursive(self, key: str) -> bool:
+        """
+        Whether the named grammar may be checked again whilst it is being
+        checked
+        """
+
+        seen, pending = set(), list(self.calls[key])
+        while pending:
+            current = pending.pop()
+            if current == key:
+                return True
+            if current in seen or current not in self.calls:
+                continue
+            seen.add(current)
+            pending.extend(self.calls[current])
+        return False
+
+    def chains(self, key: str) -> list:
+        """
+        Returns the outermost ORNode of each chain of ORNode's in the named
+        grammar
+        """
+
+        found, pending = [], [self.grammars[key]]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, ORNode):
+                found.append(node)
+                subs = [sub for nodes in alternatives(node) for sub in nodes]
+            else:
+                subs = children(node)
+            pending.extend(reversed(subs))
+        return found
+
+    def first_conflicts(self, or_node: ORNode) -> list:
+        """
+        Returns a list of (index, other index, terminals) tuples for each
+        pair of alternatives of a chain of ORNode's whose FIRST sets
+        overlap, with the terminals of the first that overlap the second
+        """
+
+        firsts = [
+            self.analysis.first_of_sequence(nodes)[0]
+            for nodes in alternatives(or_node)
+        ]
+
+        conflicts = []
+        for index, first in enumerate(firsts):
+            for other in range(index + 1, len(firsts)):
+                shared = [
+                    terminal for terminal in first
+                    if overlapping([terminal], firsts[other])
+                ]
+                if shared:
+                    conflicts.append((index, other, shared))
+        return conflicts
+
+    def is_bounded(self, node, active: frozenset=frozenset()) -> bool:
+        """
+        Whether the node can only ever consume a bounded number of tokens
+        """
+
+        if isinstance(node, SubGrammarWrapper):
+            key = node.key.upper()
+            if key in active or key not in self.grammars:
+                return False
+            if key not in self._bounded:
+                self._bounded[key] = self.is_bounded(
+                    self.grammars[key], active | {key})
+            return self._bounded[key]
+
+        elif isinstance(node, MultiNode):
+            return False
+
+        return all(self.is_bounded(sub, active) for sub in children(node))
+
+    def node_factor(self, node, active: frozenset) -> int:
+        """
+        Returns the backtracking factor of a grammar node, see above
+
+        :param node: node to estimate the factor of
+        :param active: names of the grammars the node is checked within
+        """
+
+        if isinstance(node, SubGrammarWrapper):
+            key = node.key.upper()
+            if key in active or key not in self.grammars:
+                return 1
+            # left recursion is reported on its own
+            return self.factor(key, active) or 1
+
+        elif isinstance(node, ORNode):
+            options = []
+            for nodes in alternatives(node):
+                first, nullable = self.analysis.first_of_sequence(nodes)
+                factor = max(
+                    [self.node_factor(sub, active) for sub in nodes] or [1])
+                bounded = all(self.is_bounded(sub) for sub in nodes)
+                options.append((first, nullable, factor, bounded))
+
+            worst = 1
+            for index, (first, nullable, factor, _) in enumerate(options):
+                wasted = sum(
+                    other_factor
+                    for other, other_nullable, other_factor, bounded
+                    in options[:index]
+                    if not bounded and (
+                        nullable or other_nullable or
+                        overlapping(first, other))
+                )
+                worst = max(worst, factor + wasted)
+            return worst
+
+        return max(
+            [self.node_factor(sub, active) for sub in children(node)] or [1])
+
+    def factor(self, key: str, active: frozenset=frozenset()) -> int:
+        """
+        Returns the backtracking factor of the named grammar, or None for
+        left recursive grammars, which are never done backtracking
+        """
+
+        if key in self.analysis.left_recursive:
+            return None
+
+        active = active | {key}
+        if active not in self._factors.setdefault(key, {}):
+            self._factors[key][active] = self.node_factor(
+                self.grammars[key], active)
+        return self._factors[key][active]
+
+    def run_sample(self, parser, tokens, profiler=None) -> OrderedDict:
+        """
+        Parses a sample with the backtracking engine, returning the time
+        taken, and the profile of each grammar checked, most checked first.
+
+        :param parser: :py:class:`Parser <tyrian.typarser.Parser>` built \
+        around the grammar parser reported upon
+        :param tokens: tokens to parse
+        :param profiler: :py:class:`ParseProfiler <tyrian.typarser.grammar_parser.profiler.ParseProfiler>` \
+        to record the grammars checked in, should they be wanted afterwards
+        """
+
+        profiler = profiler or ParseProfiler()
+
+        previous = self.grammar_parser.profiler
+        self.grammar_parser.profiler = profiler
+        try:
+            start = time.perf_counter()
+            parser.parse(tokens)
+            seconds = time.perf_counter() - start
+        finally:
+            self.grammar_parser.profiler = previous
+
+        rules = sorted(
+            profiler.as_dict().items(), key=lambda item: -item[1]['calls'])
+        return OrderedDict([
+            ('tokens', len(tokens)),
+            ('seconds', seconds),
+            ('rules', OrderedDict(rules))
+        ])
+
+    def as_dict(self) -> OrderedDict:
+        """
+        Returns the findings for each grammar, by name
+        """
+
+        report = OrderedDict()
+        for key in sorted(self.grammars):
+            report[key] = OrderedDict([
+                ('definition', describe(self.grammars[key])),
+                ('nullable', self.analysis.rule_nullable[key]),
+                ('left_recursive', key in self.analysis.left_recursive),
+                ('recursive', self.is_recursive(key)),
+                ('ll1', not self.conflicts[key]),
+                ('backtracking_factor', self.factor(key)),
+                ('first_conflicts', [
+                    OrderedDict([
+                        ('choice', describe(or_node)),
+                        ('alternatives', [index + 1, other + 1]),
+                        ('terminals', sorted(
+                            terminal.name or terminal.value
+                            for terminal in terminals
+                        ))
+                    ])
+                    for or_node in self.chains(key)
+                    for index, other, terminals in self.first_conflicts(
+                        or_node)
+                ])
+            ])
+        return report
+
+    def format(self, sample: dict=None) -> str:
+        """
+        Returns the report as text
+
+        :param sample: result of :py:meth:`run_sample`, if any
+        """
+
+        report = self.as_dict()
+        lines = ['{:<20} {:>9} {:>15} {:>10} {:>6} {:>13}'.format(
+            'rule', 'nullable', 'left recursive', 'recursive', 'LL(1)',
+            'backtracking')]
+
+        def yes_no(value: bool) -> str:
+            return 'yes' if value else 'no'
+
+        for key, found in report.items():
+            factor = found['backtracking_factor']
+            if factor is None:
+                cost = 'unbounded'
+            elif factor > 1 and found['recursive']:
+                cost = 'x{} per level'.format(factor)
+            else:
+                cost = 'x{}'.format(factor)
+
+            lines.append('{:<20} {:>9} {:>15} {:>10} {:>6} {:>13}'.format(
+                key,
+                yes_no(found['nullable']),
+                yes_no(found['left_recursive']),
+                yes_no(found['recursive']),
+                yes_no(found['ll1']),
+                cost
+            ))
+
+        lines.extend(['', 'FIRST/FIRST conflicts:'])
+        for key, found in report.items():
+            for conflict in found['first_conflicts']:
+                index, other = conflict['alternatives']
+                lines.append(
+                    '    {}: alternatives {} and {} of "{}" may both start '
+                    'with {}'.format(
+                        key,
+                        index,
+                        other,
+                        conflict['choice'],
+                        ', '.join(conflict['terminals'])
+                    ))
+
+        left_recursive = [
+            key for key, found in report.items() if found['left_recursive']]
+        if left_recursive:
+            lines.extend(['', (
+                'Checking the left recursive rules {} would never '
+                'finish'.format(', '.join(left_recursive)))])
+
+        exponential = [
+            key for key, found in report.items()
+            if found['recursive'] and (found['backtracking_factor'] or 1) > 1
+        ]
+        if exponential:
+            lines.extend(['', (
+                'Checking {} may take time exponential in the nesting depth '
+                'of the tokens, unless packrat parsing is enabled'.format(
+                    ', '.join(exponential)))])
+
+        if sample is not None:
+            lines.extend(['', 'Sample of {} tokens parsed in {:.4f}s:'.format(
+                sample['tokens'], sample['seconds'])])
+            heading = '    {:<20} {:>8} {:>9} {:>8} {:>8} {:>9} {:>9}'
+            lines.append(heading.format(
+                'rule', 'calls', 'successes', 'failures', 'tokens',
+                'seconds', 'per token'))
+            for key, profile in sample['rules'].items():
+                lines.append(
+                    '    {:<20} {:>8} {:>9} {:>8} {:>8} {:>9.4f} '
+                    '{:>9.2f}'.format(
+                        key,
+                        profile['calls'],
+                        profile['successes'],
+                        profile['failures'],
+                        profile['tokens'],
+                        profile['seconds'],
+                        profile['calls'] / max(sample['tokens'], 1)
+                    ))
+
+        return '\n'.join(lines)
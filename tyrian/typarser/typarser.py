@@ -1,7 +1,11 @@
 # application specific
 from ..utils import flatten
+from ..tokens import TokenBuffer
+from .form_cache import FormCache
 from .grammar_parser import GrammarParser
+from .grammar_parser.grammar_nodes import FAILURE
 from ..nodes import AST, ContainerNode, ListNode
+from ..arena import ASTArena
 from ..exceptions import TyrianSyntaxError, NoSuchGrammar
 
 __all__ = ['Parser']
@@ -10,47 +14,220 @@ __all__ = ['Parser']
 class Parser(object):
     """
     Simplifies parsing
+
+    Takes the same arguments as :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`; \
+    setting ``form_cache`` keeps a :py:class:`FormCache <tyrian.typarser.form_cache.FormCache>`, \
+    such that :py:meth:`parse` only parses the top level forms that have \
+    changed since it was last called, and setting ``compact_ast`` has \
+    :py:meth:`parse` return an :py:class:`ASTArena <tyrian.arena.ASTArena>`, \
+    each form being stored as soon as it has been parsed
     """
     def __init__(self, **kwargs):
         self.grammar_parser = GrammarParser(**kwargs)
 
-    def parse(self, lexed: list) -> AST:
+        if self.grammar_parser.settings.get('form_cache'):
+            self.form_cache = FormCache()
+        else:
+            self.form_cache = None
+
+    def parse(self, lexed: TokenBuffer) -> AST:
         """
-        given a list of tokens, returns a :py:class:`AST <tyrian.nodes.AST>`
+        given a :py:class:`TokenBuffer <tyrian.tokens.TokenBuffer>`, returns a \
+        :py:class:`AST <tyrian.nodes.AST>`, or an \
+        :py:class:`ASTArena <tyrian.arena.ASTArena>` should ``compact_ast`` \
+        be set
 
-        :param lexed: list of tokens to parse
+        :param lexed: tokens to parse
         """
 
+        start_token = self._start_token()
+        check = self._engine(start_token)
+
+        if self.form_cache is not None:
+            processed = self.form_cache.parse(
+                self.iter_forms(lexed),
+                lambda form: self._process(
+                    self._results(check, start_token, form))
+            )
+            if self.grammar_parser.settings.get('compact_ast'):
+                return ASTArena.from_forms(processed)
+            return AST(processed)
+
+        if self.grammar_parser.settings.get('compact_ast'):
+            # the Nodes of each form may be discarded once stored
+            arena = ASTArena()
+            for result in self._results(check, start_token, lexed):
+                arena.extend(self._process([result]))
+            return arena
+
+        results = list(self._results(check, start_token, lexed))
+
+        processed = self._process(results)
+        return AST(processed)
+
+    def iter_parse(self, tokens):
+        """
+        given a :py:class:`TokenBuffer <tyrian.tokens.TokenBuffer>`, or an \
+        iterable of :py:class:`Token <tyrian.tokens.Token>`'s such as from \
+        :py:meth:`Lexer.lex_stream <tyrian.lexer.Lexer.lex_stream>`, yields \
+        each top level :py:class:`ListNode <tyrian.nodes.ListNode>` as soon \
+        as its closing bracket has been consumed, such that the tokens and \
+        parse trees of earlier forms need not be kept around.
+
+        Top level forms are taken to end where their brackets balance, as \
+        they do for the bundled Grammar; see :py:meth:`iter_forms`
+
+        :param tokens: tokens to parse
+        """
+
+        start_token = self._start_token()
+        check = self._engine(start_token)
+
+        for form in self.iter_forms(tokens):
+            yield from self._process(self._results(check, start_token, form))
+
+    def iter_forms(self, tokens):
+        """
+        Splits tokens into :py:class:`TokenBuffer <tyrian.tokens.TokenBuffer>`'s \
+        of a single top level form each, by balancing their brackets.
+
+        Tokens outside of any brackets, stray closing brackets, and any \
+        unclosed form at the end, are yielded as forms of their own, such \
+        that the parser rejects them just as it would have otherwise
+
+        :param tokens: a TokenBuffer, or an iterable of Token's
+        """
+
+        if isinstance(tokens, TokenBuffer):
+            for start, end in self.form_bounds(tokens):
+                yield tokens[start:end]
+            return
+
+        open_bracket = self.open_bracket
+        close_bracket = self.close_bracket
+
+        names = []
+        form = []
+        depth = 0
+
+        for token in tokens:
+            if token.name not in names:
+                names.append(token.name)
+            form.append(token)
+
+            if token.token == open_bracket:
+                depth += 1
+            elif token.token == close_bracket:
+                depth -= 1
+
+            if depth <= 0:
+                yield TokenBuffer.from_tokens(names, form, token.filename)
+                form = []
+                depth = 0
+
+        if form:
+            yield TokenBuffer.from_tokens(names, form, form[0].filename)
+
+    def form_bounds(self, lexed: TokenBuffer):
+        """
+        Yields the start and end indices of each top level form, as split \
+        by :py:meth:`iter_forms`
+
+        :param lexed: tokens to split
+        """
+
+        text = lexed.text
+        open_bracket = self.open_bracket
+        close_bracket = self.close_bracket
+
+        start = 0
+        depth = 0
+        for index in range(len(lexed)):
+            token = text(index)
+
+            if token == open_bracket:
+                depth += 1
+            elif token == close_bracket:
+                depth -= 1
+
+            if depth <= 0:
+                yield start, index + 1
+                start = index + 1
+                depth = 0
+
+        if start < len(lexed):
+            yield start, len(lexed)
+
+    @property
+    def open_bracket(self) -> str:
+        "text of the token opening a form"
+        return self.grammar_parser.token_defs['literal'].get(
+            'OPEN_BRACKET', '(')
+
+    @property
+    def close_bracket(self) -> str:
+        "text of the token closing a form"
+        return self.grammar_parser.token_defs['literal'].get(
+            'CLOSE_BRACKET', ')')
+
+    def _start_token(self) -> str:
         # grab the start token from the settings
         start_token = self.grammar_parser.settings['start_token'].upper()
 
         if start_token not in self.grammar_parser.grammars:
             raise NoSuchGrammar('No such grammar as "{}"'.format(start_token))
 
-        base_grammar = self.grammar_parser.grammars[start_token]
+        return start_token
 
-        index = 0
-        results = []
+    def _results(self, check, start_token: str, lexed: TokenBuffer):
+        """
+        Yields the result of each top level form in lexed, in turn
+        """
+
+        if self.grammar_parser.memo is not None:
+            self.grammar_parser.memo.clear()
 
+        index = 0
         while index < len(lexed):
-            result = base_grammar.check(
-                lexed[index:], '<{}>'.format(start_token)
-            )
+            result = check(start_token, lexed, index)
 
-            if not result['result']:
+            if result is FAILURE:
                 raise TyrianSyntaxError(
                     'error found near line {} in file {}'.format(
-                        lexed[index]['line_no'],
-                        lexed[index]['filename']
+                        lexed.line_no(index),
+                        lexed.filename
                     )
                 )
 
-            results.append(result)
+            yield result
 
-            index += result['consumed']
+            index += result.consumed
 
-        processed = self._process(results)
-        return AST(processed)
+    def _engine(self, start_token: str):
+        """
+        Returns the check function of the engine to parse with, taking the
+        name of the grammar, the tokens and the position to start at
+        """
+
+        grammar_parser = self.grammar_parser
+
+        # neither the reader nor the generated parser check grammar by
+        # grammar, and so cannot be profiled
+        profiling = grammar_parser.profiler is not None
+
+        if grammar_parser.reader is not None and not profiling:
+            return grammar_parser.reader.check
+
+        if grammar_parser.generated_parser is not None and not profiling:
+            return grammar_parser.generated_parser.check
+
+        # use the prediction tables where the grammar allows for it
+        predictive = grammar_parser.predictive_parser
+        if (grammar_parser.settings.get('parser_engine') != 'backtracking' and
+                predictive.is_ll1(start_token)):
+            return predictive.check
+
+        return grammar_parser.backtracking_parser.check
 
     def _process(self, parsed: list) -> ContainerNode:
         """
@@ -58,7 +235,7 @@ class Parser(object):
         """
         processed = []
         for result in parsed:
-            parse_tree = result['parse_tree']
+            parse_tree = result.parse_tree
             parse_tree = flatten(parse_tree, can_return_single=True)
 
             parse_tree = ListNode(parse_tree)
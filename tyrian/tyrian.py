@@ -1,55 +1,156 @@
 # standard library
+import io
 import os
 import json
-import pkg_resources
+from types import CodeType
 
 # application specific
 from .lexer import Lexer
+from .tokens import TokenBuffer
 from .utils import logger
 from .typarser import Parser
+from .grammar_cache import GrammarCache, grammar_digest
+from .compile_cache import CompileCache, compile_digest, DEFAULT_MAX_SIZE
+from .parallel import ParallelParser
 from .compiler import Compiler
 
 # third party
 from peak.util.assembler import Code
 
+# whether the user cache directory has been found unusable, so as to only
+# warn of it once
+_no_cache_dir = False
+
+
+def cache_dir() -> str:
+    """
+    Returns the directory the Grammar caches are kept in by default, within
+    the user cache directory, creating it if need be; returns None should it
+    not be writable
+    """
+
+    global _no_cache_dir
+
+    directory = os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or
+        os.path.join(os.path.expanduser('~'), '.cache'),
+        'tyrian'
+    )
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        if not _no_cache_dir:
+            _no_cache_dir = True
+            logger.warning('Not caching the Grammar, as {} could not be '
+                           'created: {!r}'.format(directory, e))
+        return None
+
+    if not os.access(directory, os.W_OK):
+        if not _no_cache_dir:
+            _no_cache_dir = True
+            logger.warning('Not caching the Grammar, as {} is not '
+                           'writable'.format(directory))
+        return None
+
+    return directory
+
 
 class Tyrian(object):
     """
-    Primary interface to tyrian
+    Primary interface to tyrian.
+
+    The release profile, without type checks or debug logging, is selected
+    for the whole process by setting ``TYRIAN_BUILD_PROFILE=release`` in the
+    environment before tyrian is imported
 
-    :param settings: dictionary containing settings
+    :param settings: dictionary containing settings; setting ``lex_mmap`` \
+    lexes input files via :py:meth:`Lexer.lex_mmap <tyrian.lexer.Lexer.lex_mmap>`, \
+    ``generated_parser`` overrides where the generated parser is \
+    cached, by default in the :py:func:`cache_dir`, see :py:class:`GrammarParser <tyrian.typarser.grammar_parser.GrammarParser>`, \
+    ``form_cache`` only reparses changed forms, see \
+    :py:class:`Parser <tyrian.typarser.Parser>`, \
+    ``grammar_cache`` overrides where the lexer and parser are cached, \
+    by default also in the :py:func:`cache_dir`, or disables the :py:class:`GrammarCache <tyrian.grammar_cache.GrammarCache>` \
+    when false, setting ``jobs`` to more than one, or to zero for one \
+    per cpu, lexes and parses input files in that many processes with the \
+    :py:class:`ParallelParser <tyrian.parallel.ParallelParser>`, \
+    and ``compile_cache`` names a file to keep compiled code in, see \
+    :py:meth:`compile_code`, holding at most ``compile_cache_size`` bytes
     """
 
     def __init__(self, settings: dict=None):
+        self.settings = settings or {}
         self.resources = os.path.join(
             os.path.dirname(__file__), 'Grammar')
 
         # read in the tokens
-        token_defs_filename = pkg_resources.resource_filename(
-            __name__, 'Grammar\\tokens.json'
-        )
+        token_defs_filename = os.path.join(self.resources, 'tokens.json')
         with open(token_defs_filename) as fh:
             token_defs = json.load(fh)
 
         # read in the Grammar
-        grammar_filename = pkg_resources.resource_filename(
-            __name__, 'Grammar\\Grammar'
-        )
+        grammar_filename = os.path.join(self.resources, 'Grammar')
         with open(grammar_filename) as fh:
             raw_grammar = fh.read()
 
-        # load up the appropriate Nodes for the parser
-        from . import nodes
+        # the parser generated from the Grammar, and the lexer and parser
+        # themselves, are cached in the user cache directory, rather than
+        # alongside the Grammar, which may well be read-only once installed
+        parser_settings = dict(self.settings)
+        if ('generated_parser' not in self.settings or
+                'grammar_cache' not in self.settings):
+            directory = cache_dir()
+        else:
+            directory = None
+
+        if directory:
+            parser_settings.setdefault(
+                'generated_parser',
+                os.path.join(directory, 'Grammar_parser.py')
+            )
+
+        cache_filename = self.settings.get(
+            'grammar_cache',
+            directory and os.path.join(directory, 'Grammar.cache'))
+        cache = GrammarCache(cache_filename) if cache_filename else None
+        digest = grammar_digest(raw_grammar, token_defs, parser_settings)
+
+        cached = cache.load(digest) if cache else None
+        if cached:
+            self.lexer, self.parser = cached
+        else:
+            # load up the appropriate Nodes for the parser
+            from . import nodes
+
+            self.lexer = Lexer(token_defs)
+            self.parser = Parser(
+                token_defs=token_defs,
+                raw_grammar=raw_grammar,
+                grammar_mapping=nodes.grammar_mapping,
+                settings=parser_settings
+            )
+
+            if cache:
+                cache.store(digest, self.lexer, self.parser)
 
-        self.lexer = Lexer(token_defs)
-        self.parser = Parser(
-            token_defs=token_defs,
-            raw_grammar=raw_grammar,
-            grammar_mapping=nodes.grammar_mapping,
-            settings=settings
-        )
         self.compiler = Compiler()
 
+        # tokens compiled by this Tyrian, save those lexed by the worker
+        # processes of the ParallelParser
+        self.tokens_compiled = 0
+
+        compile_cache_filename = self.settings.get('compile_cache')
+        if compile_cache_filename:
+            self.compile_cache = CompileCache(
+                compile_cache_filename,
+                self.settings.get('compile_cache_size', DEFAULT_MAX_SIZE)
+            )
+            self.compile_digest = compile_digest(raw_grammar, token_defs)
+        else:
+            self.compile_cache = None
+            self.compile_digest = None
+
     def compile(self, input_filename: str) -> Code:
         """
         Compile a file into python bytecode
@@ -58,17 +159,110 @@ class Tyrian(object):
         :rtype: Code
         """
 
+        if self.settings.get('jobs', 1) != 1:
+            return self.compile_parallel(input_filename)
+
+        if self.settings.get('lex_mmap'):
+            with self.lexer.lex_mmap(input_filename) as tokens:
+                return self.compile_tokens(input_filename, tokens)
+
+        # lex the file a chunk at a time, rather than holding both the
+        # source and the tokens in memory
         with open(input_filename) as fh:
-            input_filename_content = fh.read()
-            lexed = self.lexer.lex(
-                input_filename_content, input_filename)
+            return self.compile_tokens(
+                input_filename, self.lexer.lex_stream(fh, input_filename))
 
-        logger.info('### kettle of fish ###')
+    def compile_code(self, input_filename: str) -> CodeType:
+        """
+        Compile a file into a python code object, by way of the
+        :py:class:`CompileCache <tyrian.compile_cache.CompileCache>`, if any;
+        on a hit, the file is neither lexed, parsed nor compiled
 
-        parse_tree = self.parser.parse(lexed)
+        :param input_filename: path to file containing lisp code
+        :rtype: CodeType
+        """
+
+        if self.compile_cache is None:
+            return self.compile(input_filename).code()
+
+        with open(input_filename, 'rb') as fh:
+            source = fh.read()
+
+        key = self.compile_cache.key(
+            source,
+            os.path.abspath(input_filename),
+            self.compile_digest
+        )
+
+        code = self.compile_cache.load(key)
+        if code is None:
+            # compile the very contents hashed, rather than reading the file
+            # again, decoded as open() would have
+            with io.TextIOWrapper(io.BytesIO(source)) as fh:
+                source = fh.read()
+
+            if self.settings.get('jobs', 1) != 1:
+                code = self.compile_parallel(input_filename, source).code()
+            else:
+                code = self.compile_tokens(
+                    input_filename, self.lexer.lex(source, input_filename)
+                ).code()
+            self.compile_cache.store(key, code)
+
+        return code
+
+    def compile_parallel(self, input_filename: str, source: str=None) -> Code:
+        """
+        Compiles a file into python bytecode, lexing and parsing chunks of
+        its top level forms in parallel, and compiling each form in turn as
+        soon as its chunk has been parsed
+
+        :param input_filename: path to file containing lisp code
+        :param source: contents of the file, should they have been read
+        :rtype: Code
+        """
+
+        if source is None:
+            with open(input_filename) as fh:
+                source = fh.read()
+
+        parallel_parser = ParallelParser(
+            self.lexer, self.parser, self.settings['jobs'])
+        forms = parallel_parser.iter_parse(source, input_filename)
+
+        return self.compiler.compile_forms(input_filename, forms)
+
+    def compile_tokens(self, input_filename: str, tokens) -> Code:
+        """
+        Compiles tokens into python bytecode, a top level form at a time;
+        each form is parsed and compiled as soon as its tokens have been
+        lexed, and is then discarded
+
+        :param input_filename: path the tokens were lexed from
+        :param tokens: a TokenBuffer, or an iterable of Token's
+        :rtype: Code
+        """
 
         logger.info('### kettle of fish ###')
 
-        bytecode = self.compiler.compile_parse_tree(input_filename, parse_tree)
+        if isinstance(tokens, TokenBuffer):
+            self.tokens_compiled += len(tokens)
+        else:
+            tokens = self._count_tokens(tokens)
+
+        forms = self.parser.iter_parse(tokens)
+        bytecode = self.compiler.compile_forms(input_filename, forms)
+
+        logger.info('### kettle of fish ###')
 
         return bytecode
+
+    def _count_tokens(self, tokens):
+        "Yields the tokens, adding them to tokens_compiled as they go"
+
+        count = 0
+        try:
+            for count, token in enumerate(tokens, 1):
+                yield token
+        finally:
+            self.tokens_compiled += count
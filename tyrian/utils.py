@@ -1,7 +1,14 @@
+import os
+import sys
 import types
 import logging
 from functools import wraps
 
+# the release profile does without type checks and debug logging; it is
+# selected by setting TYRIAN_BUILD_PROFILE=release before tyrian is imported,
+# and holds for the life of the process, worker processes included
+RELEASE = os.environ.get('TYRIAN_BUILD_PROFILE', 'debug') == 'release'
+
 if 'logger' not in globals():
     logger = logging.getLogger('Main')
     logger.setLevel(logging.DEBUG)
@@ -22,6 +29,37 @@ if 'logger' not in globals():
 
         logger.addHandler(hdlr)
 
+    if RELEASE:
+        logger.setLevel(logging.INFO)
+
+
+try:
+    from importlib.util import MAGIC_NUMBER
+except ImportError:
+    # python 3.3
+    from imp import get_magic
+    MAGIC_NUMBER = get_magic()
+
+
+def pyc_header(mtime: float, size: int) -> bytes:
+    """
+    Returns the header of a bytecode file validated by the modification time
+    and size of its source, as laid out by the running interpreter; from
+    python 3.7 onwards, a word of flags follows the magic number (PEP 552)
+
+    :param mtime: modification time of the source
+    :param size: size of the source, in bytes
+    """
+
+    header = MAGIC_NUMBER
+    if sys.version_info >= (3, 7):
+        header += (0).to_bytes(4, 'little')
+    return (
+        header +
+        (int(mtime) & 0xFFFFFFFF).to_bytes(4, 'little') +
+        (size & 0xFFFFFFFF).to_bytes(4, 'little')
+    )
+
 
 def flatten(obj, can_return_single: bool=False):
     """
@@ -38,9 +76,11 @@ def flatten(obj, can_return_single: bool=False):
     :param can_return_single: see above
     """
 
-    if type(obj) == list and len(obj) == 1 and type(obj[0]) == list:
-        return flatten(obj[0], can_return_single)
-    elif type(obj) == list and len(obj) == 1 and can_return_single:
+    # iteratively, as the nesting may be deep
+    while type(obj) == list and len(obj) == 1 and type(obj[0]) == list:
+        obj = obj[0]
+
+    if type(obj) == list and len(obj) == 1 and can_return_single:
         return obj[0]
     else:
         return obj
@@ -59,10 +99,14 @@ def check_type(name, *args):
 
 def enforce_types(func: types.FunctionType):
     """
-    checks supplied argument types against the annotations
+    checks supplied argument types against the annotations; under the
+    release profile, the function is returned as is
 
     :param func: function to enforce argument types for
     """
+    if RELEASE:
+        return func
+
     @wraps(func)
     def newf(*args, **kwargs):
         name = func.__name__